@@ -0,0 +1,181 @@
+"""
+Синтетические данные для бенчмарков: каталоги названий игр, записи icon_info
+и папка рабочего стола с ярлыками .lnk/.url, файлами и папками.
+
+Генерация детерминирована (seed), поэтому результаты разных запусков сравнимы.
+"""
+import os
+import random
+import struct
+
+from desktop_sort.codes import ItemType
+from desktop_sort.lnk_parser import HAS_LINK_INFO, LNK_CLSID, LNK_HEADER_SIZE, VOLUME_ID_AND_LOCAL_BASE_PATH
+
+
+# Доли видов иконок на синтетическом рабочем столе
+ICON_KINDS = [
+    ("folder", 8),
+    ("program_lnk", 20),
+    ("game_lnk", 20),
+    ("url", 12),
+    ("document", 15),
+    ("image", 8),
+    ("archive", 5),
+    ("exe", 5),
+    ("system", 2),
+    ("unknown", 5),
+]
+
+PROGRAMS = ["chrome.exe", "telegram.exe", "code.exe", "obs64.exe", "notepad++.exe", "discord.exe", "winrar.exe", "vlc.exe"]
+URLS = [
+    "https://www.youtube.com/watch?v={n}", "https://github.com/user/repo{n}", "steam://rungameid/{n}",
+    "https://example.org/page/{n}", "https://vk.com/id{n}", "https://docs.python.org/3/{n}.html",
+]
+DOCUMENT_EXTENSIONS = [".txt", ".docx", ".pdf", ".xlsx", ".md", ".csv"]
+IMAGE_EXTENSIONS = [".png", ".jpg", ".gif", ".webp"]
+ARCHIVE_EXTENSIONS = [".zip", ".rar", ".7z"]
+SYSTEM_NAMES = ["Корзина", "Этот компьютер", "Панель управления", "Сеть"]
+WORDS = ["отчет", "проект", "фото", "backup", "notes", "draft", "budget", "design", "читать", "misc"]
+
+
+def make_game_titles(base_titles: list, count: int, seed: int = 0) -> list:
+    """
+    Масштабирует каталог названий до count строк: сначала исходные названия,
+    затем их варианты (номера частей, издания), как в реальных каталогах.
+    """
+    rng = random.Random(seed)
+    titles = list(base_titles[:count])
+    suffixes = [" 2", " 3", " ii", " iii", ": remastered", " - definitive edition", " gold", " online", " vr", ": origins"]
+    base = base_titles or ["game"]
+    while len(titles) < count:
+        titles.append(f"{rng.choice(base)}{rng.choice(suffixes)} {len(titles)}")
+    return titles
+
+
+def write_title_catalog(filename: str, titles: list):
+    with open(filename, "w", encoding="utf-8") as f:
+        for title in titles:
+            f.write(title)
+            f.write("\n")
+
+
+def _choose_kind(rng) -> str:
+    return rng.choices([kind for kind, _ in ICON_KINDS], weights=[weight for _, weight in ICON_KINDS])[0]
+
+
+def make_icon_spec(number: int, rng, game_titles: list) -> tuple:
+    """Описание одной иконки: (вид, имя на рабочем столе, цель/содержимое)."""
+    kind = _choose_kind(rng)
+    word = f"{rng.choice(WORDS)} {number}"
+    if kind == "folder":
+        return kind, word, ""
+    if kind == "program_lnk":
+        exe = rng.choice(PROGRAMS)
+        return kind, f"{os.path.splitext(exe)[0].title()} {number}", f"C:\\Program Files\\{exe[:-4]}\\{exe}"
+    if kind == "game_lnk":
+        title = rng.choice(game_titles) if game_titles else f"game {number}"
+        return kind, title.title(), f"D:\\SteamLibrary\\steamapps\\common\\{title}\\game{number}.exe"
+    if kind == "url":
+        return kind, f"Сайт {number}", rng.choice(URLS).format(n=number)
+    if kind == "document":
+        return kind, word + rng.choice(DOCUMENT_EXTENSIONS), ""
+    if kind == "image":
+        return kind, word + rng.choice(IMAGE_EXTENSIONS), ""
+    if kind == "archive":
+        return kind, word + rng.choice(ARCHIVE_EXTENSIONS), ""
+    if kind == "exe":
+        return kind, f"setup_{number}.exe", ""
+    if kind == "system":
+        return kind, rng.choice(SYSTEM_NAMES), ""
+    return kind, f"{word} без расширения", ""
+
+
+def make_icon_records(count: int, game_titles: list, seed: int = 0) -> list:
+    """
+    Записи в формате icon_info (как их передает get_desktop_icon_info в классификатор,
+    типы - коды ItemType), плюс 'index' и 'coords' для раскладки и планировщика.
+    """
+    rng = random.Random(seed)
+    records = []
+    for number in range(count):
+        kind, name, target = make_icon_spec(number, rng, game_titles)
+        if kind == "folder":
+            record = (name, ItemType.FOLDER, f"C:\\Users\\user\\Desktop\\{name}", ItemType.FOLDER)
+        elif kind in ("program_lnk", "game_lnk"):
+            target_name = target.rsplit("\\", 1)[1]
+            record = (target_name[:-4], ItemType.EXECUTABLE, target, ItemType.SHORTCUT)
+        elif kind == "url":
+            record = (name, ItemType.INTERNET_SHORTCUT, target, ItemType.INTERNET_SHORTCUT)
+        elif kind == "system":
+            record = (name, ItemType.UNKNOWN, "", ItemType.UNKNOWN)
+        elif kind == "unknown":
+            record = (name, ItemType.UNKNOWN, "", ItemType.UNKNOWN)
+        else:
+            stem = os.path.splitext(name)[0]
+            record = (stem, ItemType.FILE, f"C:\\Users\\user\\Desktop\\{name}", ItemType.FILE)
+        classified_name, item_type, full_path, original_type = record
+        records.append({
+            'index': number,
+            'name': classified_name,
+            'type': item_type,
+            'full_path': full_path,
+            'original_icon_name': name,
+            'original_desktop_type': original_type,
+            'coords': (rng.randrange(0, 3800, 4), rng.randrange(0, 2100, 4)),
+        })
+    return records
+
+
+def lnk_bytes(target_path: str) -> bytes:
+    """Минимальный ярлык .lnk (MS-SHLLINK): заголовок и LinkInfo с локальным путем в ANSI."""
+    header = struct.pack("<I16sIIQQQIIIHHII", LNK_HEADER_SIZE, LNK_CLSID.bytes_le, HAS_LINK_INFO, 0x20,
+                         0, 0, 0, 0, 0, 1, 0, 0, 0, 0)
+    volume_id = struct.pack("<IIII", 0x11, 3, 0x1234, 0x10) + b"\0"
+    local_base_path = target_path.encode("cp1252", "replace") + b"\0"
+    header_size = 0x1C
+    volume_offset = header_size
+    path_offset = volume_offset + len(volume_id)
+    suffix_offset = path_offset + len(local_base_path)
+    body = volume_id + local_base_path + b"\0"
+    link_info = struct.pack("<IIIIIII", header_size + len(body), header_size, VOLUME_ID_AND_LOCAL_BASE_PATH,
+                            volume_offset, path_offset, 0, suffix_offset) + body
+    return header + link_info + b"\0\0\0\0"
+
+
+def url_bytes(url: str) -> bytes:
+    return f"[InternetShortcut]\r\nURL={url}\r\n".encode("utf-8")
+
+
+def build_desktop_fixture(folder: str, count: int, game_titles: list, seed: int = 0) -> list:
+    """
+    Создает в folder синтетический рабочий стол из count элементов.
+    Цели ярлыков .lnk создаются в подпапке targets (чтобы os.stat цели находил файл).
+
+    Returns:
+        list: Имена иконок так, как их показывает ListView (ярлыки без расширения).
+    """
+    rng = random.Random(seed)
+    desktop = os.path.join(folder, "Desktop")
+    targets = os.path.join(folder, "targets")
+    os.makedirs(desktop, exist_ok=True)
+    os.makedirs(targets, exist_ok=True)
+    item_names = []
+    for number in range(count):
+        kind, name, target = make_icon_spec(number, rng, game_titles)
+        name = name.replace("/", "_").replace("\\", "_").replace(":", "_")
+        if kind == "folder":
+            os.makedirs(os.path.join(desktop, name), exist_ok=True)
+        elif kind in ("program_lnk", "game_lnk"):
+            target_file = os.path.join(targets, f"{kind}_{number}.exe")
+            with open(target_file, "wb"):
+                pass
+            with open(os.path.join(desktop, name + ".lnk"), "wb") as f:
+                f.write(lnk_bytes(target_file))
+        elif kind == "url":
+            with open(os.path.join(desktop, name + ".url"), "wb") as f:
+                f.write(url_bytes(target))
+        elif kind != "system":
+            with open(os.path.join(desktop, name), "wb"):
+                pass
+        item_names.append(name)
+    return item_names
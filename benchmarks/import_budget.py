@@ -0,0 +1,71 @@
+"""
+Проверка времени импорта ядра (пакет desktop_sort).
+
+Импорт замеряется в отдельных процессах через `python -X importtime` (медиана из --runs запусков),
+дополнительно проверяется, что ни ядро, ни main.py не загружают при импорте pywin32/pywinauto.
+
+    python benchmarks/import_budget.py --budget-ms 100
+Код возврата 1, если бюджет превышен или загружены запрещенные модули.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+DEFAULT_BUDGET_MS = 100.0
+DEFAULT_RUNS = 5
+# Модули, которые не должны загружаться при импорте (Windows-зависимости подгружаются лениво)
+FORBIDDEN_MODULE_PREFIXES = ("win32", "pywinauto", "pythoncom", "pywintypes", "comtypes")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import_ms(module: str) -> float:
+    """Суммарное время импорта module (мс) по данным -X importtime в новом процессе."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    for line in completed.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000.0
+    raise RuntimeError(f"В выводе -X importtime нет строки для модуля '{module}'.")
+
+
+def loaded_forbidden_modules(module: str) -> list:
+    """Запрещенные модули, оказавшиеся в sys.modules после импорта module."""
+    code = (f"import sys, {module}; "
+            f"print('\\n'.join(name for name in sys.modules if name.startswith({FORBIDDEN_MODULE_PREFIXES!r})))")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        # Модуль не импортируется вовсе - это тоже нарушение (например, pywin32 импортируется на уровне модуля)
+        return [f"<ошибка импорта {module}: {completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else completed.returncode}>"]
+    return [name for name in completed.stdout.split() if name]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Проверка времени импорта пакета desktop_sort.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Бюджет на импорт desktop_sort, мс.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Число замеров (берется медиана).")
+    args = parser.parse_args(argv)
+
+    failed = False
+    timings = [measure_import_ms("desktop_sort") for _ in range(max(1, args.runs))]
+    median_ms = statistics.median(timings)
+    verdict = "OK" if median_ms <= args.budget_ms else "ПРЕВЫШЕН"
+    print(f"import desktop_sort: медиана {median_ms:.1f} мс (мин {min(timings):.1f}, макс {max(timings):.1f}), "
+          f"бюджет {args.budget_ms:.0f} мс - {verdict}")
+    failed |= median_ms > args.budget_ms
+
+    for module in ("desktop_sort", "main"):
+        forbidden = loaded_forbidden_modules(module)
+        if forbidden:
+            print(f"import {module}: загружены запрещенные модули: {', '.join(forbidden)}")
+            failed = True
+        else:
+            print(f"import {module}: Windows-зависимости не загружаются - OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
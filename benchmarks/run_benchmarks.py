@@ -0,0 +1,264 @@
+"""
+Бенчмарки классификации, определения типов иконок, каталога названий игр, раскладки и записей об иконках.
+
+Запуск (из корня репозитория, работает и в Linux):
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json --fail-on-regression
+
+Результаты записываются в JSON: для каждого замера лучшее время из --repeat повторов
+и время на элемент. При --baseline выводится сравнение с предыдущим запуском.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from desktop_sort.classifier import IconClassifier, get_icon_category  # noqa: E402
+from desktop_sort.desktop_items import DesktopIndex, determine_item_type  # noqa: E402
+from desktop_sort.layout import compute_layout  # noqa: E402
+from desktop_sort.planner import plan_moves  # noqa: E402
+from desktop_sort.records import IconRecord, IconRecordArray  # noqa: E402
+from desktop_sort.title_catalog import MappedTitleCatalog, build_title_index, load_game_titles  # noqa: E402
+from desktop_sort.title_matcher import GameTitleMatcher  # noqa: E402
+from benchmarks import fixtures  # noqa: E402
+
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_SIZES = "10,1000,10000,100000"
+DEFAULT_CATALOG_SIZES = "41000,200000,1000000"
+# Файлы на диске для determine_item_type создаются только до этого размера
+DEFAULT_MAX_FIXTURE_FILES = 10000
+DEFAULT_REGRESSION_THRESHOLD = 1.25
+SCREEN_INFO = {'logical_resolution': '3840x2160', 'dpi_x': 144, 'dpi_y': 144}
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(function, repeat: int) -> float:
+    """Лучшее время (секунды) из repeat запусков function()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class BenchmarkRun:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results = {}
+
+    def add(self, name: str, items: int, function, repeat: int = None):
+        seconds = measure(function, repeat or self.repeat)
+        self.results[name] = {
+            'items': items,
+            'seconds': seconds,
+            'per_item_us': seconds / items * 1e6 if items else None,
+        }
+        per_item = f", {seconds / items * 1e6:.2f} мкс/элемент" if items else ""
+        print(f"{name:<48} {seconds * 1000:10.2f} мс{per_item}", flush=True)
+
+
+def bench_catalog(run: BenchmarkRun, workdir: str, base_titles: list, catalog_sizes: list):
+    """Загрузка текстового каталога, сборка и открытие бинарного индекса, поиск по названиям."""
+    probes = [title for title in base_titles[:2000]] + [f"{title} launcher" for title in base_titles[:2000]] + \
+             [f"unknown item {n}" for n in range(2000)]
+    for size in catalog_sizes:
+        titles = fixtures.make_game_titles(base_titles, size)
+        source = os.path.join(workdir, f"titles_{size}.txt")
+        index = source + ".idx"
+        fixtures.write_title_catalog(source, titles)
+
+        run.add(f"load_game_titles[{size}]", size, lambda: load_game_titles(source), repeat=1)
+        loaded = load_game_titles(source)
+        run.add(f"GameTitleMatcher.build[{size}]", size, lambda: GameTitleMatcher(loaded), repeat=1)
+        run.add(f"build_title_index[{size}]", size, lambda: build_title_index(source, index), repeat=1)
+        run.add(f"MappedTitleCatalog.open[{size}]", size, lambda: MappedTitleCatalog(index).close())
+
+        matcher = GameTitleMatcher(loaded)
+        catalog = MappedTitleCatalog(index)
+        try:
+            run.add(f"matches_part.memory[{size}]", len(probes), lambda: [matcher.matches_part(p) for p in probes])
+            run.add(f"matches_part.mapped[{size}]", len(probes), lambda: [catalog.matches_part(p) for p in probes])
+        finally:
+            catalog.close()
+
+
+def bench_classification(run: BenchmarkRun, base_titles: list, sizes: list):
+    """
+    get_icon_category на синтетических записях (классификатор компилируется заранее):
+    без кэша результатов и повторный проход с заполненным кэшем в памяти.
+    """
+    classifier = IconClassifier(base_titles, memo_size=0)
+    for size in sizes:
+        records = fixtures.make_icon_records(size, base_titles)
+        run.add(f"get_icon_category[{size}]", size, lambda: [get_icon_category(r, classifier) for r in records])
+        memo_classifier = IconClassifier(base_titles, memo_size=size)
+        for record in records:
+            memo_classifier.classify(record)
+        run.add(f"get_icon_category.memo[{size}]", size, lambda: [get_icon_category(r, memo_classifier) for r in records])
+
+
+def bench_item_types(run: BenchmarkRun, workdir: str, base_titles: list, sizes: list, max_files: int):
+    """determine_item_type по синтетической папке рабочего стола (ярлыки .lnk/.url, файлы, папки)."""
+    for size in sizes:
+        if size > max_files:
+            print(f"determine_item_type[{size}]: пропущено (больше --max-fixture-files={max_files})")
+            continue
+        folder = os.path.join(workdir, f"desktop_{size}")
+        names = fixtures.build_desktop_fixture(folder, size, base_titles)
+        desktop = os.path.join(folder, "Desktop")
+        run.add(f"DesktopIndex.scan[{size}]", size, lambda: DesktopIndex.scan([desktop]))
+        index = DesktopIndex.scan([desktop])
+        run.add(f"determine_item_type[{size}]", size, lambda: [determine_item_type(n, index) for n in names])
+
+
+def bench_layout(run: BenchmarkRun, base_titles: list, sizes: list):
+    """compute_layout и plan_moves для записей с категориями."""
+    classifier = IconClassifier(base_titles)
+    for size in sizes:
+        records = fixtures.make_icon_records(size, base_titles)
+        for record in records:
+            record['category'] = classifier.classify(record)
+        run.add(f"compute_layout[{size}]", size, lambda: compute_layout(records, SCREEN_INFO))
+        layout = compute_layout(records, SCREEN_INFO)
+        run.add(f"plan_moves[{size}]", size, lambda: plan_moves(records, layout), repeat=1)
+
+
+def _allocated_bytes(function) -> int:
+    """Память (байты), которую занимает результат function(), по tracemalloc."""
+    tracemalloc.start()
+    try:
+        result = function()
+        allocated = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def bench_records(run: BenchmarkRun, base_titles: list, sizes: list):
+    """
+    Записи об иконках: словари (прежний формат), IconRecord и IconRecordArray -
+    время создания, чтения полей и память на запись (байт, в поле 'bytes_per_item').
+    """
+    classifier = IconClassifier(base_titles)
+    for size in sizes:
+        records = fixtures.make_icon_records(size, base_titles)
+        rows = [(r['index'], r['original_icon_name'], r['coords'], r['type'], r['full_path'], classifier.classify(r),
+                 r['name'], r['original_desktop_type']) for r in records]
+
+        def make_dicts():
+            return [{'index': i, 'name': n, 'coords': c, 'type': t, 'full_path': p, 'category': k,
+                     'classified_name': cn, 'original_desktop_type': o, 'error': None}
+                    for i, n, c, t, p, k, cn, o in rows]
+
+        def make_records():
+            return [IconRecord(*row) for row in rows]
+
+        for label, build in (("dict", make_dicts), ("IconRecord", make_records),
+                             ("IconRecordArray", lambda: IconRecordArray(make_records()))):
+            run.add(f"records.{label}.create[{size}]", size, build)
+            run.results[f"records.{label}.create[{size}]"]['bytes_per_item'] = _allocated_bytes(build) / max(1, size)
+        dicts = make_dicts()
+        icon_records = make_records()
+        run.add(f"records.dict.read[{size}]", size,
+                lambda: [(d['index'], d['category'], d['coords']) for d in dicts])
+        run.add(f"records.IconRecord.read[{size}]", size,
+                lambda: [(r.index, r.category, r.coords) for r in icon_records])
+        for label in ("dict", "IconRecord", "IconRecordArray"):
+            bytes_per_item = run.results[f"records.{label}.create[{size}]"]['bytes_per_item']
+            print(f"{'records.' + label + '.memory[' + str(size) + ']':<48} {bytes_per_item:10.1f} байт/запись")
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float) -> list:
+    """Печатает сравнение с базовым запуском; возвращает имена замеров, ставших медленнее threshold раз."""
+    regressions = []
+    baseline_results = baseline.get('results', {})
+    print(f"\n{'Замер':<48} {'база, мс':>10} {'сейчас, мс':>10} {'отношение':>10}")
+    for name, result in results.items():
+        base = baseline_results.get(name)
+        if not base or not base.get('seconds'):
+            print(f"{name:<48} {'-':>10} {result['seconds'] * 1000:10.2f} {'новый':>10}")
+            continue
+        ratio = result['seconds'] / base['seconds']
+        marker = "  РЕГРЕССИЯ" if ratio > threshold else ""
+        print(f"{name:<48} {base['seconds'] * 1000:10.2f} {result['seconds'] * 1000:10.2f} {ratio:9.2f}x{marker}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_sizes(value: str) -> list:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки сортировки иконок рабочего стола (синтетические данные).")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Размеры рабочего стола через запятую (по умолчанию {DEFAULT_SIZES}).")
+    parser.add_argument("--catalog-sizes", default=DEFAULT_CATALOG_SIZES,
+                        help=f"Размеры каталога названий игр через запятую (по умолчанию {DEFAULT_CATALOG_SIZES}).")
+    parser.add_argument("--titles", default=os.path.join(REPO_ROOT, "game_titles.txt"), help="Исходный каталог названий игр.")
+    parser.add_argument("--repeat", type=int, default=3, help="Число повторов (берется лучшее время).")
+    parser.add_argument("--max-fixture-files", type=int, default=DEFAULT_MAX_FIXTURE_FILES,
+                        help="Максимальный размер папки рабочего стола на диске для determine_item_type.")
+    parser.add_argument("--only", default="", help="Только группы через запятую: catalog,classify,types,layout,records.")
+    parser.add_argument("--output", help="Файл для результатов в JSON.")
+    parser.add_argument("--baseline", help="JSON предыдущего запуска для сравнения.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Во сколько раз замедление считается регрессией.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Код возврата 1 при регрессиях.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR, format='%(levelname)s: %(message)s')
+    sizes = parse_sizes(args.sizes)
+    catalog_sizes = parse_sizes(args.catalog_sizes)
+    groups = set(filter(None, args.only.split(","))) or {"catalog", "classify", "types", "layout", "records"}
+
+    base_titles = [title for title in load_game_titles(args.titles) if title]
+    run = BenchmarkRun(args.repeat)
+    with tempfile.TemporaryDirectory(prefix="desktop_sort_bench_") as workdir:
+        if "catalog" in groups:
+            bench_catalog(run, workdir, base_titles, catalog_sizes)
+        if "classify" in groups:
+            bench_classification(run, base_titles, sizes)
+        if "types" in groups:
+            bench_item_types(run, workdir, base_titles, sizes, args.max_fixture_files)
+        if "layout" in groups:
+            bench_layout(run, base_titles, sizes)
+        if "records" in groups:
+            bench_records(run, base_titles, sizes)
+
+    document = {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': run.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты записаны в '{args.output}'.")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(run.results, baseline, args.threshold)
+        if regressions:
+            print(f"\nРегрессии ({len(regressions)}): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+Ядро сортировки иконок рабочего стола: классификация, каталог названий игр,
+разбор ярлыков, раскладка и планирование перемещений.
+
+Пакет использует только стандартную библиотеку и импортируется на любой ОС;
+Windows-зависимости (kernel32/user32 через ctypes, COM через pywin32) загружаются
+при первом обращении к ним (listview.Win32ListViewBackend, desktop_items.resolve_lnk_target).
+"""
+from .classifier import IconClassifier, get_classifier, get_icon_category
+from .codes import Category, ItemType
+from .layout import LayoutConfig, compute_layout
+from .planner import plan_moves
+from .records import IconRecord, IconRecordArray
+from .scanner import iter_desktop_icons
+from .title_catalog import LazyTitleCatalog, load_game_titles, open_title_catalog
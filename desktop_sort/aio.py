@@ -0,0 +1,179 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from . import stats
+from .classifier import get_classifier
+from .desktop_items import DesktopIndex, get_desktop_paths, init_com_for_thread
+from .layout import compute_layout
+from .planner import plan_moves
+from .scanner import describe_icon
+
+
+# Одновременных обращений к диску (разрешение ярлыков) при scan()
+DEFAULT_IO_CONCURRENCY = 8
+# Иконок на одну задачу classify_many() (между задачами цикл событий обрабатывает другие события)
+CLASSIFY_CHUNK_SIZE = 512
+
+
+class AsyncDesktopSorter:
+    """
+    Асинхронный интерфейс к чтению, классификации и раскладке иконок для приложений на asyncio.
+
+    Блокирующие операции не выполняются в цикле событий:
+    - обращения к ListView Explorer (DesktopListViewSession) - в отдельном однопоточном
+      исполнителе "desktop-ipc": сессия используется только из этого потока;
+    - определение типов элементов (диск, разбор ярлыков, COM) и классификация - в пуле
+      "desktop-io" из io_concurrency потоков, число одновременных задач ограничено семафором;
+    - в обоих исполнителях COM инициализируется для каждого потока.
+
+    Отмена задачи и timeout (asyncio.TimeoutError) доходят до вызывающего; задачи, еще не
+    начатые в исполнителях, отменяются, уже выполняемые вызовы завершаются в своих потоках.
+
+    Пример:
+        async with AsyncDesktopSorter(DesktopListViewSession(find_hwnd=get_desktop_listview_handle),
+                                      IconClassifier(LazyTitleCatalog())) as sorter:
+            icons = await sorter.scan(timeout=30)
+            plan, moved = await sorter.apply_layout(icons, screen_info)
+    """
+
+    def __init__(self, session, game_titles, shortcut_cache=None, desktop_paths=None,
+                 io_concurrency: int = DEFAULT_IO_CONCURRENCY, timeout: float = None):
+        """
+        Args:
+            session (DesktopListViewSession): Сессия ListView (подключается в потоке "desktop-ipc").
+            game_titles: Список названий игр, каталог или готовый IconClassifier.
+            shortcut_cache (ShortcutResolutionCache, optional): Постоянный кэш разрешения ярлыков.
+            desktop_paths (list, optional): Папки рабочего стола (по умолчанию get_desktop_paths()).
+            io_concurrency (int): Максимум одновременных задач определения типов/классификации.
+            timeout (float, optional): Таймаут по умолчанию (секунды) для scan() и apply_layout().
+        """
+        self.session = session
+        self.classifier = get_classifier(game_titles)
+        self.shortcut_cache = shortcut_cache
+        self.desktop_paths = desktop_paths
+        self.io_concurrency = max(1, io_concurrency)
+        self.timeout = timeout
+        self._ipc_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="desktop-ipc",
+                                                initializer=init_com_for_thread)
+        self._io_executor = ThreadPoolExecutor(max_workers=self.io_concurrency, thread_name_prefix="desktop-io",
+                                               initializer=init_com_for_thread)
+        self._io_semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _run_ipc(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._ipc_executor, functools.partial(function, *args))
+
+    async def _run_io(self, function, *args):
+        # Семафор создается в цикле событий, в котором используется объект
+        if self._io_semaphore is None:
+            self._io_semaphore = asyncio.Semaphore(self.io_concurrency)
+        async with self._io_semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._io_executor, functools.partial(function, *args))
+
+    def _timeout(self, timeout):
+        return self.timeout if timeout is None else timeout
+
+    async def scan(self, timeout: float = None) -> list:
+        """
+        Читает иконки рабочего стола: список записей в формате iter_desktop_icons()
+        (в порядке индексов, с 'error' для иконок, которые не удалось обработать).
+
+        Следующий пакет ListView читается, пока определяются типы иконок текущего.
+        """
+        with stats.timer("aio.scan"):
+            return await asyncio.wait_for(self._scan(), self._timeout(timeout))
+
+    async def _scan(self) -> list:
+        desktop_paths = self.desktop_paths
+        if desktop_paths is None:
+            desktop_paths = await self._run_io(get_desktop_paths)
+        desktop_index = await self._run_io(DesktopIndex.scan, desktop_paths)
+        batches = await self._run_ipc(self.session.iter_snapshot)
+        results = []
+        next_batch = None
+        try:
+            next_batch = asyncio.ensure_future(self._run_ipc(next, batches, None))
+            while True:
+                batch = await next_batch
+                if batch is None:
+                    break
+                next_batch = asyncio.ensure_future(self._run_ipc(next, batches, None))
+                results.extend(await asyncio.gather(*(
+                    self._run_io(describe_icon, index, self._item_name(index, name), coords or (0, 0),
+                                 desktop_index, self.classifier, self.shortcut_cache)
+                    for index, name, coords in batch)))
+        except BaseException:
+            if next_batch is not None:
+                next_batch.cancel()
+            raise
+        finally:
+            # Генератор снимка закрывается в потоке ListView (освобождает удаленный буфер в пуле)
+            await asyncio.shield(self._run_ipc(batches.close))
+            await asyncio.shield(self._run_io(self._flush))
+        return results
+
+    @staticmethod
+    def _item_name(index: int, name) -> str:
+        return name if name is not None else f"Неизвестная иконка {index}"
+
+    def _flush(self):
+        if self.shortcut_cache is not None:
+            self.shortcut_cache.flush()
+        self.classifier.flush()
+
+    async def classify_many(self, icons_info, timeout: float = None) -> list:
+        """
+        Категории (коды Category) для списка icon_info (поля name, type, full_path, original_icon_name,
+        original_desktop_type) в том же порядке. Классификация идет пакетами по
+        CLASSIFY_CHUNK_SIZE в пуле "desktop-io".
+        """
+        icons_info = list(icons_info)
+        chunks = [icons_info[start:start + CLASSIFY_CHUNK_SIZE] for start in range(0, len(icons_info), CLASSIFY_CHUNK_SIZE)]
+        classify = self.classifier.classify
+
+        def classify_chunk(chunk):
+            return [classify(icon_info) for icon_info in chunk]
+
+        results = await asyncio.wait_for(asyncio.gather(*(self._run_io(classify_chunk, chunk) for chunk in chunks)),
+                                         self._timeout(timeout))
+        await self._run_io(self.classifier.flush)
+        return [category for chunk in results for category in chunk]
+
+    async def apply_layout(self, icons_info, screen_info=None, config=None, keep_order: bool = False,
+                           dry_run: bool = False, timeout: float = None) -> tuple:
+        """
+        Рассчитывает раскладку (compute_layout) и план перемещений (plan_moves) в пуле "desktop-io"
+        и применяет его одним DesktopListViewSession.move_many() в потоке ListView.
+
+        Returns:
+            tuple: (MovePlan, {индекс: успех}); при dry_run перемещения не выполняются (пустой словарь).
+        """
+        return await asyncio.wait_for(self._apply_layout(icons_info, screen_info, config, keep_order, dry_run),
+                                      self._timeout(timeout))
+
+    async def _apply_layout(self, icons_info, screen_info, config, keep_order, dry_run) -> tuple:
+        icons_info = [icon for icon in icons_info if icon.get('error') is None]
+        layout = await self._run_io(compute_layout, icons_info, screen_info, config)
+        plan = await self._run_io(functools.partial(plan_moves, icons_info, layout, keep_order=keep_order))
+        if dry_run or not plan.moves:
+            return plan, {}
+        moved = await self._run_ipc(self.session.move_many, plan.moves)
+        failed = sum(1 for ok in moved.values() if not ok)
+        if failed:
+            logging.warning(f"Не удалось переместить иконок: {failed} из {len(moved)}.")
+        return plan, moved
+
+    async def close(self):
+        """Закрывает сессию ListView (в ее потоке) и останавливает исполнители."""
+        try:
+            await self._run_ipc(self.session.close)
+        finally:
+            self._ipc_executor.shutdown(wait=False, cancel_futures=True)
+            self._io_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,209 @@
+"""
+Пакетная классификация без рабочего стола: записи icon_info в формате NDJSON (по одному
+JSON-объекту в строке) из файла или stdin, на выходе те же записи с полем "category"
+(название категории на языке --language или, с --codes, целый код desktop_sort.codes.Category).
+
+    python -m desktop_sort.batch inventory.ndjson -o classified.ndjson --workers 8
+    type inventory.ndjson | python -m desktop_sort.batch > classified.ndjson
+
+Записи читаются и пишутся потоково пакетами по --chunk-size строк; в обработке не больше
+IN_FLIGHT_PER_WORKER пакетов на процесс, поэтому память не зависит от размера входа.
+С --workers N пакеты обрабатываются в N процессах: бинарный индекс названий игр
+строится один раз и открывается каждым процессом через mmap (страницы общие, только чтение).
+Строки, которые не удалось разобрать, выводятся как {"line": N, "error": "..."}.
+Вход и выход - всегда UTF-8 (и для stdin/stdout, независимо от кодировки консоли;
+метка BOM в начале входа пропускается).
+"""
+import argparse
+import io
+import json
+import logging
+import sys
+import time
+from collections import deque
+
+from .classifier import IconClassifier
+from .codes import CATEGORY_NAMES, DEFAULT_LANGUAGE, category_name
+from .title_catalog import default_index_path, open_title_catalog
+
+
+DEFAULT_CHUNK_SIZE = 2000
+IN_FLIGHT_PER_WORKER = 2
+
+# Классификатор процесса-обработчика (создается в _init_worker)
+_worker_classifier = None
+
+
+def _icon_info(record: dict) -> dict:
+    """
+    Запись icon_info для классификатора из записи инвентаря. Обязательно только 'name';
+    отсутствующие поля заполняются так же, как у нераспознанных иконок рабочего стола.
+    """
+    name = record['name']
+    return {
+        'name': name,
+        'type': record.get('type'),
+        'full_path': record.get('full_path'),
+        'original_icon_name': record.get('original_icon_name') or name,
+        'original_desktop_type': record.get('original_desktop_type'), # None - неизвестный тип
+    }
+
+
+def classify_lines(lines: list, first_line: int, classifier, language: str = DEFAULT_LANGUAGE) -> tuple:
+    """
+    Классифицирует пакет строк NDJSON. Категория записывается названием на языке language
+    или, если language равен None, целым кодом.
+
+    Returns:
+        tuple: (текст NDJSON для вывода, число записей, число ошибок).
+    """
+    output = []
+    errors = 0
+    for offset, line in enumerate(lines):
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("запись должна быть JSON-объектом")
+            category = classifier.classify(_icon_info(record))
+            record['category'] = int(category) if language is None else category_name(category, language)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            errors += 1
+            record = {'line': first_line + offset, 'error': f"{type(e).__name__}: {e}"}
+        output.append(json.dumps(record, ensure_ascii=False))
+    output.append("")
+    return "\n".join(output), len(lines), errors
+
+
+def _init_worker(titles_filename: str, index_filename: str):
+    global _worker_classifier
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+    _worker_classifier = IconClassifier(open_title_catalog(titles_filename, index_filename))
+
+
+def _classify_in_worker(lines: list, first_line: int, language) -> tuple:
+    return classify_lines(lines, first_line, _worker_classifier, language)
+
+
+def _iter_chunks(stream, chunk_size: int):
+    """(номер первой строки, список непустых строк) пакетами по chunk_size строк."""
+    chunk = []
+    first_line = 1
+    line_number = 0
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        if not chunk:
+            first_line = line_number
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield first_line, chunk
+            chunk = []
+    if chunk:
+        yield first_line, chunk
+
+
+def classify_stream(input_stream, output_stream, titles_filename: str = "game_titles.txt", workers: int = 1,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, language: str = DEFAULT_LANGUAGE) -> tuple:
+    """
+    Классифицирует записи NDJSON из input_stream и пишет результат в output_stream в том же порядке.
+    language - язык названий категорий (None - целые коды Category).
+
+    Returns:
+        tuple: (число записей, число ошибок).
+    """
+    index_filename = default_index_path(titles_filename)
+    # Индекс строится (или проверяется) один раз здесь; процессы-обработчики только открывают его
+    catalog = open_title_catalog(titles_filename, index_filename)
+    records = 0
+    errors = 0
+    if workers <= 1:
+        classifier = IconClassifier(catalog)
+        try:
+            for first_line, lines in _iter_chunks(input_stream, chunk_size):
+                text, count, failed = classify_lines(lines, first_line, classifier, language)
+                output_stream.write(text)
+                records += count
+                errors += failed
+        finally:
+            if hasattr(catalog, "close"):
+                catalog.close()
+        return records, errors
+    if hasattr(catalog, "close"):
+        catalog.close()
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = deque()
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(titles_filename, index_filename)) as pool:
+        try:
+            for first_line, lines in _iter_chunks(input_stream, chunk_size):
+                if len(pending) >= max_in_flight:
+                    text, count, failed = pending.popleft().result()
+                    output_stream.write(text)
+                    records += count
+                    errors += failed
+                pending.append(pool.submit(_classify_in_worker, lines, first_line, language))
+            while pending:
+                text, count, failed = pending.popleft().result()
+                output_stream.write(text)
+                records += count
+                errors += failed
+        finally:
+            for future in pending:
+                future.cancel()
+    return records, errors
+
+
+def _utf8_stream(stream, **kwargs):
+    """Текстовый поток UTF-8 поверх двоичного буфера stdin/stdout (если буфера нет - сам поток)."""
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        return stream
+    return io.TextIOWrapper(buffer, **kwargs)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетная классификация записей icon_info (NDJSON) без рабочего стола.")
+    parser.add_argument("input", nargs="?", help="Входной файл NDJSON (по умолчанию stdin).")
+    parser.add_argument("-o", "--output", help="Выходной файл NDJSON (по умолчанию stdout).")
+    parser.add_argument("--titles", default="game_titles.txt", help="Каталог названий игр.")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов (1 - в текущем процессе).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Строк в одном пакете.")
+    parser.add_argument("--language", default=DEFAULT_LANGUAGE, choices=sorted(CATEGORY_NAMES),
+                        help="Язык названий категорий.")
+    parser.add_argument("--codes", action="store_true", help="Записывать целые коды категорий вместо названий.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+    # Кодировка консоли (например, cp1251 или cp866 в Windows) не используется: NDJSON всегда в UTF-8
+    input_stream = open(args.input, "r", encoding="utf-8-sig") if args.input else \
+        _utf8_stream(sys.stdin, encoding="utf-8-sig")
+    output_stream = open(args.output, "w", encoding="utf-8", newline="\n") if args.output else \
+        _utf8_stream(sys.stdout, encoding="utf-8", newline="\n")
+    start = time.perf_counter()
+    try:
+        records, errors = classify_stream(input_stream, output_stream, args.titles, max(1, args.workers),
+                                          max(1, args.chunk_size), None if args.codes else args.language)
+    finally:
+        if args.input:
+            input_stream.close()
+        elif input_stream is not sys.stdin:
+            input_stream.detach()
+        if args.output:
+            output_stream.close()
+        else:
+            output_stream.flush()
+            # Буфер stdout остается открытым для sys.stdout
+            if output_stream is not sys.stdout:
+                output_stream.detach()
+    elapsed = time.perf_counter() - start
+    rate = records / elapsed if elapsed > 0 else 0.0
+    print(f"Обработано записей: {records} (ошибок: {errors}) за {elapsed:.2f} с - {rate:,.0f} записей/с, "
+          f"процессов: {max(1, args.workers)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
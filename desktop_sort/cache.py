@@ -0,0 +1,340 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from . import stats
+from .codes import Category, ItemType, category_code, custom_categories, restore_categories
+
+
+# Версия схемы кэша; при изменении формата хранимых значений кэш пересоздается
+SHORTCUT_CACHE_SCHEMA_VERSION = 2
+DEFAULT_SHORTCUT_CACHE_MAX_ENTRIES = 4096
+CLASSIFICATION_CACHE_SCHEMA_VERSION = 3
+DEFAULT_CLASSIFICATION_CACHE_MAX_ENTRIES = 16384
+
+
+def default_cache_dir() -> str:
+    """Папка для кэшей: %LOCALAPPDATA%\\desktop_sort в Windows, ~/.cache/desktop_sort в остальных системах."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "desktop_sort")
+
+
+class _SQLiteStore:
+    """
+    Общая часть постоянных кэшей на SQLite: открытие в режиме WAL, проверка версии схемы
+    (PRAGMA user_version), пересоздание поврежденного файла. Если файл открыть не удалось,
+    кэш отключается (_connection = None) и работает как пустой.
+    Обращения к соединению защищены блокировкой: get()/put() можно вызывать из нескольких потоков.
+    """
+
+    # Переопределяются в подклассах
+    SCHEMA_VERSION = 0
+    SCHEMA = ()
+    DESCRIPTION = "Кэш"
+
+    def __init__(self, filename: str, max_entries: int):
+        self.filename = filename
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.Lock()
+        try:
+            self._connection = self._open()
+        except sqlite3.DatabaseError as e:
+            # Поврежденный файл кэша: удаляем и создаем заново
+            logging.warning(f"{self.DESCRIPTION} '{filename}' поврежден ({e}), он будет пересоздан.")
+            try:
+                os.remove(filename)
+                self._connection = self._open()
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Не удалось пересоздать {self.DESCRIPTION.lower()} '{filename}': {e}. Кэш отключен.")
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Не удалось открыть {self.DESCRIPTION.lower()} '{filename}': {e}. Кэш отключен.")
+
+    def _open(self):
+        if self.filename != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+        connection = sqlite3.connect(self.filename, timeout=5.0, isolation_level=None, check_same_thread=False)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                connection.execute("BEGIN IMMEDIATE")
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+                connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class ShortcutResolutionCache(_SQLiteStore):
+    """
+    Постоянный кэш разрешения ярлыков (.lnk/.url) на диске (SQLite).
+
+    Ключ - путь к файлу ярлыка, значение действительно только при совпадении
+    размера и mtime_ns файла. Хранится кортеж determine_item_type():
+    (имя для классификации, тип, путь/URL, начальный тип); типы - коды ItemType.
+
+    Обращения и новые записи накапливаются в памяти и записываются одной транзакцией
+    в flush()/close(); SQLite гарантирует атомарность записи при параллельных запусках.
+    Размер ограничен max_entries: при превышении удаляются давно не использованные записи (LRU).
+
+    Замечание: изменение самой цели ярлыка (например, удаление программы) при неизменном
+    файле .lnk не сбрасывает запись.
+    """
+
+    SCHEMA_VERSION = SHORTCUT_CACHE_SCHEMA_VERSION
+    SCHEMA = (
+        "DROP TABLE IF EXISTS shortcuts",
+        "CREATE TABLE shortcuts ("
+        " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+        " name TEXT NOT NULL, type INTEGER NOT NULL, full_path TEXT NOT NULL, original_type INTEGER NOT NULL,"
+        " last_used INTEGER NOT NULL)",
+        "CREATE INDEX shortcuts_last_used ON shortcuts(last_used)",
+    )
+    DESCRIPTION = "Кэш ярлыков"
+
+    def __init__(self, filename=None, max_entries: int = DEFAULT_SHORTCUT_CACHE_MAX_ENTRIES):
+        if filename is None:
+            filename = os.path.join(default_cache_dir(), "shortcut_cache.sqlite3")
+        self._pending_puts = {}
+        self._pending_touches = {}
+        super().__init__(filename, max_entries)
+
+    def get(self, path: str, size: int, mtime_ns: int):
+        """Возвращает сохраненный кортеж для неизмененного файла ярлыка или None."""
+        pending = self._pending_puts.get(path)
+        if pending is not None and pending[0] == size and pending[1] == mtime_ns:
+            self.hits += 1
+            if stats.enabled:
+                stats.record_cache("shortcut_cache", True)
+            return pending[2]
+        if self._connection is None:
+            self.misses += 1
+            if stats.enabled:
+                stats.record_cache("shortcut_cache", False)
+            return None
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT size, mtime_ns, name, type, full_path, original_type FROM shortcuts WHERE path = ?",
+                    (path,)).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Ошибка чтения кэша ярлыков: {e}")
+            row = None
+        # Проверка при чтении: запись должна соответствовать текущему файлу и иметь корректный формат
+        result = None
+        if row is not None and row[0] == size and row[1] == mtime_ns:
+            result = self._decode(row[2:])
+        if result is None:
+            self.misses += 1
+            if stats.enabled:
+                stats.record_cache("shortcut_cache", False)
+            return None
+        self.hits += 1
+        if stats.enabled:
+            stats.record_cache("shortcut_cache", True)
+        with self._lock:
+            self._pending_touches[path] = time.time_ns()
+        return result
+
+    @staticmethod
+    def _decode(values: tuple):
+        """Кортеж determine_item_type() из строки таблицы (типы - коды ItemType) или None, если формат неверный."""
+        name, item_type, full_path, original_type = values
+        if not (isinstance(name, str) and isinstance(full_path, str)
+                and isinstance(item_type, int) and isinstance(original_type, int)):
+            return None
+        try:
+            return name, ItemType(item_type), full_path, ItemType(original_type)
+        except ValueError:
+            return None
+
+    def put(self, path: str, size: int, mtime_ns: int, result: tuple):
+        """Запоминает результат determine_item_type() для файла ярлыка (записывается при flush())."""
+        with self._lock:
+            self._pending_puts[path] = (size, mtime_ns, tuple(result))
+
+    def flush(self):
+        """Записывает накопленные изменения одной транзакцией и применяет ограничение размера."""
+        if self._connection is None or not (self._pending_puts or self._pending_touches):
+            return
+        now = time.time_ns()
+        with self._lock:
+            # Потоки разрешения ярлыков продолжают вызывать put()/get(): новые изменения
+            # попадают в свежие словари и будут записаны следующим flush()
+            puts = self._pending_puts
+            touches = self._pending_touches
+            self._pending_puts = {}
+            self._pending_touches = {}
+            try:
+                self._connection.execute("BEGIN IMMEDIATE")
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO shortcuts (path, size, mtime_ns, name, type, full_path, original_type, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(path, size, mtime_ns, name, int(item_type), full_path, int(original_type), now)
+                     for path, (size, mtime_ns, (name, item_type, full_path, original_type)) in puts.items()])
+                self._connection.executemany(
+                    "UPDATE shortcuts SET last_used = ? WHERE path = ?",
+                    [(last_used, path) for path, last_used in touches.items()])
+                self._connection.execute(
+                    "DELETE FROM shortcuts WHERE path IN ("
+                    " SELECT path FROM shortcuts ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,))
+                self._connection.execute("COMMIT")
+            except sqlite3.Error as e:
+                logging.warning(f"Не удалось записать кэш ярлыков '{self.filename}': {e}")
+                try:
+                    self._connection.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+
+class ClassificationCache(_SQLiteStore):
+    """
+    Постоянный кэш результатов классификации (SQLite) для IconClassifier.
+
+    Ключ - отпечаток иконки из IconClassifier.fingerprint(): хеш полей icon_info,
+    версии правил и версии каталога названий игр. При изменении game_titles.txt
+    или правил меняются ключи, а старые записи вытесняются по LRU (max_entries).
+    Категория хранится целым кодом (Category или код категории пользователя).
+    Соответствие название -> код для категорий пользователя хранится в том же файле
+    и восстанавливается при открытии (codes.restore_categories()), поэтому их коды
+    не зависят от порядка регистрации в разных запусках и процессах.
+    Чтение и запись устроены так же, как в ShortcutResolutionCache: новые записи
+    накапливаются в памяти и записываются одной транзакцией в flush()/close().
+    """
+
+    SCHEMA_VERSION = CLASSIFICATION_CACHE_SCHEMA_VERSION
+    SCHEMA = (
+        "DROP TABLE IF EXISTS classifications",
+        "CREATE TABLE classifications ("
+        " key TEXT PRIMARY KEY, category INTEGER NOT NULL, last_used INTEGER NOT NULL)",
+        "CREATE INDEX classifications_last_used ON classifications(last_used)",
+        "DROP TABLE IF EXISTS custom_categories",
+        "CREATE TABLE custom_categories (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    )
+    DESCRIPTION = "Кэш классификации"
+
+    def __init__(self, filename=None, max_entries: int = DEFAULT_CLASSIFICATION_CACHE_MAX_ENTRIES):
+        if filename is None:
+            filename = os.path.join(default_cache_dir(), "classification_cache.sqlite3")
+        self._pending_puts = {}
+        self._pending_touches = {}
+        # Коды категорий пользователя, уже записанные в файл
+        self._saved_categories = set()
+        super().__init__(filename, max_entries)
+        self._restore_categories()
+
+    def _restore_categories(self):
+        """Регистрирует категории пользователя с кодами, сохраненными прежними запусками."""
+        if self._connection is None:
+            return
+        try:
+            with self._lock:
+                rows = self._connection.execute("SELECT code, name FROM custom_categories").fetchall()
+        except sqlite3.Error as e:
+            logging.warning(f"Ошибка чтения категорий из кэша классификации: {e}")
+            return
+        restore_categories(rows)
+        self._saved_categories.update(code for code, _ in rows)
+
+    def _unsaved_categories(self) -> list:
+        return [(code, name) for code, name in custom_categories().items() if code not in self._saved_categories]
+
+    def get(self, key: str):
+        """Возвращает сохраненную категорию для отпечатка иконки или None."""
+        category = self._pending_puts.get(key)
+        if category is not None:
+            self.hits += 1
+            if stats.enabled:
+                stats.record_cache("classification_cache", True)
+            return category
+        row = None
+        if self._connection is not None:
+            try:
+                with self._lock:
+                    row = self._connection.execute(
+                        "SELECT category FROM classifications WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logging.warning(f"Ошибка чтения кэша классификации: {e}")
+        category = None
+        if row is not None and isinstance(row[0], int) and row[0] >= 0:
+            category = category_code(row[0])
+            # Неизвестный код (запись другой версии) считается промахом, а не категорией UNKNOWN
+            if category is Category.UNKNOWN and row[0] != Category.UNKNOWN:
+                category = None
+        if category is None:
+            self.misses += 1
+            if stats.enabled:
+                stats.record_cache("classification_cache", False)
+            return None
+        self.hits += 1
+        if stats.enabled:
+            stats.record_cache("classification_cache", True)
+        with self._lock:
+            self._pending_touches[key] = time.time_ns()
+        return category
+
+    def put(self, key: str, category):
+        """Запоминает категорию для отпечатка иконки (записывается при flush())."""
+        with self._lock:
+            self._pending_puts[key] = category
+
+    def flush(self):
+        """Записывает накопленные изменения одной транзакцией и применяет ограничение размера."""
+        if self._connection is None:
+            return
+        categories = self._unsaved_categories()
+        if not (self._pending_puts or self._pending_touches or categories):
+            return
+        now = time.time_ns()
+        with self._lock:
+            puts = self._pending_puts
+            touches = self._pending_touches
+            self._pending_puts = {}
+            self._pending_touches = {}
+            try:
+                self._connection.execute("BEGIN IMMEDIATE")
+                # При одновременной записи из двух процессов остается первое соответствие
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO custom_categories (code, name) VALUES (?, ?)", categories)
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO classifications (key, category, last_used) VALUES (?, ?, ?)",
+                    [(key, int(category), now) for key, category in puts.items()])
+                self._connection.executemany(
+                    "UPDATE classifications SET last_used = ? WHERE key = ?",
+                    [(last_used, key) for key, last_used in touches.items()])
+                self._connection.execute(
+                    "DELETE FROM classifications WHERE key IN ("
+                    " SELECT key FROM classifications ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,))
+                self._connection.execute("COMMIT")
+                self._saved_categories.update(code for code, _ in categories)
+            except sqlite3.Error as e:
+                logging.warning(f"Не удалось записать кэш классификации '{self.filename}': {e}")
+                try:
+                    self._connection.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
@@ -0,0 +1,451 @@
+import os
+import threading
+from collections import OrderedDict
+
+from . import stats
+from .codes import DEFAULT_LANGUAGE, Category, ItemType, category_code, category_name, item_type_code
+from .path_matcher import PathPrefixMatcher, split_path_components
+from .title_matcher import GameTitleMatcher, KeywordMatcher
+from .url_matcher import SiteMatcher
+
+
+# Версия логики classify(): увеличивать при изменении шагов классификации, чтобы
+# сбросить сохраненные результаты (изменения таблиц правил ниже учитываются автоматически)
+CLASSIFIER_LOGIC_VERSION = 2
+# Размер LRU-кэша результатов в памяти (на один IconClassifier)
+DEFAULT_MEMO_SIZE = 4096
+
+# Коды типов, с которыми сравнивает _classify() (локальные имена: обращение ItemType.X заметно дороже)
+_FOLDER = ItemType.FOLDER
+_SHORTCUT = ItemType.SHORTCUT
+_INTERNET_SHORTCUT = ItemType.INTERNET_SHORTCUT
+_EXECUTABLE = ItemType.EXECUTABLE
+_UNKNOWN_TYPE = ItemType.UNKNOWN
+
+# Поля icon_info, от которых зависит результат classify()
+FINGERPRINT_FIELDS = ('name', 'type', 'full_path', 'original_icon_name', 'original_desktop_type')
+
+# --- Правила классификации (компилируются один раз в IconClassifier) ---
+
+SYSTEM_NAMES_EXACT = ["корзина", "этот компьютер", "мой компьютер", "панель управления", "network", "сеть", "computer", "control panel", "recycle bin"]
+
+# Категории по расширению файла. Порядок важен: при пересечении списков побеждает первый.
+EXTENSION_CATEGORIES = [
+    (Category.DOCUMENTS, [
+        '.txt', '.md', '.log', '.doc', '.docx', '.rtf', '.odt', '.tex', '.json', '.xml',
+        '.yaml', '.ini', '.cfg', '.pdf', '.xls', '.xlsx', '.ppt', '.pptx', '.csv',
+        '.epub', '.mobi'
+    ]),
+    (Category.IMAGES, [
+        '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg', '.tiff', '.webp',
+        '.psd', '.ai', '.raw', '.heic', '.heif'
+    ]),
+    (Category.VIDEO, [
+        '.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mpeg', '.mpg'
+    ]),
+    (Category.AUDIO, [
+        '.mp3', '.wav', '.ogg', '.flac', '.aac', '.m4a', '.wma'
+    ]),
+    (Category.ARCHIVES, [
+        '.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso'
+    ]),
+    (Category.DEVELOPMENT_FILES, [
+        '.py', '.pyw', '.js', '.html', '.css', '.java', '.class', '.cpp', '.c', '.h',
+        '.hpp', '.cs', '.sh', '.bat', '.ps1', '.php', '.rb', '.go', '.swift', '.kt',
+        '.kts', '.sql', '.ipynb', '.jar', '.sln', '.csproj', '.vb', '.ts'
+    ]),
+]
+
+KNOWN_PROGRAM_EXE_STRICT = {
+    "chrome.exe": Category.BROWSERS, "firefox.exe": Category.BROWSERS, "msedge.exe": Category.BROWSERS,
+    "opera.exe": Category.BROWSERS, "iexplore.exe": Category.BROWSERS,
+    "winword.exe": Category.OFFICE, "excel.exe": Category.OFFICE,
+    "powerpnt.exe": Category.OFFICE, "outlook.exe": Category.OFFICE,
+    "libreoffice.exe": Category.OFFICE, "soffice.bin": Category.OFFICE,
+    "pycharm64.exe": Category.DEVELOPMENT, "pycharm.exe": Category.DEVELOPMENT,
+    "idea64.exe": Category.DEVELOPMENT, "idea.exe": Category.DEVELOPMENT,
+    "code.exe": Category.DEVELOPMENT, "devenv.exe": Category.DEVELOPMENT, "atom.exe": Category.DEVELOPMENT,
+    "sublimetext.exe": Category.DEVELOPMENT, "notepad++.exe": Category.DEVELOPMENT,
+    "vlc.exe": Category.MULTIMEDIA, "wmplayer.exe": Category.MULTIMEDIA, "spotify.exe": Category.MULTIMEDIA,
+    "itunes.exe": Category.MULTIMEDIA, "audacity.exe": Category.MULTIMEDIA,
+    "photoshop.exe": Category.GRAPHICS, "gimp-2.10.exe": Category.GRAPHICS, "gimp.exe": Category.GRAPHICS,
+    "blender.exe": Category.GRAPHICS,
+    "obs64.exe": Category.UTILITIES, "obs32.exe": Category.UTILITIES,
+    "utorrent.exe": Category.UTILITIES, "qbittorrent.exe": Category.UTILITIES, "filezilla.exe": Category.UTILITIES,
+    "explorer.exe": Category.SYSTEM, "taskmgr.exe": Category.SYSTEM, "cmd.exe": Category.SYSTEM,
+    "powershell.exe": Category.SYSTEM, "regedit.exe": Category.SYSTEM, "control.exe": Category.SYSTEM,
+    "discord.exe": Category.MESSENGERS, "telegram.exe": Category.MESSENGERS, "skype.exe": Category.MESSENGERS,
+    "zoom.exe": Category.MESSENGERS, "slack.exe": Category.MESSENGERS,
+    "steam.exe": Category.GAME_PLATFORMS, "epicgameslauncher.exe": Category.GAME_PLATFORMS,
+    "battle.net.exe": Category.GAME_PLATFORMS, "origin.exe": Category.GAME_PLATFORMS,
+    "goggalaxy.exe": Category.GAME_PLATFORMS, "ubisoftconnect.exe": Category.GAME_PLATFORMS,
+    "fileweederapp.exe": Category.UTILITIES, "hfs.exe": Category.UTILITIES, "x360ce.exe": Category.UTILITIES,
+    "engine.exe": Category.PROGRAMS # Generic, hopefully caught by game name first
+}
+
+KNOWN_PROGRAM_KEYWORDS_BROADER = {
+    "visual studio", "pycharm", "intellij idea", "android studio",
+    "google chrome", "mozilla firefox", "microsoft edge", "opera browser",
+    "microsoft office", "libreoffice", "openoffice",
+    "adobe photoshop", "adobe illustrator", "adobe premiere", "adobe acrobat",
+    "autodesk autocad", "autodesk maya", "autodesk 3ds max",
+    "obs studio", "vlc media player", "windows media player",
+    "control panel", "панель управления", "диспетчер задач", "task manager",
+    "command prompt", "powershell", "terminal",
+    "steam", "epic games launcher", "battle.net", "origin client", "gog galaxy", "uplay", "ubisoft connect",
+    "utorrent", "bittorrent", "discord", "telegram desktop", "skype", "zoom meetings",
+    "audacity", "blender", "gimp", "notepad++", "sublime text", "vs code",
+    "fileweeder", "http file server"
+}
+
+KNOWN_GAMES_KEYWORDS_STRICT = [
+    "minecraft", "fortnite", "valorant", "league of legends", "dota 2",
+    "counter-strike", "csgo", "cs:go", "cyberpunk 2077", "the witcher", "ведьмак",
+    "grand theft auto", "gta v", "stray", "elden ring", "baldurs gate", "baldurs gate 3",
+    "starcraft", "diablo", "overwatch", "world of warcraft",
+    "call of duty", "battlefield", "apex legends", "genshin impact",
+    "terraria", "stardew valley", "doom", "fallout", "skyrim",
+    "civilization", "sims", "fifa", "nba 2k",
+    "lego® звездные войны™ скайуокер сага", "корсары - гпк rev.3" # From logs, will be lowercased by logic
+]
+
+# Интернет-ярлыки со специальными схемами (проверяются до правил сайтов)
+URL_SCHEME_RULES = {
+    "steam://rungameid/": Category.GAMES, # Steam игры - особый случай
+    "epicgames://": Category.GAMES, # Hypothetical, for Epic Games Launcher if it uses such links
+}
+
+# Известные сайты/сервисы для интернет-ярлыков: хост (совпадает и с поддоменами) или хост/путь
+KNOWN_SITES = {
+    "docs.google.com": Category.ONLINE_DOCUMENTS,
+    "youtube.com": Category.ONLINE_MEDIA, "youtu.be": Category.ONLINE_MEDIA,
+    "github.com": Category.ONLINE_DEVELOPMENT,
+    "figma.com": Category.ONLINE_DESIGN,
+    "drive.google.com": Category.CLOUD_FILES, "onedrive.live.com": Category.CLOUD_FILES, "dropbox.com": Category.CLOUD_FILES,
+    # Можно добавить игровые магазины или страницы игр, если они не через спец. протоколы
+    "store.steampowered.com": Category.GAME_STORES, "epicgames.com/store": Category.GAME_STORES, "gog.com": Category.GAME_STORES,
+}
+
+# Папки игровых библиотек: последовательности компонентов пути в любом месте пути к .exe
+GAME_PATH_INDICATORS = [
+    os.path.join("steam", "steamapps", "common"), # Relative to Program Files or library
+    os.path.join("steamlibrary", "steamapps", "common"),
+    os.path.join("epic games"),
+    os.path.join("gog games"),
+    os.path.join("origin games"),
+    os.path.join("ubisoft", "ubisoft game launcher", "games"),
+    os.path.join("blizzard"),
+    os.path.join("riot games"),
+    os.path.join("my games"),
+    "games", # e.g. D:\Games\
+    "игры"   # e.g. D:\Игры\
+]
+
+# Переменная окружения с дополнительными папками игр пользователя (через os.pathsep), например "D:\;E:\Library"
+GAME_ROOTS_ENVIRON = "DESKTOP_SORT_GAME_ROOTS"
+
+
+class IconClassifier:
+    """
+    Классификатор иконок с правилами, скомпилированными один раз.
+
+    Таблицы расширений и exe-файлов сведены в словари (расширение -> категория,
+    имя exe -> категория), наборы ключевых слов - в KeywordMatcher, а пути игровых
+    библиотек и Program Files - в деревья компонентов пути (PathPrefixMatcher) при создании
+    (переменные окружения читаются один раз).
+    Один экземпляр следует переиспользовать для всех иконок.
+
+    Результат classify() зависит только от полей FINGERPRINT_FIELDS, правил и каталога
+    названий игр, поэтому он запоминается в LRU-кэше в памяти (memo_size записей)
+    и, если передан store (ClassificationCache), на диске - под ключом fingerprint(),
+    включающим версии правил и каталога.
+    """
+
+    def __init__(self, game_titles, environ=None, memo_size: int = DEFAULT_MEMO_SIZE, store=None, sites=None,
+                 game_roots=None):
+        """
+        Args:
+            game_titles: Список названий игр из load_game_titles() или готовый каталог
+                         (GameTitleMatcher, MappedTitleCatalog из open_title_catalog(), LazyTitleCatalog).
+            environ (dict, optional): Переменные окружения для путей Program Files/Windows
+                                      и GAME_ROOTS_ENVIRON. По умолчанию os.environ.
+            memo_size (int): Размер кэша результатов в памяти; 0 отключает кэш.
+            store (ClassificationCache, optional): Постоянный кэш результатов.
+            sites (dict, optional): Дополнительные правила сайтов ("хост" или "хост/путь" -> категория),
+                                    дополняют и переопределяют KNOWN_SITES.
+            game_roots (iterable, optional): Папки игр пользователя (целые диски или библиотеки):
+                                             .exe внутри них считаются играми.
+        """
+        if environ is None:
+            environ = os.environ
+        # Каталоги (GameTitleMatcher, MappedTitleCatalog, LazyTitleCatalog) используются как есть, списки индексируются
+        self.game_titles = game_titles if hasattr(game_titles, "matches_part") else GameTitleMatcher(game_titles)
+
+        self._system_names_exact = frozenset(SYSTEM_NAMES_EXACT)
+        self._extension_categories = {}
+        for category, extensions in EXTENSION_CATEGORIES:
+            for extension in extensions:
+                self._extension_categories.setdefault(extension, category)
+        self._exe_categories = dict(KNOWN_PROGRAM_EXE_STRICT)
+        self._program_keywords = KeywordMatcher(KNOWN_PROGRAM_KEYWORDS_BROADER)
+        # Convert strict game keywords to lowercase once, as they are compared with lowercased names
+        self._game_keywords = KeywordMatcher(keyword.lower() for keyword in KNOWN_GAMES_KEYWORDS_STRICT)
+        # Категории пользователя задаются названиями (или Category) и переводятся в коды
+        user_sites = {rule: category_code(category) for rule, category in (sites or {}).items()}
+        self._site_matcher = SiteMatcher(dict(KNOWN_SITES, **user_sites), URL_SCHEME_RULES)
+
+        # Папки Program Files и System32 - корни путей (сравниваются по компонентам, см. PathPrefixMatcher)
+        self._program_files = PathPrefixMatcher()
+        for root in (environ.get("ProgramFiles", "C:\\Program Files"),
+                     environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)"),
+                     os.path.join(environ.get("WinDir", "C:\\Windows"), "system32")):
+            if root: # Ensure the env variable exists
+                self._program_files.add_root(root, "program_files")
+
+        # Игровые библиотеки - маркеры в любом месте пути, папки игр пользователя - корни.
+        # Steam в Program Files отдельно не нужен: такие пути обрабатываются проверкой Program Files выше по шагам.
+        self._game_paths = PathPrefixMatcher()
+        for indicator in GAME_PATH_INDICATORS:
+            self._game_paths.add_marker(indicator, "game_library")
+        user_game_roots = list(game_roots or ())
+        user_game_roots.extend(root for root in environ.get(GAME_ROOTS_ENVIRON, "").split(os.pathsep) if root.strip())
+        for root in user_game_roots:
+            self._game_paths.add_root(root.strip(), "game_root")
+
+        self.ruleset_version = self._compute_ruleset_version()
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.store = store
+        # Префикс ключей постоянного кэша (версии правил и каталога), вычисляется при первом обращении
+        self._fingerprint_prefix = None
+
+    def _compute_ruleset_version(self) -> str:
+        """Хеш скомпилированных правил (включая пути из переменных окружения) и CLASSIFIER_LOGIC_VERSION."""
+        import hashlib
+        rules = (
+            CLASSIFIER_LOGIC_VERSION,
+            sorted(self._system_names_exact),
+            sorted(self._extension_categories.items()),
+            sorted(self._exe_categories.items()),
+            sorted(KNOWN_PROGRAM_KEYWORDS_BROADER),
+            sorted(keyword.lower() for keyword in KNOWN_GAMES_KEYWORDS_STRICT),
+            self._site_matcher.rules(),
+            self._game_paths.rules(),
+            self._program_files.rules(),
+        )
+        return hashlib.blake2b(repr(rules).encode("utf-8"), digest_size=16).hexdigest()
+
+    def fingerprint(self, icon_info: dict):
+        """
+        Ключ постоянного кэша для icon_info: хеш полей FINGERPRINT_FIELDS, версии правил
+        и версии каталога названий игр. None, если у каталога нет атрибута version.
+        """
+        prefix = self._fingerprint_prefix
+        if prefix is None:
+            catalog_version = getattr(self.game_titles, "version", None)
+            if catalog_version is None:
+                return None
+            prefix = self._fingerprint_prefix = (self.ruleset_version, catalog_version)
+        import hashlib
+        # Типы - целые коды: ключ не зависит от того, пришел тип кодом или названием
+        fields = (icon_info['name'], int(item_type_code(icon_info['type'])), icon_info['full_path'],
+                  icon_info['original_icon_name'], int(item_type_code(icon_info['original_desktop_type'])))
+        return hashlib.blake2b(repr((prefix, fields)).encode("utf-8"), digest_size=16).hexdigest()
+
+    def flush(self):
+        """Записывает накопленные результаты в постоянный кэш (если он задан)."""
+        if self.store is not None:
+            self.store.flush()
+
+    @stats.timed("classifier.classify")
+    def classify(self, icon_info: dict) -> Category:
+        """
+        Определяет категорию иконки на основе ее информации и списка названий игр.
+        Повторные вызовы для тех же полей icon_info берутся из кэша (см. описание класса).
+
+        Типы ('type', 'original_desktop_type') принимаются кодами ItemType или названиями;
+        результат - код Category (или код категории пользователя из правил сайтов),
+        название для вывода - str(категория) или codes.category_name().
+        """
+        item_type = item_type_code(icon_info['type'])
+        original_type = item_type_code(icon_info['original_desktop_type'])
+        if self.memo_size <= 0 and self.store is None:
+            return self._classify(icon_info, item_type, original_type)
+        key = (icon_info['name'], item_type, icon_info['full_path'], icon_info['original_icon_name'], original_type)
+        memo = self._memo
+        with self._memo_lock:
+            category = memo.get(key)
+            if category is not None:
+                memo.move_to_end(key)
+        if stats.enabled:
+            stats.record_cache("classifier_memo", category is not None)
+        if category is not None:
+            return category
+
+        fingerprint = self.fingerprint(icon_info) if self.store is not None else None
+        if fingerprint is not None:
+            category = self.store.get(fingerprint)
+        if category is None:
+            category = self._classify(icon_info, item_type, original_type)
+            if fingerprint is not None:
+                self.store.put(fingerprint, category)
+        if self.memo_size > 0:
+            with self._memo_lock:
+                memo[key] = category
+                if len(memo) > self.memo_size:
+                    memo.popitem(last=False)
+        return category
+
+    def _classify(self, icon_info: dict, item_type: ItemType, original_type: ItemType):
+        """
+        Правила классификации без кэширования.
+        Использует расширенную информацию об иконке, включая оригинальное имя и тип
+        (item_type и original_type - уже разобранные коды 'type' и 'original_desktop_type').
+        """
+        game_titles = self.game_titles
+        # Инициализация переменных из icon_info
+        name_lower = icon_info['name'].lower() # Имя для классификации (например, имя цели ярлыка)
+        path_lower = icon_info['full_path'].lower() if icon_info['full_path'] else ""
+        original_icon_name_lower = icon_info['original_icon_name'].lower()
+
+        file_extension = None
+        if path_lower and item_type is not _FOLDER and \
+           not path_lower.startswith("http") and \
+           not path_lower.startswith("steam:") and \
+           not path_lower.startswith("epicgames:") and \
+           '.' in os.path.basename(path_lower):
+            file_extension = os.path.splitext(os.path.basename(path_lower))[1].lower()
+
+        # 1. Папки
+        if item_type is _FOLDER:
+            return Category.FOLDERS
+
+        # 2. Системные элементы
+        if original_type is _UNKNOWN_TYPE and original_icon_name_lower in self._system_names_exact:
+            return Category.SYSTEM
+
+        # 3. Интернет-ярлыки
+        # Схемы (steam://rungameid/) и сайты (по хосту и его поддоменам, см. SiteMatcher)
+        if original_type is _INTERNET_SHORTCUT:
+            category = self._site_matcher.match(path_lower)
+            if category is not None:
+                return category
+            return Category.INTERNET_LINKS # Общая категория для остальных URL
+
+        # 4. Классификация по расширению файла (используем file_extension)
+        # .exe файлы будут обработаны ниже, чтобы сначала проверить на известные программы/игры
+        if file_extension:
+            category = self._extension_categories.get(file_extension)
+            if category is not None:
+                return category
+
+        # 5. Идентификация известных неигровых программ
+        exe_name = None
+        if file_extension == ".exe" and path_lower:
+            exe_name = os.path.basename(path_lower) # path_lower здесь это resolved path
+            category = self._exe_categories.get(exe_name)
+            if category is not None:
+                return category
+
+        # Проверка по ключевым словам для программ (имя и путь)
+        # name_lower - это resolved name, original_icon_name_lower - это имя иконки на раб. столе
+        for keyword_set in (name_lower, original_icon_name_lower, path_lower):
+            if self._program_keywords.contains_any(keyword_set):
+                return Category.PROGRAMS
+
+        is_exe_target = item_type is _EXECUTABLE or \
+            (original_type is _SHORTCUT and file_extension == ".exe") # Ярлык на .exe
+
+        # Проверка на Program Files или System32 для .exe и ярлыков, указывающих на .exe
+        # (папки пути разбираются один раз и используются и для проверки игровых библиотек ниже)
+        path_folders = split_path_components(path_lower)[:-1] if is_exe_target else None
+        if is_exe_target:
+            if self._program_files.match_components(path_folders):
+                # Исключаем игровые лаунчеры, которые могут быть в Program Files, но уже отнесены к программам
+                # или если игра случайно установлена в Program Files, но её имя есть в game_titles
+                if name_lower in game_titles or original_icon_name_lower in game_titles:
+                    return Category.GAMES # Если игра по названию, но в Program Files
+                return Category.PROGRAMS
+
+        # 6. Идентификация игр (game_titles - индекс названий из файла)
+        # name_lower это resolved name (например, "witcher3.exe" -> "witcher3")
+        # original_icon_name_lower это имя иконки на рабочем столе (например, "Ведьмак 3")
+        if name_lower in game_titles or original_icon_name_lower in game_titles:
+            return Category.GAMES
+        # Partial matches with game_titles (titles longer than 3 characters, see GameTitleMatcher)
+        if game_titles.matches_part(name_lower):
+            return Category.GAMES
+        if game_titles.matches_part(original_icon_name_lower):
+            return Category.GAMES
+
+        if self._game_keywords.contains_any(name_lower) or self._game_keywords.contains_any(original_icon_name_lower):
+            return Category.GAMES
+
+        # Проверка пути для игр (если это .exe или ярлык на .exe)
+        if is_exe_target:
+            if self._game_paths.match_components(path_folders):
+                return Category.GAMES
+
+        # 7. Обработка оставшихся .exe файлов
+        # Если дошли до сюда, и это .exe, то это, скорее всего, программа (не системная, не известная игра)
+        if item_type is _EXECUTABLE or file_extension == ".exe":
+            return Category.PROGRAMS
+
+        # 8. Оставшиеся ярлыки (которые не указывают на известные игры/программы или не были разрешены в .exe)
+        if original_type is _SHORTCUT:
+            return Category.OTHER_SHORTCUTS # Общая категория для неопознанных ярлыков
+
+        # 9. Прочие файлы (если есть расширение, но не подошло под предыдущие категории)
+        if file_extension: # Любой файл с расширением, не классифицированный выше
+            return Category.OTHER_FILES
+
+        # 10. Категория по умолчанию
+        return Category.UNKNOWN # Если ничего не подошло
+
+
+# Кэш последнего созданного классификатора: (названия игр, их версия, IconClassifier).
+# Объект названий удерживается ссылкой, поэтому его id не может быть переиспользован.
+# Версия - количество названий для списков (содержимое не хешируется: это O(n) на каждый вызов)
+# и атрибут version для каталогов (LazyTitleCatalog определяет его по os.stat() без открытия
+# каталога и сбрасывает в close()).
+_classifier_cache = None
+
+
+def _titles_version(game_titles):
+    if isinstance(game_titles, list):
+        return len(game_titles)
+    return getattr(game_titles, "version", None)
+
+
+def get_classifier(game_titles) -> IconClassifier:
+    """
+    Возвращает IconClassifier для переданных названий игр.
+    Классификатор создается один раз и переиспользуется, пока не изменится объект названий
+    или его версия (см. _titles_version). Список, измененный на месте без изменения длины
+    (замена элемента), не распознается: после такого изменения передавайте новый список
+    или создавайте IconClassifier явно.
+    """
+    global _classifier_cache
+    if isinstance(game_titles, IconClassifier):
+        return game_titles
+    version = _titles_version(game_titles)
+    cached = _classifier_cache
+    if cached is not None and cached[0] is game_titles and cached[1] == version:
+        return cached[2]
+    classifier = IconClassifier(game_titles)
+    _classifier_cache = (game_titles, version, classifier)
+    return classifier
+
+
+def get_icon_category(icon_info: dict, game_titles) -> str:
+    """
+    Определяет категорию иконки на основе ее информации и списка названий игр.
+    Обертка над IconClassifier.classify() для совместимости: возвращает название категории
+    на русском ("Игры", "Программы", ...), как до перехода на коды, независимо от set_language().
+    Код категории (Category) возвращает IconClassifier.classify().
+
+    game_titles может быть списком из load_game_titles(), каталогом из open_title_catalog()
+    или готовым IconClassifier (предпочтительно при классификации многих иконок).
+    """
+    return category_name(get_classifier(game_titles).classify(icon_info), DEFAULT_LANGUAGE)
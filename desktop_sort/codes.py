@@ -0,0 +1,335 @@
+import logging
+import threading
+from enum import IntEnum
+
+
+# Язык названий по умолчанию (str() и format() для кодов, category_name(), item_type_name())
+DEFAULT_LANGUAGE = "ru"
+# Коды категорий, добавленных правилами пользователя (register_category), начинаются отсюда
+CUSTOM_CATEGORY_BASE = 1024
+CUSTOM_CATEGORY_LIMIT = 32767
+
+_language = DEFAULT_LANGUAGE
+
+
+class ItemType(IntEnum):
+    """Тип элемента рабочего стола (результат determine_item_type()); название - item_type_name()."""
+
+    UNKNOWN = 0
+    FOLDER = 1
+    FILE = 2
+    SHORTCUT = 3
+    INTERNET_SHORTCUT = 4
+    EXECUTABLE = 5
+    IMAGE = 6
+    TEXT = 7
+    PDF = 8
+
+    def __str__(self) -> str:
+        return item_type_name(self)
+
+    def __format__(self, format_spec: str) -> str:
+        return format(item_type_name(self), format_spec)
+
+
+class Category(IntEnum):
+    """Категория иконки (результат IconClassifier.classify()); название - category_name()."""
+
+    UNKNOWN = 0
+    SYSTEM = 1
+    FOLDERS = 2
+    PROGRAMS = 3
+    GAMES = 4
+    DOCUMENTS = 5
+    IMAGES = 6
+    VIDEO = 7
+    AUDIO = 8
+    ARCHIVES = 9
+    DEVELOPMENT_FILES = 10
+    INTERNET_LINKS = 11
+    OTHER_SHORTCUTS = 12
+    OTHER_FILES = 13
+    BROWSERS = 14
+    OFFICE = 15
+    DEVELOPMENT = 16
+    MULTIMEDIA = 17
+    GRAPHICS = 18
+    UTILITIES = 19
+    MESSENGERS = 20
+    GAME_PLATFORMS = 21
+    ONLINE_DOCUMENTS = 22
+    ONLINE_MEDIA = 23
+    ONLINE_DEVELOPMENT = 24
+    ONLINE_DESIGN = 25
+    CLOUD_FILES = 26
+    GAME_STORES = 27
+
+    def __str__(self) -> str:
+        return category_name(self)
+
+    def __format__(self, format_spec: str) -> str:
+        return format(category_name(self), format_spec)
+
+
+class CustomCategory(int):
+    """Код категории пользователя (register_category()): целое число, str() и format() - название."""
+
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return category_name(self)
+
+    def __format__(self, format_spec: str) -> str:
+        return format(category_name(self), format_spec)
+
+    def __repr__(self) -> str:
+        return f"CustomCategory({int(self)}, {category_name(self)!r})"
+
+
+# --- Названия для вывода: единственная таблица строк (язык -> код -> название) ---
+
+ITEM_TYPE_NAMES = {
+    "ru": {
+        ItemType.UNKNOWN: "неизвестный тип",
+        ItemType.FOLDER: "папка",
+        ItemType.FILE: "файл",
+        ItemType.SHORTCUT: "ярлык",
+        ItemType.INTERNET_SHORTCUT: "интернет-ярлык",
+        ItemType.EXECUTABLE: "исполняемый файл",
+        ItemType.IMAGE: "изображение",
+        ItemType.TEXT: "текстовый файл",
+        ItemType.PDF: "пдф",
+    },
+    "en": {
+        ItemType.UNKNOWN: "unknown type",
+        ItemType.FOLDER: "folder",
+        ItemType.FILE: "file",
+        ItemType.SHORTCUT: "shortcut",
+        ItemType.INTERNET_SHORTCUT: "internet shortcut",
+        ItemType.EXECUTABLE: "executable",
+        ItemType.IMAGE: "image",
+        ItemType.TEXT: "text file",
+        ItemType.PDF: "pdf",
+    },
+}
+
+CATEGORY_NAMES = {
+    "ru": {
+        Category.UNKNOWN: "Неизвестно",
+        Category.SYSTEM: "Системные",
+        Category.FOLDERS: "Папки",
+        Category.PROGRAMS: "Программы",
+        Category.GAMES: "Игры",
+        Category.DOCUMENTS: "Документы",
+        Category.IMAGES: "Изображения",
+        Category.VIDEO: "Видео",
+        Category.AUDIO: "Аудио",
+        Category.ARCHIVES: "Архивы",
+        Category.DEVELOPMENT_FILES: "Файлы разработки",
+        Category.INTERNET_LINKS: "Интернет-ссылки",
+        Category.OTHER_SHORTCUTS: "Ярлыки (Прочее)",
+        Category.OTHER_FILES: "Файлы (Прочее)",
+        Category.BROWSERS: "Браузеры",
+        Category.OFFICE: "Офисные программы",
+        Category.DEVELOPMENT: "Разработка",
+        Category.MULTIMEDIA: "Мультимедиа",
+        Category.GRAPHICS: "Графика и 3D",
+        Category.UTILITIES: "Утилиты",
+        Category.MESSENGERS: "Мессенджеры",
+        Category.GAME_PLATFORMS: "Игровые платформы",
+        Category.ONLINE_DOCUMENTS: "Документы (Онлайн)",
+        Category.ONLINE_MEDIA: "Мультимедиа (Онлайн)",
+        Category.ONLINE_DEVELOPMENT: "Разработка (Онлайн)",
+        Category.ONLINE_DESIGN: "Дизайн (Онлайн)",
+        Category.CLOUD_FILES: "Файлы (Облако)",
+        Category.GAME_STORES: "Игры (Магазин)",
+    },
+    "en": {
+        Category.UNKNOWN: "Unknown",
+        Category.SYSTEM: "System",
+        Category.FOLDERS: "Folders",
+        Category.PROGRAMS: "Programs",
+        Category.GAMES: "Games",
+        Category.DOCUMENTS: "Documents",
+        Category.IMAGES: "Images",
+        Category.VIDEO: "Video",
+        Category.AUDIO: "Audio",
+        Category.ARCHIVES: "Archives",
+        Category.DEVELOPMENT_FILES: "Development files",
+        Category.INTERNET_LINKS: "Internet links",
+        Category.OTHER_SHORTCUTS: "Shortcuts (Other)",
+        Category.OTHER_FILES: "Files (Other)",
+        Category.BROWSERS: "Browsers",
+        Category.OFFICE: "Office",
+        Category.DEVELOPMENT: "Development",
+        Category.MULTIMEDIA: "Multimedia",
+        Category.GRAPHICS: "Graphics and 3D",
+        Category.UTILITIES: "Utilities",
+        Category.MESSENGERS: "Messengers",
+        Category.GAME_PLATFORMS: "Game platforms",
+        Category.ONLINE_DOCUMENTS: "Documents (Online)",
+        Category.ONLINE_MEDIA: "Multimedia (Online)",
+        Category.ONLINE_DEVELOPMENT: "Development (Online)",
+        Category.ONLINE_DESIGN: "Design (Online)",
+        Category.CLOUD_FILES: "Files (Cloud)",
+        Category.GAME_STORES: "Games (Store)",
+    },
+}
+
+# Разбор названий на любом из языков (без учета регистра) -> код
+_ITEM_TYPES_BY_NAME = {}
+for _names in ITEM_TYPE_NAMES.values():
+    for _code, _name in _names.items():
+        _ITEM_TYPES_BY_NAME[_name] = _code
+        _ITEM_TYPES_BY_NAME[_name.lower()] = _code
+_CATEGORIES_BY_NAME = {}
+for _names in CATEGORY_NAMES.values():
+    for _code, _name in _names.items():
+        _CATEGORIES_BY_NAME[_name] = _code
+        _CATEGORIES_BY_NAME[_name.lower()] = _code
+del _names, _code, _name
+
+_ITEM_TYPES_BY_CODE = {int(code): code for code in ItemType}
+_CATEGORIES_BY_CODE = {int(code): code for code in Category}
+
+# Категории пользователя: код -> CustomCategory и код -> название (одно для всех языков)
+_custom_categories = {}
+_custom_category_names = {}
+_registry_lock = threading.Lock()
+
+
+def set_language(language: str):
+    """Язык названий по умолчанию ("ru" или "en"); коды и правила классификации не меняются."""
+    global _language
+    if language not in CATEGORY_NAMES:
+        raise ValueError(f"Неизвестный язык '{language}', доступны: {', '.join(sorted(CATEGORY_NAMES))}.")
+    _language = language
+
+
+def get_language() -> str:
+    return _language
+
+
+def item_type_name(code, language: str = None) -> str:
+    """Название типа элемента для вывода."""
+    names = ITEM_TYPE_NAMES.get(language or _language) or ITEM_TYPE_NAMES[DEFAULT_LANGUAGE]
+    return names.get(code) or ITEM_TYPE_NAMES[DEFAULT_LANGUAGE][ItemType.UNKNOWN]
+
+
+def category_name(code, language: str = None) -> str:
+    """Название категории для вывода (для категорий пользователя - название из его правил)."""
+    if code is None:
+        return None
+    names = CATEGORY_NAMES.get(language or _language) or CATEGORY_NAMES[DEFAULT_LANGUAGE]
+    name = names.get(code)
+    if name is None:
+        name = _custom_category_names.get(code) or f"Категория {int(code)}"
+    return name
+
+
+def item_type_code(value) -> ItemType:
+    """
+    ItemType для кода, названия типа (на любом языке, без учета регистра) или None.
+    Неизвестные коды, названия и None - ItemType.UNKNOWN.
+    """
+    if value.__class__ is ItemType:
+        return value
+    if value is None:
+        return ItemType.UNKNOWN
+    if isinstance(value, int):
+        return _ITEM_TYPES_BY_CODE.get(value, ItemType.UNKNOWN)
+    code = _ITEM_TYPES_BY_NAME.get(value)
+    if code is None:
+        code = _ITEM_TYPES_BY_NAME.get(value.strip().lower(), ItemType.UNKNOWN)
+    return code
+
+
+def _category_key(name: str) -> str:
+    return name.strip().lower()
+
+
+def _probe_code(key: str, attempt: int) -> int:
+    import hashlib
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4, salt=attempt.to_bytes(8, "little")).digest()
+    return CUSTOM_CATEGORY_BASE + int.from_bytes(digest, "little") % (CUSTOM_CATEGORY_LIMIT - CUSTOM_CATEGORY_BASE)
+
+
+def register_category(name: str, code: int = None) -> CustomCategory:
+    """
+    Код для категории, которой нет в Category (например, из правил сайтов пользователя).
+
+    Названия сравниваются без учета регистра и пробелов по краям ("Работа" и " работа " - одна
+    категория, для вывода остается первое написание). Код выводится из хеша названия; если он
+    занят другой категорией, пробуются хеши с солью 1, 2, ... до свободного. Без коллизий код
+    зависит только от названия; чтобы он не зависел от порядка регистрации и при коллизиях,
+    ClassificationCache сохраняет соответствие название -> код и восстанавливает его
+    (restore_categories()) до загрузки правил. code - код из такого сохраненного соответствия.
+    """
+    key = _category_key(name)
+    category = _CATEGORIES_BY_NAME.get(key)
+    if category is not None:
+        return category
+    with _registry_lock:
+        category = _CATEGORIES_BY_NAME.get(key)
+        if category is not None:
+            return category
+        if code is None or not CUSTOM_CATEGORY_BASE <= code < CUSTOM_CATEGORY_LIMIT or code in _custom_categories:
+            for attempt in range(CUSTOM_CATEGORY_LIMIT - CUSTOM_CATEGORY_BASE):
+                code = _probe_code(key, attempt)
+                if code not in _custom_categories:
+                    break
+            else:
+                raise ValueError(f"Нет свободных кодов для категории '{name}'.")
+        category = _custom_categories[code] = CustomCategory(code)
+        _custom_category_names[code] = name.strip()
+        _CATEGORIES_BY_NAME[name] = category
+        _CATEGORIES_BY_NAME[key] = category
+    return category
+
+
+def custom_categories() -> dict:
+    """Зарегистрированные категории пользователя: {код: название}."""
+    return dict(_custom_category_names)
+
+
+def restore_categories(mapping) -> int:
+    """
+    Регистрирует сохраненные пары (код, название) с прежними кодами. Пара пропускается
+    (с предупреждением), если название или код уже заняты по-другому. Возвращает число
+    восстановленных категорий.
+    """
+    restored = 0
+    for code, name in mapping:
+        existing = _CATEGORIES_BY_NAME.get(_category_key(name))
+        if existing is not None:
+            if existing != code:
+                logging.warning(f"Категория '{name}' уже зарегистрирована с кодом {int(existing)}, сохраненный код {code} не используется.")
+            continue
+        if code in _custom_categories:
+            logging.warning(f"Код {code} уже занят категорией '{_custom_category_names[code]}', категория '{name}' получит новый код.")
+            continue
+        register_category(name, code)
+        restored += 1
+    return restored
+
+
+def category_code(value):
+    """
+    Код категории для Category, целого кода или названия (на любом языке, без учета регистра;
+    неизвестное название регистрируется через register_category()). None остается None,
+    неизвестные коды (например, из устаревшего кэша или чужого NDJSON) - Category.UNKNOWN.
+    """
+    if value.__class__ is Category or value is None:
+        return value
+    if isinstance(value, int):
+        if value < CUSTOM_CATEGORY_BASE:
+            return _CATEGORIES_BY_CODE.get(value, Category.UNKNOWN)
+        if value >= CUSTOM_CATEGORY_LIMIT:
+            return Category.UNKNOWN
+        return _custom_categories.get(value) or CustomCategory(value)
+    code = _CATEGORIES_BY_NAME.get(value)
+    if code is None:
+        code = _CATEGORIES_BY_NAME.get(value.strip().lower())
+    if code is None:
+        code = register_category(value)
+    return code
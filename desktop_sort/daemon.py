@@ -0,0 +1,542 @@
+"""
+Резидентный режим: сервис держит скомпилированный классификатор, индекс названий игр
+и кэши открытыми и отвечает на запросы NDJSON через локальный сокет.
+
+Каждая строка запроса - JSON-объект {"id": ..., "op": "...", ...параметры}, ответ -
+одна строка {"id": ..., "ok": true, "result": ...} или {"id": ..., "ok": false, "error": "..."}.
+Операции: ping, classify (records), scan, arrange (dry_run, keep_order), reload, stats, shutdown.
+Типы и категории в ответах - целые коды (desktop_sort.codes.ItemType, Category); клиент командной
+строки выводит их названия (--language).
+
+Адрес по умолчанию: Unix-сокет в папке кэшей (Linux/macOS) или 127.0.0.1:DEFAULT_DAEMON_PORT
+(Windows: именованные каналы требуют pywin32, поэтому используется TCP только на localhost).
+Unix-сокет доступен только владельцу (права файла). TCP-порт открыт всем локальным процессам,
+поэтому при TCP каждый запрос должен содержать "token" - случайный токен запуска, который сервис
+записывает в файл daemon.token в папке кэшей пользователя (DaemonClient читает его сам).
+
+Сервис запускается из main.py (там есть доступ к рабочему столу Windows для scan и arrange),
+этот модуль - клиент командной строки:
+
+    python main.py --serve
+    python -m desktop_sort.daemon classify < records.ndjson
+    python -m desktop_sort.daemon stats
+"""
+import argparse
+import errno
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from . import stats
+from .cache import ClassificationCache, ShortcutResolutionCache, default_cache_dir
+from .classifier import IconClassifier
+from .codes import CATEGORY_NAMES, category_name, item_type_name, set_language
+from .layout import compute_layout
+from .planner import plan_moves
+from .scanner import DEFAULT_RESOLVE_WORKERS, iter_desktop_icons
+from .title_catalog import LazyTitleCatalog, source_version
+
+
+DEFAULT_DAEMON_PORT = 47615
+# Как часто (секунды) проверять, изменился ли файл названий игр
+RELOAD_CHECK_INTERVAL = 2.0
+# Максимальная длина одной строки запроса
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+DEFAULT_CLIENT_TIMEOUT = 60.0
+
+
+class DaemonError(Exception):
+    """Ошибка, которую вернул сервис (ответ с "ok": false)."""
+
+
+def default_token_path() -> str:
+    """Файл с токеном запуска для TCP-адреса (в папке кэшей пользователя)."""
+    return os.path.join(default_cache_dir(), "daemon.token")
+
+
+def _write_private_file(path: str, text: str):
+    """Записывает файл, доступный только владельцу (0600; в Windows - права папки %LOCALAPPDATA%)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(text)
+
+
+def default_address():
+    """Unix-сокет в папке кэшей или ("127.0.0.1", DEFAULT_DAEMON_PORT) там, где AF_UNIX недоступен."""
+    if os.name == "nt" or not hasattr(socket, "AF_UNIX"):
+        return "127.0.0.1", DEFAULT_DAEMON_PORT
+    return os.path.join(default_cache_dir(), "daemon.sock")
+
+
+class DesktopSortService:
+    """
+    Состояние резидентного режима и обработка запросов (без сетевой части, см. create_server()).
+
+    Классификатор с индексом названий игр и кэши создаются один раз. Перед запросами
+    не чаще раза в RELOAD_CHECK_INTERVAL проверяется os.stat() файла названий игр; если
+    файл изменился, классификатор пересобирается и подменяется целиком. Запросы, уже
+    начатые со старым классификатором, дорабатывают с ним; каталог старого классификатора
+    закрывается, когда завершится последний из них.
+
+    Операции scan и arrange доступны, если передан session_factory (например, в main.py -
+    DesktopListViewSession для рабочего стола Windows); обращения к ListView выполняются по одному.
+    """
+
+    def __init__(self, titles_filename: str = "game_titles.txt", session_factory=None, screen_info_provider=None,
+                 shortcut_cache=None, classification_cache=None, workers: int = DEFAULT_RESOLVE_WORKERS):
+        """
+        Args:
+            titles_filename (str): Каталог названий игр.
+            session_factory (callable, optional): Создает DesktopListViewSession для scan/arrange.
+            screen_info_provider (callable, optional): Информация об экране для compute_layout().
+            shortcut_cache (ShortcutResolutionCache, optional): Кэш ярлыков (по умолчанию в папке кэшей).
+            classification_cache (ClassificationCache, optional): Кэш классификации (по умолчанию в папке кэшей).
+            workers (int): Потоков для разрешения ярлыков при scan.
+        """
+        self.titles_filename = titles_filename
+        self.session_factory = session_factory
+        self.screen_info_provider = screen_info_provider
+        self.shortcut_cache = shortcut_cache if shortcut_cache is not None else ShortcutResolutionCache()
+        self.classification_cache = classification_cache if classification_cache is not None else ClassificationCache()
+        self.workers = workers
+        self.started = time.time()
+        self.requests = 0
+        self.reloads = 0
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._next_reload_check = 0.0
+        # Защищает self.classifier, счетчики запросов и классификаторы, занятые запросами
+        self._state_lock = threading.Lock()
+        # Классификатор -> число выполняющихся с ним запросов
+        self._in_flight = {}
+        # Замененные при перезагрузке классификаторы, с которыми еще выполняются запросы
+        self._retired = []
+        self.classifier = self._build_classifier()
+        self._operations = {
+            "ping": self.op_ping,
+            "classify": self.op_classify,
+            "scan": self.op_scan,
+            "arrange": self.op_arrange,
+            "reload": self.op_reload,
+            "stats": self.op_stats,
+        }
+
+    def _build_classifier(self) -> IconClassifier:
+        return IconClassifier(LazyTitleCatalog(self.titles_filename), store=self.classification_cache)
+
+    def _current_titles_version(self) -> str:
+        try:
+            source_stat = os.stat(self.titles_filename)
+        except OSError:
+            return "source:missing"
+        return source_version(source_stat.st_size, source_stat.st_mtime_ns)
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """Пересобирает классификатор, если файл названий игр изменился (или force). True - если пересобран."""
+        now = time.monotonic()
+        if not force and now < self._next_reload_check:
+            return False
+        with self._reload_lock:
+            self._next_reload_check = now + RELOAD_CHECK_INTERVAL
+            old = self.classifier
+            if not force and self._current_titles_version() == old.game_titles.version:
+                return False
+            # Результаты старого классификатора записываются до подмены
+            old.flush()
+            classifier = self._build_classifier()
+            with self._state_lock:
+                self.classifier = classifier
+                busy = old in self._in_flight
+                if busy:
+                    self._retired.append(old)
+            if not busy:
+                old.game_titles.close()
+            self.reloads += 1
+        logging.info(f"Каталог названий игр '{self.titles_filename}' перезагружен (версия {self.classifier.game_titles.version}).")
+        return True
+
+    def _acquire_classifier(self) -> IconClassifier:
+        """Текущий классификатор, занятый запросом до _release_classifier()."""
+        with self._state_lock:
+            classifier = self.classifier
+            self._in_flight[classifier] = self._in_flight.get(classifier, 0) + 1
+        return classifier
+
+    def _release_classifier(self, classifier: IconClassifier):
+        """Освобождает классификатор; каталог замененного классификатора закрывается после последнего запроса."""
+        with self._state_lock:
+            remaining = self._in_flight[classifier] - 1
+            if remaining:
+                self._in_flight[classifier] = remaining
+                return
+            del self._in_flight[classifier]
+            if classifier not in self._retired:
+                return
+            self._retired.remove(classifier)
+        classifier.game_titles.close()
+
+    def handle(self, request) -> dict:
+        """Ответ на один запрос (словарь из строки NDJSON)."""
+        request_id = request.get("id") if isinstance(request, dict) else None
+        with self._state_lock:
+            self.requests += 1
+        if not isinstance(request, dict):
+            return {"id": request_id, "ok": False, "error": "Запрос должен быть JSON-объектом."}
+        operation = self._operations.get(request.get("op"))
+        if operation is None:
+            return {"id": request_id, "ok": False, "error": f"Неизвестная операция: {request.get('op')!r}."}
+        self.maybe_reload()
+        classifier = self._acquire_classifier()
+        try:
+            with stats.timer(f"daemon.{request['op']}"):
+                result = operation(request, classifier)
+        except Exception as e:
+            logging.warning(f"Ошибка при выполнении '{request['op']}': {e}", exc_info=True)
+            return {"id": request_id, "ok": False, "error": str(e) or type(e).__name__}
+        finally:
+            self._release_classifier(classifier)
+        return {"id": request_id, "ok": True, "result": result}
+
+    def op_ping(self, request, classifier) -> dict:
+        return {"uptime_s": round(time.time() - self.started, 3), "pid": os.getpid()}
+
+    def op_classify(self, request, classifier) -> list:
+        """Категории для записей icon_info из request["records"] в том же порядке."""
+        records = request.get("records")
+        if not isinstance(records, list):
+            raise ValueError("Параметр 'records' должен быть списком записей icon_info.")
+        categories = [int(classifier.classify(record)) for record in records]
+        classifier.flush()
+        return categories
+
+    def _ensure_session(self):
+        if self.session_factory is None:
+            raise RuntimeError("Чтение рабочего стола недоступно: сервис запущен без доступа к ListView.")
+        if self._session is None:
+            self._session = self.session_factory()
+        return self._session
+
+    def _scan(self, classifier) -> list:
+        with self._session_lock:
+            session = self._ensure_session()
+            return list(iter_desktop_icons(session, classifier, shortcut_cache=self.shortcut_cache,
+                                           workers=self.workers))
+
+    def op_scan(self, request, classifier) -> list:
+        return [record.to_dict(display_names=False, include_error=True) for record in self._scan(classifier)]
+
+    def op_arrange(self, request, classifier) -> dict:
+        """Чтение, раскладка и перемещение иконок; при "dry_run" только план."""
+        icons_info = [icon for icon in self._scan(classifier) if icon['error'] is None]
+        screen_info = self.screen_info_provider() if self.screen_info_provider is not None else None
+        layout = compute_layout(icons_info, screen_info)
+        plan = plan_moves(icons_info, layout, keep_order=bool(request.get("keep_order")))
+        result = {"icons": len(icons_info), "moves": plan.move_count, "summary": plan.summary(), "failed": 0}
+        if request.get("dry_run") or not plan.moves:
+            return result
+        with self._session_lock:
+            moved = self._ensure_session().move_many(plan.moves)
+        result["failed"] = sum(1 for ok in moved.values() if not ok)
+        return result
+
+    def op_reload(self, request, classifier) -> dict:
+        self.maybe_reload(force=True)
+        return {"reloads": self.reloads, "catalog_version": self.classifier.game_titles.version}
+
+    def op_stats(self, request, classifier) -> dict:
+        return {
+            "uptime_s": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "reloads": self.reloads,
+            "catalog_version": classifier.game_titles.version,
+            "catalog_loaded": classifier.game_titles.loaded,
+            "retired_catalogs": len(self._retired),
+            "ruleset_version": classifier.ruleset_version,
+            "shortcut_cache": {"hits": self.shortcut_cache.hits, "misses": self.shortcut_cache.misses},
+            "classification_cache": {"hits": self.classification_cache.hits, "misses": self.classification_cache.misses},
+            "stats": stats.snapshot(),
+        }
+
+    def close(self):
+        self.classifier.flush()
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        with self._state_lock:
+            classifiers = self._retired + [self.classifier]
+            self._retired = []
+        for classifier in classifiers:
+            classifier.game_titles.close()
+        self.shortcut_cache.close()
+        self.classification_cache.close()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Соединение клиента: запросы и ответы построчно (NDJSON), пока клиент не закроет соединение."""
+
+    def handle(self):
+        service = self.server.service
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "ok": False, "error": f"Некорректный JSON: {e}"}
+            else:
+                if not self._authorized(request):
+                    self._write({"id": request.get("id") if isinstance(request, dict) else None, "ok": False,
+                                 "error": "Неверный или отсутствующий токен сервиса."})
+                    break
+                if isinstance(request, dict) and request.get("op") == "shutdown":
+                    self._write({"id": request.get("id"), "ok": True, "result": None})
+                    # shutdown() ждет завершения serve_forever(), поэтому вызывается из другого потока
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    break
+                response = service.handle(request)
+            self._write(response)
+
+    def _authorized(self, request) -> bool:
+        token = self.server.token
+        if token is None:
+            return True
+        supplied = request.get("token") if isinstance(request, dict) else None
+        return isinstance(supplied, str) and hmac.compare_digest(supplied.encode("utf-8"), token.encode("ascii"))
+
+    def _write(self, response: dict):
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    token = None
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    # В Windows SO_REUSEADDR позволяет другому процессу занять тот же порт, там нужен SO_EXCLUSIVEADDRUSE
+    allow_reuse_address = os.name != "nt"
+    token = None
+
+    def server_bind(self):
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        super().server_bind()
+
+
+def _remove_stale_socket(address: str):
+    """Удаляет файл Unix-сокета, если по нему не отвечает другой запущенный сервис."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+    except ConnectionRefusedError:
+        # Сокет остался от завершившегося процесса
+        os.remove(address)
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, f"Сервис уже запущен и слушает '{address}'.")
+
+
+def create_server(service: DesktopSortService, address=None, token_path: str = None):
+    """
+    Сервер для service: Unix-сокет (address - путь) или TCP (address - (хост, порт)).
+    Файл Unix-сокета создается с правами только для владельца. Оставшийся от прежнего запуска
+    файл удаляется, только если по нему никто не слушает; если сервис уже запущен - OSError.
+    Для TCP создается токен запуска и записывается в token_path (по умолчанию default_token_path())
+    после того, как порт успешно занят.
+    """
+    if address is None:
+        address = default_address()
+    if isinstance(address, str):
+        os.makedirs(os.path.dirname(os.path.abspath(address)), exist_ok=True)
+        if os.path.exists(address):
+            _remove_stale_socket(address)
+        previous_umask = os.umask(0o177)
+        try:
+            server = _UnixServer(address, _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+    else:
+        server = _TCPServer(tuple(address), _RequestHandler)
+        server.token = secrets.token_urlsafe(32)
+        server.token_path = token_path or default_token_path()
+        try:
+            _write_private_file(server.token_path, server.token)
+        except OSError:
+            server.server_close()
+            raise
+    server.service = service
+    return server
+
+
+def serve(service: DesktopSortService, address=None):
+    """Обслуживает запросы до операции shutdown или Ctrl+C; затем закрывает сервис."""
+    try:
+        server = create_server(service, address)
+    except OSError:
+        service.close()
+        raise
+    logging.info(f"Сервис сортировки иконок слушает {server.server_address}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if isinstance(server.server_address, str) and os.path.exists(server.server_address):
+            os.remove(server.server_address)
+        if server.token is not None and os.path.exists(server.token_path):
+            os.remove(server.token_path)
+        service.close()
+
+
+class DaemonClient:
+    """
+    Клиент резидентного режима: одно соединение, запросы выполняются по очереди.
+    Для TCP-адреса токен запуска читается из token_path (по умолчанию default_token_path())
+    и добавляется к каждому запросу.
+
+    Пример:
+        with DaemonClient() as client:
+            categories = client.request("classify", records=[icon_info])
+    """
+
+    def __init__(self, address=None, timeout: float = DEFAULT_CLIENT_TIMEOUT, token_path: str = None):
+        self.address = address if address is not None else default_address()
+        self.timeout = timeout
+        self.token_path = token_path or default_token_path()
+        self._token = None
+        self._socket = None
+        self._file = None
+        self._next_id = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _connect(self):
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            try:
+                with open(self.token_path, encoding="ascii") as f:
+                    self._token = f.read().strip()
+            except OSError as e:
+                logging.warning(f"Не удалось прочитать токен сервиса '{self.token_path}': {e}")
+                self._token = None
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.address if isinstance(self.address, str) else tuple(self.address))
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+        self._file = sock.makefile("rwb")
+
+    def request(self, op: str, **params):
+        """Выполняет операцию op и возвращает ее результат; DaemonError, если сервис вернул ошибку."""
+        if self._socket is None:
+            self._connect()
+        request_id = self._next_id
+        self._next_id += 1
+        message = dict(params, id=request_id, op=op)
+        if self._token is not None:
+            message["token"] = self._token
+        self._file.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline(MAX_REQUEST_BYTES)
+        if not line:
+            self.close()
+            raise ConnectionError("Сервис закрыл соединение.")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error"))
+        return response.get("result")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+def _display_record(record: dict) -> dict:
+    """Запись из ответа scan с названиями типов и категории вместо кодов."""
+    for field in ('type', 'original_desktop_type'):
+        if record.get(field) is not None:
+            record[field] = item_type_name(record[field])
+    if record.get('category') is not None:
+        record['category'] = category_name(record['category'])
+    return record
+
+
+def _parse_address(args):
+    if args.port:
+        return args.host, args.port
+    return args.socket
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Резидентный сервис классификации и раскладки иконок (NDJSON через локальный сокет).")
+    parser.add_argument("--socket", help="Путь к Unix-сокету (по умолчанию в папке кэшей).")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес для TCP (вместе с --port).")
+    parser.add_argument("--port", type=int, help="TCP-порт вместо Unix-сокета.")
+    parser.add_argument("--language", default="ru", choices=sorted(CATEGORY_NAMES), help="Язык названий типов и категорий в выводе.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in ("ping", "stats", "reload", "scan", "shutdown"):
+        subparsers.add_parser(command, help=f"Операция {command}.")
+    subparsers.add_parser("classify", help="Классифицировать записи icon_info из stdin (по одной JSON-записи в строке).")
+    arrange_parser = subparsers.add_parser("arrange", help="Разложить иконки по категориям.")
+    arrange_parser.add_argument("--dry-run", action="store_true", help="Только рассчитать план.")
+    arrange_parser.add_argument("--keep-order", action="store_true", help="Сохранять порядок иконок внутри категорий.")
+    args = parser.parse_args(argv)
+
+    set_language(args.language)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    address = _parse_address(args)
+    with DaemonClient(address) as client:
+        try:
+            if args.command == "classify":
+                records = [json.loads(line) for line in sys.stdin if line.strip()]
+                for category in client.request("classify", records=records):
+                    print(json.dumps(category_name(category), ensure_ascii=False))
+                return 0
+            params = {}
+            if args.command == "arrange":
+                params = {"dry_run": args.dry_run, "keep_order": args.keep_order}
+            result = client.request(args.command, **params)
+        except DaemonError as e:
+            print(f"Ошибка: {e}", file=sys.stderr)
+            return 1
+    if args.command == "scan":
+        for record in result:
+            print(json.dumps(_display_record(record), ensure_ascii=False))
+    elif result is not None:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
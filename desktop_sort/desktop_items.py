@@ -0,0 +1,426 @@
+import configparser # Для работы с файлами .url
+import logging
+import os
+import stat
+
+from . import stats
+from .codes import ItemType
+from .lnk_parser import LnkParseError, read_lnk_target
+
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.ico']
+LNK_TARGET_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico']
+LNK_TARGET_TEXT_EXTENSIONS = ['.txt', '.doc', '.docx', '.rtf', '.odt']
+
+
+def get_desktop_paths() -> list:
+    """Возвращает пути к рабочему столу пользователя и общему рабочему столу."""
+    paths = []
+    try:
+        # Рабочий стол текущего пользователя
+        user_desktop = os.path.join(os.path.expanduser("~"), "Desktop")
+        if os.path.isdir(user_desktop):
+            paths.append(user_desktop)
+    except Exception as e:
+        logging.warning(f"Не удалось определить путь к рабочему столу пользователя: {e}")
+
+    try:
+        # Общий рабочий стол (Public Desktop)
+        public_var = os.environ.get("PUBLIC", None)
+        if public_var:
+            public_desktop = os.path.join(public_var, "Desktop")
+            if os.path.isdir(public_desktop):
+                paths.append(public_desktop)
+        else:  # Попытка найти через стандартный путь, если переменная PUBLIC отсутствует
+            # Этот путь может отличаться в зависимости от системы/языка
+            alt_public_desktop = os.path.join(os.environ.get("SystemDrive", "C:"), r"Users\Public\Desktop")
+            if os.path.isdir(alt_public_desktop):
+                paths.append(alt_public_desktop)
+    except Exception as e:
+        logging.warning(f"Не удалось определить путь к общему рабочему столу: {e}")
+
+    if not paths:
+        logging.warning("Не удалось найти пути к папкам рабочего стола. Определение типов файлов будет ограничено.")
+    return paths
+
+
+class DesktopIndex:
+    """
+    Индекс содержимого папок рабочего стола, построенный одним проходом os.scandir.
+
+    Для каждой папки (в порядке поиска) хранит записи DirEntry по полному имени
+    и по имени без расширения. Тип записи (папка/файл) кэшируется DirEntry,
+    поэтому определение типа иконки сводится к поиску в словарях без обращений к диску.
+    Имена сравниваются через os.path.normcase (без учета регистра в Windows).
+    refresh() перечитывает только папки, у которых изменился mtime.
+    """
+
+    def __init__(self):
+        self.folders = []
+        self._by_name = []  # [(путь папки, {normcase(имя): DirEntry})]
+        self._by_stem = []  # [(путь папки, {normcase(имя без расширения): [DirEntry, ...]})]
+        self._mtimes = []  # mtime_ns папки на момент чтения (None, если stat не удался)
+
+    @classmethod
+    def scan(cls, desktop_paths: list) -> "DesktopIndex":
+        """Строит индекс для списка папок; недоступные папки пропускаются с предупреждением."""
+        index = cls()
+        for folder in desktop_paths:
+            try:
+                index.add_folder(folder)
+            except OSError as e:
+                logging.warning(f"Не удалось прочитать папку рабочего стола '{folder}': {e}")
+        return index
+
+    def add_folder(self, folder: str):
+        """Добавляет содержимое папки в индекс. Ошибки os.scandir пробрасываются."""
+        mtime, by_name, by_stem = self._read_folder(folder)
+        self.folders.append(folder)
+        self._by_name.append((folder, by_name))
+        self._by_stem.append((folder, by_stem))
+        self._mtimes.append(mtime)
+
+    @staticmethod
+    def _read_folder(folder: str):
+        """Читает папку одним os.scandir: (mtime_ns, {имя: DirEntry}, {имя без расширения: [DirEntry, ...]})."""
+        # mtime берется до чтения: изменение во время os.scandir будет замечено следующим refresh()
+        mtime = _folder_mtime(folder)
+        by_name = {}
+        by_stem = {}
+        if stats.enabled:
+            stats.count("syscall.scandir")
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                key = os.path.normcase(entry.name)
+                by_name[key] = entry
+                by_stem.setdefault(os.path.splitext(key)[0], []).append(entry)
+        return mtime, by_name, by_stem
+
+    def refresh(self) -> int:
+        """
+        Перечитывает папки, mtime которых изменился с момента чтения (элементы добавлены,
+        удалены или переименованы). Недоступная папка становится пустой с предупреждением.
+        Изменение содержимого файла mtime папки не меняет: stat ярлыков в DirEntry остается прежним.
+        Возвращает число перечитанных папок.
+        """
+        refreshed = 0
+        for position, folder in enumerate(self.folders):
+            # Пропавшая папка (mtime None) перечитывается один раз, до ее появления снова
+            if _folder_mtime(folder) == self._mtimes[position]:
+                continue
+            try:
+                mtime, by_name, by_stem = self._read_folder(folder)
+            except OSError as e:
+                logging.warning(f"Не удалось перечитать папку рабочего стола '{folder}': {e}")
+                mtime, by_name, by_stem = None, {}, {}
+            self._by_name[position] = (folder, by_name)
+            self._by_stem[position] = (folder, by_stem)
+            self._mtimes[position] = mtime
+            refreshed += 1
+        return refreshed
+
+    def lookup(self, folder_position: int, name: str):
+        """Возвращает DirEntry с именем name в папке с номером folder_position или None."""
+        return self._by_name[folder_position][1].get(os.path.normcase(name))
+
+    def lookup_stem(self, name: str):
+        """
+        Ищет единственный элемент с именем name без расширения
+        (рабочий стол скрывает известные расширения). Возвращает (папка, DirEntry) или (None, None).
+        """
+        key = os.path.normcase(name)
+        for folder, by_stem in self._by_stem:
+            entries = by_stem.get(key)
+            if entries:
+                if len(entries) == 1:
+                    return folder, entries[0]
+                return None, None # Неоднозначно: несколько файлов с таким именем
+        return None, None
+
+    def paths(self) -> list:
+        """Полные пути ко всем элементам индекса."""
+        return [entry.path for _, by_name in self._by_name for entry in by_name.values()]
+
+
+def _folder_mtime(folder: str):
+    """mtime_ns папки или None, если stat не удался."""
+    if stats.enabled:
+        stats.count("syscall.stat")
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _entry_kind(entry) -> ItemType:
+    """Возвращает ItemType.FOLDER, ItemType.FILE или None по кэшированному типу DirEntry."""
+    try:
+        if entry.is_dir():
+            return ItemType.FOLDER
+        if entry.is_file():
+            return ItemType.FILE
+    except OSError:
+        pass
+    return None
+
+
+@stats.timed("shortcuts.resolve_lnk")
+def resolve_lnk_target(lnk_path: str) -> str:
+    """
+    Вспомогательная функция для разрешения цели ярлыка .lnk.
+    Сначала ярлык разбирается напрямую (lnk_parser), WScript.Shell через COM
+    используется только если разбор не дал пути к цели.
+    """
+    if stats.enabled:
+        stats.count("syscall.open")
+    try:
+        target_path = read_lnk_target(lnk_path)
+        if target_path:
+            return target_path
+    except (LnkParseError, OSError) as e:
+        logging.debug(f"Не удалось разобрать ярлык '{lnk_path}' напрямую: {e}. Используется COM.")
+    if stats.enabled:
+        stats.count("shortcuts.com_fallback")
+    return _resolve_lnk_target_com(lnk_path)
+
+
+def _resolve_lnk_target_com(lnk_path: str) -> str:
+    """Разрешение цели ярлыка .lnk через WScript.Shell (COM)."""
+    try:
+        # Импорт win32com.client и pythoncom должен быть здесь,
+        # чтобы избежать глобальных зависимостей, если функция используется отдельно.
+        # Убедитесь, что у вас установлен пакет 'pywin32' (pip install pywin32).
+        import pythoncom
+        from win32com.client import Dispatch
+
+        target_path = ""
+        com_initialized_here = False
+        try:
+            # Попытка инициализировать COM. Если уже инициализирован, это вызовет ошибку.
+            pythoncom.CoInitialize()
+            com_initialized_here = True
+        except pythoncom.com_error as e:
+            # Если COM уже инициализирован (например, -2147417850 = CO_E_ALREADYINITIALIZED)
+            # нам не нужно его инициализировать, и мы не должны его деинициализировать позже.
+            if e.args and e.args[0] == -2147417850:  # RPC_E_CHANGED_MODE or CO_E_ALREADYINITIALIZED
+                pass  # COM уже инициализирован, продолжаем
+            else:
+                raise  # Перевыбросить другие ошибки COM
+
+        try:
+            shell = Dispatch("WScript.Shell")
+            shortcut = shell.CreateShortcut(lnk_path)
+            target_path = shortcut.TargetPath
+        finally:
+            if com_initialized_here:
+                pythoncom.CoUninitialize()  # Деинициализировать только если мы его инициализировали
+
+        return target_path
+    except ImportError:
+        logging.warning(
+            "Модули 'pythoncom' или 'win32com.client' не найдены. Установите 'pywin32' для разрешения ярлыков.")
+        return ""
+    except Exception as e:
+        logging.warning(f"Не удалось разрешить ярлык '{lnk_path}': {e}")
+        return ""
+
+
+def init_com_for_thread():
+    """
+    Инициализирует COM в текущем потоке (initializer для пулов потоков, которые разрешают ярлыки).
+    Тогда CoInitialize в _resolve_lnk_target_com для потока только увеличивает счетчик.
+    Вне Windows и без pywin32 ничего не делает; COM освобождается при завершении потока.
+    """
+    if os.name != "nt":
+        return
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+    except Exception as e:
+        logging.debug(f"Не удалось инициализировать COM в потоке: {e}")
+
+
+@stats.timed("shortcuts.resolve_url")
+def resolve_url_target(url_path: str) -> str:
+    """Вспомогательная функция для извлечения URL из файла .url."""
+    if stats.enabled:
+        stats.count("syscall.open")
+    config = configparser.ConfigParser()
+    try:
+        # Файлы .url часто используют кодировку UTF-16 LE или системную.
+        # Пытаемся сначала UTF-8, потом UTF-16 LE, потом latin-1.
+        try:
+            with open(url_path, 'r', encoding='utf-8') as f:
+                config.read_string(f.read())
+        except UnicodeDecodeError:
+            try:
+                with open(url_path, 'r', encoding='utf-16-le') as f:
+                    config.read_string(f.read())
+            except UnicodeDecodeError:
+                with open(url_path, 'r', encoding='latin-1') as f:
+                    config.read_string(f.read())
+
+        if 'InternetShortcut' in config and 'URL' in config['InternetShortcut']:
+            return config['InternetShortcut']['URL']
+        else:
+            logging.warning(f"Файл .url '{url_path}' не содержит раздел [InternetShortcut] или ключ URL.")
+            return ""
+    except FileNotFoundError:
+        logging.warning(f"Файл .url '{url_path}' не найден.")
+        return ""
+    except configparser.Error as e:
+        logging.warning(f"Ошибка при парсинге файла .url '{url_path}': {e}")
+        return ""
+    except Exception as e:
+        logging.warning(f"Неизвестная ошибка при обработке файла .url '{url_path}': {e}")
+        return ""
+
+
+def _describe_lnk(lnk_path: str, fallback_name: str) -> tuple[str, ItemType, str, ItemType]:
+    """Разрешает ярлык .lnk и возвращает кортеж в формате determine_item_type()."""
+    target_path = resolve_lnk_target(lnk_path)
+    target_stat = None
+    if target_path:
+        if stats.enabled:
+            stats.count("syscall.stat")
+        try:
+            target_stat = os.stat(target_path) # Один вызов вместо exists() + isdir()
+        except (OSError, ValueError):
+            target_stat = None
+    if target_stat is None:
+        # Остается ярлыком, если цель не найдена
+        return fallback_name, ItemType.SHORTCUT, lnk_path, ItemType.SHORTCUT
+    if stat.S_ISDIR(target_stat.st_mode):
+        return os.path.basename(target_path), ItemType.FOLDER, target_path, ItemType.SHORTCUT
+
+    target_name_no_ext, target_ext = os.path.splitext(os.path.basename(target_path))
+    target_ext_lower = target_ext.lower()
+    if target_ext_lower == '.exe': determined_type = ItemType.EXECUTABLE
+    elif target_ext_lower in LNK_TARGET_IMAGE_EXTENSIONS: determined_type = ItemType.IMAGE
+    elif target_ext_lower in LNK_TARGET_TEXT_EXTENSIONS: determined_type = ItemType.TEXT
+    elif target_ext_lower == '.pdf': determined_type = ItemType.PDF
+    else: determined_type = ItemType.FILE
+    return target_name_no_ext, determined_type, target_path, ItemType.SHORTCUT
+
+
+def _describe_url(url_path: str, fallback_name: str) -> tuple[str, ItemType, str, ItemType]:
+    """Читает интернет-ярлык .url и возвращает кортеж в формате determine_item_type()."""
+    target_url = resolve_url_target(url_path)
+    return fallback_name, ItemType.INTERNET_SHORTCUT, target_url if target_url else url_path, ItemType.INTERNET_SHORTCUT
+
+
+def _describe_file(file_path: str) -> tuple[str, ItemType, str, ItemType]:
+    """Определяет тип обычного файла (не ярлыка) по расширению."""
+    name_part, ext_part = os.path.splitext(os.path.basename(file_path))
+    ext_lower = ext_part.lower()
+    if ext_lower in IMAGE_EXTENSIONS:
+        determined_type = ItemType.IMAGE
+    elif ext_lower == '.txt':
+        determined_type = ItemType.TEXT
+    elif ext_lower == '.pdf':
+        determined_type = ItemType.PDF
+    elif ext_lower == '.exe':
+        determined_type = ItemType.EXECUTABLE
+    else:
+        # Остается "файл", если не более специфичный тип
+        return name_part, ItemType.FILE, file_path, ItemType.FILE
+    return name_part, determined_type, file_path, determined_type
+
+
+def _describe_shortcut(describe, entry, shortcut_path: str, fallback_name: str, cache) -> tuple[str, ItemType, str, ItemType]:
+    """
+    Разрешает ярлык через describe (_describe_lnk или _describe_url),
+    используя ShortcutResolutionCache, если он передан.
+    Ключ кэша - путь, размер и mtime_ns файла ярлыка (из кэшированного stat DirEntry).
+    """
+    if cache is None:
+        return describe(shortcut_path, fallback_name)
+    if stats.enabled:
+        stats.count("syscall.stat")
+    try:
+        entry_stat = entry.stat()
+    except OSError:
+        return describe(shortcut_path, fallback_name)
+    cached = cache.get(shortcut_path, entry_stat.st_size, entry_stat.st_mtime_ns)
+    if cached is not None:
+        return cached
+    result = describe(shortcut_path, fallback_name)
+    cache.put(shortcut_path, entry_stat.st_size, entry_stat.st_mtime_ns, result)
+    return result
+
+
+def _describe_entry(full_path: str, entry, kind: ItemType, cache=None) -> tuple[str, ItemType, str, ItemType]:
+    """Описывает найденный на рабочем столе элемент (папку, ярлык или файл)."""
+    if kind == ItemType.FOLDER:
+        return os.path.basename(full_path), ItemType.FOLDER, full_path, ItemType.FOLDER
+    item_stem, ext = os.path.splitext(os.path.basename(full_path))
+    ext_lower = ext.lower()
+    if ext_lower == '.lnk':
+        return _describe_shortcut(_describe_lnk, entry, full_path, item_stem, cache)
+    if ext_lower == '.url':
+        return _describe_shortcut(_describe_url, entry, full_path, item_stem, cache)
+    return _describe_file(full_path)
+
+
+@stats.timed("desktop.determine_item_type")
+def determine_item_type(item_name: str, desktop_index: DesktopIndex, cache=None) -> tuple[str, ItemType, str, ItemType]:
+    """
+    Определяет тип элемента рабочего стола, его полный путь, имя для классификации и начальный тип.
+    Для ярлыков (.lnk) возвращает тип целевого элемента, путь к цели, имя цели и ItemType.SHORTCUT как начальный тип.
+    Для интернет-ярлыков (.url) возвращает ItemType.INTERNET_SHORTCUT, URL, имя .url файла и его же как начальный тип.
+    Возвращает кортеж (имя_для_классификации, тип, полный_путь_или_url_или_пустая_строка, начальный_тип_до_разрешения);
+    типы - коды ItemType (название для вывода - str(тип) или codes.item_type_name()).
+
+    Элементы ищутся в DesktopIndex (по одному проходу os.scandir на папку), поэтому
+    обращения к диску нужны только для разрешения ярлыков. Если передан cache
+    (ShortcutResolutionCache), неизмененные ярлыки не разбираются повторно.
+    """
+    # 1. Поиск на рабочих столах (пользовательском и общем)
+    for position, search_path_dir in enumerate(desktop_index.folders):
+        # A. Проверяем как есть (может быть папка или файл с расширением)
+        entry = desktop_index.lookup(position, item_name)
+        kind = _entry_kind(entry) if entry is not None else None
+        if kind is not None:
+            return _describe_entry(os.path.join(search_path_dir, item_name), entry, kind, cache)
+
+        # B. Ярлык с скрытым расширением .lnk
+        entry = desktop_index.lookup(position, item_name + ".lnk")
+        if entry is not None and _entry_kind(entry) == ItemType.FILE:
+            return _describe_shortcut(_describe_lnk, entry, os.path.join(search_path_dir, item_name + ".lnk"), item_name, cache)
+
+        # C. Интернет-ярлык с скрытым расширением .url
+        entry = desktop_index.lookup(position, item_name + ".url")
+        if entry is not None and _entry_kind(entry) == ItemType.FILE:
+            return _describe_shortcut(_describe_url, entry, os.path.join(search_path_dir, item_name + ".url"), item_name, cache)
+
+    # D. Файл с другим скрытым расширением (например, "Отчет" для "Отчет.pdf")
+    folder, entry = desktop_index.lookup_stem(item_name)
+    if entry is not None:
+        kind = _entry_kind(entry)
+        if kind is not None:
+            return _describe_entry(os.path.join(folder, entry.name), entry, kind, cache)
+
+    # Эвристика, если файл не найден на рабочих столах
+    original_item_name_without_ext, original_item_ext = os.path.splitext(item_name)
+    original_item_ext = original_item_ext.lower()
+    determined_type = ItemType.UNKNOWN
+    final_item_name_for_classification = original_item_name_without_ext if original_item_ext else item_name
+    if original_item_ext == ".lnk":
+        determined_type = ItemType.SHORTCUT
+    elif original_item_ext == ".url":
+        determined_type = ItemType.INTERNET_SHORTCUT
+    elif original_item_ext in IMAGE_EXTENSIONS:
+        determined_type = ItemType.IMAGE
+    elif original_item_ext == '.txt':
+        determined_type = ItemType.TEXT
+    elif original_item_ext == '.pdf':
+        determined_type = ItemType.PDF
+    elif original_item_ext == '.exe':
+        determined_type = ItemType.EXECUTABLE
+    elif original_item_ext: # Любой другой известный расширение
+        determined_type = ItemType.FILE
+    # Если нет расширения и файл не найден (например, "Корзина"), тип остается "неизвестный тип"
+
+    return final_item_name_for_classification, determined_type, "", determined_type
@@ -0,0 +1,227 @@
+import logging
+import re
+
+from . import stats
+from .codes import Category, category_code
+
+
+# Размер ячейки сетки рабочего стола при 100% масштабе (96 DPI), в пикселях
+DEFAULT_DPI = 96.0
+DEFAULT_CELL_WIDTH = 76
+DEFAULT_CELL_HEIGHT = 100
+DEFAULT_MARGIN_X = 2
+DEFAULT_MARGIN_Y = 2
+# Геометрия экрана, если get_windows_screen_info() не вернул данных
+DEFAULT_SCREEN_WIDTH = 1920
+DEFAULT_SCREEN_HEIGHT = 1080
+
+# Порядок зон по умолчанию; категории, которых здесь нет, идут в конце по коду
+DEFAULT_CATEGORY_ORDER = [
+    Category.SYSTEM,
+    Category.FOLDERS,
+    Category.PROGRAMS,
+    Category.GAMES,
+    Category.DOCUMENTS,
+    Category.IMAGES,
+    Category.VIDEO,
+    Category.AUDIO,
+    Category.ARCHIVES,
+    Category.DEVELOPMENT_FILES,
+    Category.INTERNET_LINKS,
+    Category.OTHER_SHORTCUTS,
+    Category.OTHER_FILES,
+    Category.UNKNOWN,
+]
+
+_RESOLUTION_PATTERN = re.compile(r"^\s*(\d+)\s*x\s*(\d+)\s*$")
+
+
+class LayoutConfig:
+    """
+    Параметры раскладки иконок по зонам категорий.
+
+    Размеры ячейки и отступы задаются для 96 DPI и масштабируются по DPI экрана.
+    Иконки заполняют сетку столбцами сверху вниз (как в Windows), если column_major=True,
+    иначе строками слева направо. Каждая зона начинается с нового столбца (строки),
+    между зонами оставляется zone_gap пустых столбцов (строк); если с промежутками зоны
+    не помещаются на экран, промежутки не оставляются.
+    """
+
+    def __init__(self, category_order=None, cell_width: int = DEFAULT_CELL_WIDTH,
+                 cell_height: int = DEFAULT_CELL_HEIGHT, margin_x: int = DEFAULT_MARGIN_X,
+                 margin_y: int = DEFAULT_MARGIN_Y, zone_gap: int = 1, column_major: bool = True,
+                 sort_key=None):
+        """
+        Args:
+            category_order (list, optional): Порядок зон (коды Category или названия категорий).
+            cell_width, cell_height (int): Размер ячейки при 96 DPI.
+            margin_x, margin_y (int): Отступ сетки от края экрана при 96 DPI.
+            zone_gap (int): Число пустых столбцов (строк) между зонами.
+            column_major (bool): Заполнять столбцами (True) или строками (False).
+            sort_key (callable, optional): Ключ сортировки иконок внутри зоны
+                      (по умолчанию имя без учета регистра).
+        """
+        self.category_order = [category_code(category) for category in category_order] \
+            if category_order is not None else list(DEFAULT_CATEGORY_ORDER)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.margin_x = margin_x
+        self.margin_y = margin_y
+        self.zone_gap = max(0, zone_gap)
+        self.column_major = column_major
+        self.sort_key = sort_key or _default_sort_key
+
+
+def _default_sort_key(record: dict):
+    return (str(record.get('name', '')).casefold(), record.get('index', 0))
+
+
+class ScreenGeometry:
+    """Размер рабочей области в пикселях и DPI (из get_windows_screen_info())."""
+
+    def __init__(self, width: int = DEFAULT_SCREEN_WIDTH, height: int = DEFAULT_SCREEN_HEIGHT,
+                 dpi_x: float = DEFAULT_DPI, dpi_y: float = DEFAULT_DPI):
+        self.width = width
+        self.height = height
+        self.dpi_x = dpi_x or DEFAULT_DPI
+        self.dpi_y = dpi_y or DEFAULT_DPI
+
+    @classmethod
+    def from_screen_info(cls, screen_info):
+        """
+        Создает геометрию из словаря get_windows_screen_info().
+
+        Используется 'logical_resolution': процесс переводится в режим Per-Monitor DPI Aware
+        до GetSystemMetrics, поэтому это разрешение совпадает с координатами ListView.
+        """
+        if not screen_info:
+            logging.warning(f"Нет информации об экране, используется {DEFAULT_SCREEN_WIDTH}x{DEFAULT_SCREEN_HEIGHT} при {DEFAULT_DPI:g} DPI.")
+            return cls()
+        match = _RESOLUTION_PATTERN.match(str(screen_info.get('logical_resolution', '')))
+        if match:
+            width, height = int(match.group(1)), int(match.group(2))
+        else:
+            logging.warning(f"Не удалось разобрать разрешение '{screen_info.get('logical_resolution')}', используется {DEFAULT_SCREEN_WIDTH}x{DEFAULT_SCREEN_HEIGHT}.")
+            width, height = DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT
+        return cls(width, height, screen_info.get('dpi_x') or DEFAULT_DPI, screen_info.get('dpi_y') or DEFAULT_DPI)
+
+
+class LayoutZone:
+    """
+    Зона одной категории: иконки (индексы ListView) и их целевые позиции в порядке заполнения.
+    category - код категории (Category), название для вывода - str(zone.category).
+    """
+
+    def __init__(self, category, first_line: int):
+        self.category = category
+        self.first_line = first_line  # Первый столбец (или строка) зоны
+        self.line_count = 0
+        self.indices = []
+        self.positions = []
+
+    def __len__(self):
+        return len(self.indices)
+
+
+class Layout:
+    """
+    Результат раскладки.
+
+    positions - словарь {индекс иконки: (x, y)}, zones - зоны в порядке размещения.
+    cell_width/cell_height - размер ячейки в пикселях после масштабирования по DPI.
+    overflow - число иконок, не поместившихся в экран (размещаются за его правым/нижним краем).
+    """
+
+    def __init__(self, zones, positions, cell_width: int, cell_height: int, origin_x: int, origin_y: int, overflow: int):
+        self.zones = zones
+        self.positions = positions
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.overflow = overflow
+
+    def cell_of(self, x: int, y: int):
+        """Ячейка сетки (столбец, строка), ближайшая к точке (x, y)."""
+        return (round((x - self.origin_x) / self.cell_width), round((y - self.origin_y) / self.cell_height))
+
+    def __len__(self):
+        return len(self.positions)
+
+
+@stats.timed("layout.compute")
+def compute_layout(icons_info: list, screen_info=None, config: LayoutConfig = None) -> Layout:
+    """
+    Вычисляет целевые позиции всех иконок: каждая категория в своей зоне сетки.
+
+    Args:
+        icons_info (list): Записи get_desktop_icon_info() (используются 'index', 'name', 'category').
+        screen_info (dict | ScreenGeometry, optional): Результат get_windows_screen_info() или готовая геометрия.
+        config (LayoutConfig, optional): Параметры раскладки.
+
+    Returns:
+        Layout: Целевые позиции и зоны. Сложность O(n log n) (сортировка внутри зон).
+    """
+    config = config or LayoutConfig()
+    screen = screen_info if isinstance(screen_info, ScreenGeometry) else ScreenGeometry.from_screen_info(screen_info)
+
+    scale_x = screen.dpi_x / DEFAULT_DPI
+    scale_y = screen.dpi_y / DEFAULT_DPI
+    cell_width = max(1, round(config.cell_width * scale_x))
+    cell_height = max(1, round(config.cell_height * scale_y))
+    origin_x = round(config.margin_x * scale_x)
+    origin_y = round(config.margin_y * scale_y)
+
+    # Сколько ячеек помещается в столбце (строке) и сколько столбцов (строк) на экране
+    rows = max(1, (screen.height - origin_y) // cell_height)
+    columns = max(1, (screen.width - origin_x) // cell_width)
+    per_line, line_limit = (rows, columns) if config.column_major else (columns, rows)
+
+    # Группировка по кодам категорий; названия (записи из JSON и т.п.) переводятся в коды один раз на группу
+    groups = {}
+    for record in icons_info:
+        groups.setdefault(record.get('category'), []).append(record)
+    coded_groups = {}
+    for category, members in groups.items():
+        code = Category.UNKNOWN if category is None else category_code(category)
+        coded_groups.setdefault(code, []).extend(members)
+    groups = coded_groups
+
+    rank = {category: position for position, category in enumerate(config.category_order)}
+    ordered_categories = sorted(groups, key=lambda category: (rank.get(category, len(rank)), int(category)))
+
+    # Если зоны с промежутками не помещаются на экран, промежутки убираются: иконки за краем экрана
+    # (их не видно, пока не уменьшить масштаб) - только если не хватает места и без них
+    zone_gap = config.zone_gap
+    needed_lines = sum(-(-len(members) // per_line) for members in groups.values())
+    if zone_gap and needed_lines + zone_gap * (len(groups) - 1) > line_limit:
+        logging.info(f"Зоны с промежутками не помещаются на экран ({line_limit} линий), промежутки между зонами убраны.")
+        zone_gap = 0
+
+    zones = []
+    positions = {}
+    overflow = 0
+    line = 0
+    for category in ordered_categories:
+        members = sorted(groups[category], key=config.sort_key)
+        zone = LayoutZone(category, line)
+        for slot, record in enumerate(members):
+            zone_line, offset = divmod(slot, per_line)
+            if config.column_major:
+                column, row = line + zone_line, offset
+            else:
+                column, row = offset, line + zone_line
+            if line + zone_line >= line_limit:
+                overflow += 1
+            position = (origin_x + column * cell_width, origin_y + row * cell_height)
+            zone.indices.append(record['index'])
+            zone.positions.append(position)
+            positions[record['index']] = position
+        zone.line_count = -(-len(members) // per_line)
+        zones.append(zone)
+        line += zone.line_count + zone_gap
+
+    if overflow:
+        logging.warning(f"{overflow} иконок не помещаются на экран {screen.width}x{screen.height} и будут размещены за его краем.")
+
+    return Layout(zones, positions, cell_width, cell_height, origin_x, origin_y, overflow)
@@ -0,0 +1,695 @@
+import ctypes
+import logging
+import struct
+from ctypes import wintypes
+
+from . import stats
+
+
+# --- Определение структур Windows API с помощью ctypes ---
+
+# Константы для VirtualAllocEx
+MEM_COMMIT = 0x1000
+MEM_RESERVE = 0x2000
+MEM_RELEASE = 0x8000
+PAGE_READWRITE = 0x04
+
+# Права доступа к процессу (win32con.PROCESS_*)
+PROCESS_VM_OPERATION = 0x0008
+PROCESS_VM_READ = 0x0010
+PROCESS_VM_WRITE = 0x0020
+PROCESS_QUERY_INFORMATION = 0x0400
+
+LVM_FIRST = 0x1000
+LVM_GETITEMCOUNT = LVM_FIRST + 4
+LVM_GETITEMTEXTW = LVM_FIRST + 75
+LVM_GETITEMPOSITION = LVM_FIRST + 16
+LVM_SETITEMPOSITION = LVM_FIRST + 15
+LVM_SETITEMPOSITION32 = LVM_FIRST + 49
+
+WM_SETREDRAW = 0x000B
+
+LVIF_TEXT = 0x0001 # Флаг для LVITEM.mask, чтобы указать, что нужен текст
+
+TEXT_BUFFER_MAX_CHARS = 256
+# Сколько элементов читается за один проход (одна удаленная область памяти и один ReadProcessMemory)
+DEFAULT_SNAPSHOT_BATCH_SIZE = 256
+
+
+# Структура LVITEM (ListView Item) для получения текста
+class LVITEM(ctypes.Structure):
+    _fields_ = [
+        ("mask", wintypes.UINT),
+        ("iItem", wintypes.INT),
+        ("iSubItem", wintypes.INT),
+        ("state", wintypes.UINT),
+        ("stateMask", wintypes.UINT),
+        ("pszText", wintypes.LPWSTR),  # LPWSTR для Unicode (wide string)
+        ("cchTextMax", wintypes.INT),
+        ("iImage", wintypes.INT),
+        ("lParam", wintypes.LPARAM),
+        ("iIndent", wintypes.INT),
+        ("iGroupId", wintypes.INT),
+        ("cColumns", wintypes.UINT),
+        ("puColumns", ctypes.POINTER(wintypes.UINT)),
+        ("piColFmt", ctypes.POINTER(wintypes.INT)),
+        ("iGroup", wintypes.INT),
+    ]
+
+
+# Структура POINT для получения координат
+class POINT(ctypes.Structure):
+    _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
+
+
+LVITEM_SIZE = ctypes.sizeof(LVITEM)
+POINT_SIZE = ctypes.sizeof(POINT)
+_POINTER = struct.Struct("<Q" if ctypes.sizeof(ctypes.c_void_p) == 8 else "<I")
+
+
+class ListViewBackend:
+    """
+    Доступ к SysListView32 в другом процессе (Explorer).
+
+    Определяет минимальный набор операций, через которые работает чтение иконок:
+    выделение и освобождение памяти в процессе, запись/чтение этой памяти и отправка сообщений.
+    Реализации: Win32ListViewBackend (настоящий рабочий стол) и FakeListViewBackend (в памяти, для Linux).
+    """
+
+    def alloc(self, size: int) -> int:
+        """Выделяет память в процессе ListView и возвращает ее адрес (0 при ошибке)."""
+        raise NotImplementedError
+
+    def free(self, address: int):
+        raise NotImplementedError
+
+    def write(self, address: int, data: bytes) -> bool:
+        raise NotImplementedError
+
+    def read(self, address: int, size: int):
+        """Читает size байт из процесса ListView; возвращает bytes или None при ошибке."""
+        raise NotImplementedError
+
+    def send_message(self, message: int, wparam: int, lparam: int) -> int:
+        raise NotImplementedError
+
+    def last_error(self) -> str:
+        """Текст последней ошибки (для логирования)."""
+        return "N/A"
+
+    def item_count(self) -> int:
+        return self.send_message(LVM_GETITEMCOUNT, 0, 0)
+
+    def is_alive(self) -> bool:
+        """Дешевая проверка, что окно ListView и его процесс все еще существуют."""
+        return True
+
+    def invalidate(self):
+        """Запрашивает одну полную перерисовку окна ListView."""
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_win32 = None
+
+
+def _load_win32():
+    """Загружает kernel32/user32 и задает сигнатуры функций (только в Windows, при первом использовании)."""
+    global _win32
+    if _win32 is None:
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        user32 = ctypes.WinDLL('user32', use_last_error=True)
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        kernel32.VirtualAllocEx.restype = wintypes.LPVOID
+        kernel32.VirtualAllocEx.argtypes = [wintypes.HANDLE, wintypes.LPVOID, ctypes.c_size_t, wintypes.DWORD, wintypes.DWORD]
+        kernel32.VirtualFreeEx.argtypes = [wintypes.HANDLE, wintypes.LPVOID, ctypes.c_size_t, wintypes.DWORD]
+        kernel32.WriteProcessMemory.argtypes = [wintypes.HANDLE, wintypes.LPVOID, wintypes.LPCVOID, ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)]
+        kernel32.ReadProcessMemory.argtypes = [wintypes.HANDLE, wintypes.LPCVOID, wintypes.LPVOID, ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        user32.SendMessageW.restype = wintypes.LPARAM
+        user32.SendMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        user32.IsWindow.argtypes = [wintypes.HWND]
+        user32.InvalidateRect.argtypes = [wintypes.HWND, wintypes.LPVOID, wintypes.BOOL]
+        user32.UpdateWindow.argtypes = [wintypes.HWND]
+        _win32 = (kernel32, user32)
+    return _win32
+
+
+class Win32ListViewBackend(ListViewBackend):
+    """ListViewBackend для окна SysListView32 процесса Explorer (kernel32/user32 через ctypes)."""
+
+    def __init__(self, hwnd_listview: int):
+        """
+        Raises:
+            OSError: не удалось определить процесс окна или открыть его.
+        """
+        self._kernel32, self._user32 = _load_win32()
+        self.hwnd = hwnd_listview
+        pid = wintypes.DWORD()
+        self._user32.GetWindowThreadProcessId(hwnd_listview, ctypes.byref(pid))
+        self.process_id = pid.value
+        if not self.process_id:
+            raise OSError(f"Не удалось получить PID для HWND {hwnd_listview}.")
+        if stats.enabled:
+            stats.count("ipc.open_process")
+        self._h_process = self._kernel32.OpenProcess(
+            PROCESS_VM_OPERATION | PROCESS_VM_READ | PROCESS_VM_WRITE | PROCESS_QUERY_INFORMATION,
+            False,
+            self.process_id
+        )
+        if not self._h_process:
+            error_code = ctypes.get_last_error()
+            raise OSError(
+                f"Не удалось открыть процесс {self.process_id}. Ошибка Windows API: {error_code} - {ctypes.FormatError(error_code)}. "
+                f"Попробуйте запустить скрипт с правами администратора.")
+
+    def alloc(self, size: int) -> int:
+        if stats.enabled:
+            stats.count("ipc.alloc")
+        return self._kernel32.VirtualAllocEx(self._h_process, None, size, MEM_COMMIT | MEM_RESERVE, PAGE_READWRITE) or 0
+
+    def free(self, address: int):
+        self._kernel32.VirtualFreeEx(self._h_process, address, 0, MEM_RELEASE)
+
+    def write(self, address: int, data: bytes) -> bool:
+        if stats.enabled:
+            stats.count("ipc.write")
+            stats.count("ipc.write_bytes", len(data))
+        written = ctypes.c_size_t()
+        return bool(self._kernel32.WriteProcessMemory(self._h_process, address, data, len(data), ctypes.byref(written)))
+
+    def read(self, address: int, size: int):
+        if stats.enabled:
+            stats.count("ipc.read")
+            stats.count("ipc.read_bytes", size)
+        buffer = ctypes.create_string_buffer(size)
+        read = ctypes.c_size_t()
+        if not self._kernel32.ReadProcessMemory(self._h_process, address, buffer, size, ctypes.byref(read)):
+            return None
+        return buffer.raw[:read.value]
+
+    def send_message(self, message: int, wparam: int, lparam: int) -> int:
+        if stats.enabled:
+            stats.count("ipc.send_message")
+        return self._user32.SendMessageW(self.hwnd, message, wparam, lparam)
+
+    def is_alive(self) -> bool:
+        # После перезапуска Explorer HWND становится недействительным или принадлежит другому процессу
+        if not self._h_process or not self._user32.IsWindow(self.hwnd):
+            return False
+        pid = wintypes.DWORD()
+        self._user32.GetWindowThreadProcessId(self.hwnd, ctypes.byref(pid))
+        return pid.value == self.process_id
+
+    def invalidate(self):
+        self._user32.InvalidateRect(self.hwnd, None, True)
+        self._user32.UpdateWindow(self.hwnd)
+
+    def last_error(self) -> str:
+        error_code = ctypes.get_last_error()
+        return f"{error_code} - {ctypes.FormatError(error_code)}" if error_code else "N/A"
+
+    def close(self):
+        if self._h_process:
+            self._kernel32.CloseHandle(self._h_process)
+            self._h_process = None
+
+
+class FakeListViewBackend(ListViewBackend):
+    """
+    ListView в памяти для проверки логики чтения без Windows.
+
+    Эмулирует адресное пространство другого процесса (выделенные области памяти)
+    и обработку сообщений LVM_* так же, как SysListView32: LVITEM и POINT читаются
+    и записываются в "удаленную" память. Счетчики calls позволяют проверить число обращений.
+    """
+
+    _BASE_ADDRESS = 0x10000000
+
+    def __init__(self, items):
+        """
+        Args:
+            items (list): Список (имя, (x, y)) в порядке индексов ListView.
+        """
+        self.items = [[name, tuple(coords)] for name, coords in items]
+        self.calls = {"alloc": 0, "free": 0, "write": 0, "read": 0, "send_message": 0, "invalidate": 0}
+        # Перерисовка: False после WM_SETREDRAW(FALSE); repaints - сколько раз окно перерисовалось бы
+        self.redraw = True
+        self.repaints = 0
+        self._regions = {}
+        self._next_address = self._BASE_ADDRESS
+        # False имитирует завершение процесса Explorer (окно и память становятся недоступны)
+        self.alive = True
+
+    def _locate(self, address: int, size: int):
+        if not self.alive:
+            return None, 0
+        for start, region in self._regions.items():
+            if start <= address and address + size <= start + len(region):
+                return region, address - start
+        return None, 0
+
+    def alloc(self, size: int) -> int:
+        self.calls["alloc"] += 1
+        if not self.alive:
+            return 0
+        address = self._next_address
+        self._regions[address] = bytearray(size)
+        self._next_address += (size + 0xFFFF) & ~0xFFFF
+        return address
+
+    def free(self, address: int):
+        self.calls["free"] += 1
+        self._regions.pop(address, None)
+
+    def write(self, address: int, data: bytes) -> bool:
+        self.calls["write"] += 1
+        return self._store(address, data)
+
+    def _store(self, address: int, data: bytes) -> bool:
+        """Запись в "удаленную" память со стороны ListView (не считается обращением клиента)."""
+        region, offset = self._locate(address, len(data))
+        if region is None:
+            return False
+        region[offset:offset + len(data)] = data
+        return True
+
+    def read(self, address: int, size: int):
+        self.calls["read"] += 1
+        region, offset = self._locate(address, size)
+        if region is None:
+            return None
+        return bytes(region[offset:offset + size])
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def invalidate(self):
+        self.calls["invalidate"] += 1
+        if self.alive:
+            self.repaints += 1
+
+    def send_message(self, message: int, wparam: int, lparam: int) -> int:
+        self.calls["send_message"] += 1
+        if not self.alive:
+            return 0
+        if message == LVM_GETITEMCOUNT:
+            return len(self.items)
+        if message == LVM_GETITEMTEXTW:
+            if not 0 <= wparam < len(self.items):
+                return 0
+            region, offset = self._locate(lparam, LVITEM_SIZE)
+            if region is None:
+                return 0
+            text_address = _POINTER.unpack_from(region, offset + LVITEM.pszText.offset)[0]
+            max_chars = struct.unpack_from("<i", region, offset + LVITEM.cchTextMax.offset)[0]
+            text = self.items[wparam][0][:max(max_chars - 1, 0)]
+            encoded = text.encode("utf-16-le") + b"\x00\x00"
+            if not self._store(text_address, encoded):
+                return 0
+            return len(text)
+        if message == LVM_GETITEMPOSITION:
+            if not 0 <= wparam < len(self.items):
+                return 0
+            x, y = self.items[wparam][1]
+            return 1 if self._store(lparam, struct.pack("<ii", x, y)) else 0
+        if message == LVM_SETITEMPOSITION:
+            if not 0 <= wparam < len(self.items):
+                return 0
+            x = ctypes.c_int16(lparam & 0xFFFF).value
+            y = ctypes.c_int16((lparam >> 16) & 0xFFFF).value
+            self.items[wparam][1] = (x, y)
+            self._changed()
+            return 1
+        if message == LVM_SETITEMPOSITION32:
+            region, offset = self._locate(lparam, POINT_SIZE)
+            if region is not None and 0 <= wparam < len(self.items):
+                self.items[wparam][1] = struct.unpack_from("<ii", region, offset)
+                self._changed()
+            return 0
+        if message == WM_SETREDRAW:
+            self.redraw = bool(wparam)
+            return 0
+        return 0
+
+    def _changed(self):
+        # Окно перерисовывается после каждого изменения, если перерисовка не отключена
+        if self.redraw:
+            self.repaints += 1
+
+
+def _decode_text(data: bytes) -> str:
+    """Строка UTF-16 LE до первого нулевого символа."""
+    for end in range(0, len(data) - 1, 2):
+        if data[end] == 0 and data[end + 1] == 0:
+            data = data[:end]
+            break
+    return data.decode("utf-16-le", errors="replace")
+
+
+def snapshot_region_size(batch_size: int, text_max_chars: int = TEXT_BUFFER_MAX_CHARS) -> int:
+    """Размер удаленной области памяти для пакета из batch_size элементов (LVITEM, POINT и текст)."""
+    return batch_size * (LVITEM_SIZE + POINT_SIZE + text_max_chars * 2)
+
+
+def iter_snapshot_batches(backend: ListViewBackend, count: int, batch_size: int = DEFAULT_SNAPSHOT_BATCH_SIZE,
+                          text_max_chars: int = TEXT_BUFFER_MAX_CHARS, region: int = 0):
+    """
+    Читает имена и позиции элементов ListView пакетами.
+
+    Для пакета из N элементов используется одна область памяти в процессе ListView
+    (N структур LVITEM, N POINT и N текстовых буферов), все LVITEM записываются одним
+    WriteProcessMemory, затем отправляются LVM_GETITEMTEXTW и LVM_GETITEMPOSITION,
+    и результаты забираются одним ReadProcessMemory.
+
+    Если region не задан, область выделяется и освобождается здесь; иначе используется
+    переданная область размером не меньше snapshot_region_size(batch_size, text_max_chars).
+
+    Возвращает (генератором) списки кортежей (индекс, имя или None, (x, y) или None) по пакетам;
+    None означает, что значение прочитать не удалось (подробности в логе).
+    """
+    batch_size = max(1, min(batch_size, count or 1))
+    text_slot_size = text_max_chars * 2
+    owns_region = not region
+    if owns_region:
+        region = backend.alloc(snapshot_region_size(batch_size, text_max_chars))
+        if not region:
+            raise OSError(f"Не удалось выделить удаленную память для {batch_size} элементов. Ошибка: {backend.last_error()}")
+    try:
+        for first in range(0, count, batch_size):
+            n = min(batch_size, count - first)
+            points_address = region + n * LVITEM_SIZE
+            texts_address = points_address + n * POINT_SIZE
+
+            lvitems = (LVITEM * n)()
+            for k in range(n):
+                lvitems[k].mask = LVIF_TEXT
+                lvitems[k].iItem = first + k
+                lvitems[k].iSubItem = 0
+                lvitems[k].cchTextMax = text_max_chars
+                lvitems[k].pszText = texts_address + k * text_slot_size
+            names_requested = backend.write(region, bytes(lvitems))
+            if not names_requested:
+                logging.warning(
+                    f"Не удалось записать LVITEM в удаленный процесс для элементов {first}-{first + n - 1}. Ошибка: {backend.last_error()}. Пропускаем получение имен.")
+
+            text_results = [0] * n
+            position_results = [0] * n
+            for k in range(n):
+                if names_requested:
+                    text_results[k] = backend.send_message(LVM_GETITEMTEXTW, first + k, region + k * LVITEM_SIZE)
+                position_results[k] = backend.send_message(LVM_GETITEMPOSITION, first + k, points_address + k * POINT_SIZE)
+
+            data = backend.read(points_address, n * (POINT_SIZE + text_slot_size))
+            if data is None:
+                logging.warning(
+                    f"Не удалось прочитать данные элементов {first}-{first + n - 1} из удаленного процесса. Ошибка: {backend.last_error()}")
+
+            batch = []
+            for k in range(n):
+                index = first + k
+                name = None
+                coords = None
+                if data is not None and text_results[k] > 0:
+                    text_offset = n * POINT_SIZE + k * text_slot_size
+                    name = _decode_text(data[text_offset:text_offset + text_slot_size]).strip()
+                elif names_requested:
+                    logging.warning(f"Не удалось получить текст для элемента {index}. Код возврата SendMessage: {text_results[k]}.")
+                if data is not None and position_results[k] == 1:
+                    coords = struct.unpack_from("<ii", data, k * POINT_SIZE)
+                else:
+                    logging.warning(f"Не удалось получить позицию для элемента {index}. Код возврата SendMessage: {position_results[k]}.")
+                batch.append((index, name, coords))
+            yield batch
+    finally:
+        if owns_region:
+            backend.free(region)
+
+
+def snapshot_listview(backend: ListViewBackend, batch_size: int = DEFAULT_SNAPSHOT_BATCH_SIZE) -> list:
+    """
+    Снимок всех элементов ListView: список (индекс, имя или None, (x, y) или None).
+    См. iter_snapshot_batches().
+    """
+    count = backend.item_count()
+    if count <= 0:
+        return []
+    return [item for batch in iter_snapshot_batches(backend, count, batch_size) for item in batch]
+
+
+class RemoteBufferPool:
+    """
+    Пул областей памяти в процессе ListView, переиспользуемых между операциями.
+
+    acquire() возвращает свободную область не меньше запрошенного размера
+    (или выделяет новую), release() возвращает ее в пул; память освобождается только в clear().
+    """
+
+    def __init__(self, backend: ListViewBackend):
+        self.backend = backend
+        self._free = []  # (размер, адрес)
+        self._in_use = {}  # адрес -> размер
+        self.allocations = 0
+
+    def acquire(self, size: int) -> int:
+        best = None
+        for position, (capacity, address) in enumerate(self._free):
+            if capacity >= size and (best is None or capacity < self._free[best][0]):
+                best = position
+        if best is not None:
+            capacity, address = self._free.pop(best)
+        else:
+            capacity, address = size, self.backend.alloc(size)
+            if not address:
+                raise OSError(f"Не удалось выделить удаленную память ({size} байт). Ошибка: {self.backend.last_error()}")
+            self.allocations += 1
+        self._in_use[address] = capacity
+        return address
+
+    def release(self, address: int):
+        capacity = self._in_use.pop(address, None)
+        if capacity is not None:
+            self._free.append((capacity, address))
+
+    def clear(self):
+        """Освобождает всю память пула (в том числе занятые области)."""
+        for address in list(self._in_use) + [address for _, address in self._free]:
+            self.backend.free(address)
+        self._in_use.clear()
+        self._free.clear()
+
+
+class DesktopListViewSession:
+    """
+    Долгоживущее подключение к ListView рабочего стола.
+
+    Держит открытым процесс Explorer и пул удаленных буферов, общий для чтения
+    списка иконок, запроса позиций и перемещения (LVM_SETITEMPOSITION32), поэтому
+    OpenProcess/VirtualAllocEx выполняются один раз, а не на каждую операцию.
+
+    Перед каждой операцией окно проверяется (IsWindow и PID процесса); если Explorer
+    был перезапущен, сессия переподключается: новый HWND берется из find_hwnd().
+
+    Пример:
+        with DesktopListViewSession(hwnd, find_hwnd=get_desktop_listview_handle) as session:
+            items = session.snapshot()
+            session.set_position(items[0][0], 100, 100)
+    """
+
+    def __init__(self, hwnd: int = 0, find_hwnd=None, backend_factory=None,
+                 batch_size: int = DEFAULT_SNAPSHOT_BATCH_SIZE, text_max_chars: int = TEXT_BUFFER_MAX_CHARS):
+        """
+        Args:
+            hwnd (int): HWND окна SysListView32; если 0, берется из find_hwnd().
+            find_hwnd (callable, optional): Поиск HWND рабочего стола (для переподключения).
+            backend_factory (callable, optional): Создает ListViewBackend по HWND
+                            (по умолчанию Win32ListViewBackend).
+            batch_size (int): Число элементов, читаемых за один ReadProcessMemory.
+            text_max_chars (int): Размер текстового буфера одного элемента в символах.
+        """
+        self.hwnd = hwnd
+        self.find_hwnd = find_hwnd
+        self.backend_factory = backend_factory or Win32ListViewBackend
+        self.batch_size = batch_size
+        self.text_max_chars = text_max_chars
+        self.backend = None
+        self.pool = None
+        self.reconnects = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _connect(self):
+        hwnd = self.hwnd
+        if not hwnd and self.find_hwnd is not None:
+            hwnd = self.find_hwnd()
+        if not hwnd:
+            raise OSError("Не удалось найти HWND SysListView32 рабочего стола.")
+        self.backend = self.backend_factory(hwnd)
+        self.pool = RemoteBufferPool(self.backend)
+        self.hwnd = hwnd
+
+    def _disconnect(self):
+        if self.backend is not None:
+            try:
+                self.pool.clear()
+            finally:
+                self.backend.close()
+        self.backend = None
+        self.pool = None
+
+    def ensure_connected(self) -> ListViewBackend:
+        """Возвращает рабочий backend, переподключаясь при перезапуске Explorer."""
+        if self.backend is None:
+            self._connect()
+        elif not self.backend.is_alive():
+            logging.info(f"Окно рабочего стола {self.hwnd} больше недоступно (перезапуск Explorer?). Переподключение...")
+            # Память в завершенном процессе уже освобождена системой, освобождать ее не нужно
+            self.backend.close()
+            self.backend = None
+            self.pool = None
+            if self.find_hwnd is not None:
+                self.hwnd = 0
+            self._connect()
+            self.reconnects += 1
+            if stats.enabled:
+                stats.count("listview.reconnects")
+        return self.backend
+
+    def item_count(self) -> int:
+        return self.ensure_connected().item_count()
+
+    @stats.timed("ipc.snapshot")
+    def snapshot(self, count: int = None) -> list:
+        """
+        Имена и позиции всех иконок: список (индекс, имя или None, (x, y) или None).
+        count - уже известное число элементов (иначе запрашивается LVM_GETITEMCOUNT).
+        """
+        return [item for batch in self.iter_snapshot(count) for item in batch]
+
+    def iter_snapshot(self, count: int = None):
+        """
+        То же, что snapshot(), но генератором по пакетам (списки по batch_size элементов):
+        первый пакет доступен сразу после его чтения. Удаленный буфер из пула занят,
+        пока генератор не будет исчерпан или закрыт.
+        """
+        backend = self.ensure_connected()
+        if count is None:
+            count = backend.item_count()
+        if count <= 0:
+            return
+        batch_size = max(1, min(self.batch_size, count))
+        region = self.pool.acquire(snapshot_region_size(batch_size, self.text_max_chars))
+        try:
+            yield from iter_snapshot_batches(backend, count, batch_size, self.text_max_chars, region)
+        finally:
+            self.pool.release(region)
+
+    def get_position(self, index: int):
+        """Позиция иконки (x, y) или None при ошибке."""
+        backend = self.ensure_connected()
+        remote_point = self.pool.acquire(POINT_SIZE)
+        try:
+            if backend.send_message(LVM_GETITEMPOSITION, index, remote_point) != 1:
+                return None
+            data = backend.read(remote_point, POINT_SIZE)
+            return struct.unpack_from("<ii", data) if data is not None else None
+        finally:
+            self.pool.release(remote_point)
+
+    def set_position(self, index: int, x: int, y: int) -> bool:
+        """
+        Перемещает иконку в клиентские координаты (x, y) через LVM_SETITEMPOSITION32.
+        В отличие от LVM_SETITEMPOSITION координаты не ограничены 16 битами.
+        Возвращает False, если не удалось передать координаты в процесс ListView.
+        """
+        backend = self.ensure_connected()
+        remote_point = self.pool.acquire(POINT_SIZE)
+        try:
+            if not backend.write(remote_point, struct.pack("<ii", x, y)):
+                logging.warning(f"Не удалось записать POINT для перемещения элемента {index}. Ошибка: {backend.last_error()}")
+                return False
+            # LVM_SETITEMPOSITION32 не возвращает значения
+            backend.send_message(LVM_SETITEMPOSITION32, index, remote_point)
+            return True
+        finally:
+            self.pool.release(remote_point)
+
+    @stats.timed("ipc.move_many")
+    def move_many(self, moves, coalesce: bool = True) -> dict:
+        """
+        Перемещает несколько иконок за одну перерисовку.
+
+        Перемещения выполняются в заданном порядке (план plan_moves() с промежуточными
+        "парковками" для разрыва циклов переносится без изменений). При coalesce подряд идущие
+        перемещения одной иконки сводятся к последнему из них. Все координаты передаются
+        в процесс ListView одним WriteProcessMemory, перемещения выполняются через
+        LVM_SETITEMPOSITION32 при отключенной перерисовке (WM_SETREDRAW), затем окно
+        перерисовывается один раз.
+
+        Args:
+            moves (iterable): Перемещения (индекс, x, y).
+            coalesce (bool): Сводить подряд идущие перемещения одной иконки к последнему.
+
+        Returns:
+            dict: {индекс: True/False} - удалось ли выполнить все перемещения иконки.
+        """
+        coalesced = coalesce_moves(moves) if coalesce else [tuple(move) for move in moves]
+        if not coalesced:
+            return {}
+        backend = self.ensure_connected()
+        count = backend.item_count()
+        region = self.pool.acquire(len(coalesced) * POINT_SIZE)
+        results = {}
+        try:
+            points = b"".join(struct.pack("<ii", x, y).ljust(POINT_SIZE, b"\0") for _, x, y in coalesced)
+            if not backend.write(region, points):
+                logging.warning(f"Не удалось записать координаты {len(coalesced)} иконок в процесс ListView. Ошибка: {backend.last_error()}")
+                return {index: False for index, _, _ in coalesced}
+            backend.send_message(WM_SETREDRAW, 0, 0)
+            try:
+                for position, (index, _, _) in enumerate(coalesced):
+                    if not 0 <= index < count:
+                        logging.warning(f"Иконка с индексом {index} не найдена (всего {count}), перемещение пропущено.")
+                        results[index] = False
+                        continue
+                    # LVM_SETITEMPOSITION32 не возвращает значения
+                    backend.send_message(LVM_SETITEMPOSITION32, index, region + position * POINT_SIZE)
+                    results.setdefault(index, True)
+            finally:
+                backend.send_message(WM_SETREDRAW, 1, 0)
+                backend.invalidate()
+        finally:
+            self.pool.release(region)
+        return results
+
+    def close(self):
+        self._disconnect()
+
+
+def coalesce_moves(moves) -> list:
+    """
+    Сводит подряд идущие перемещения одного индекса к последнему из них. Порядок остальных
+    перемещений сохраняется: перемещения одной иконки, разделенные другими (например,
+    "парковка" и возврат при обмене местами), не объединяются.
+    """
+    coalesced = []
+    for index, x, y in moves:
+        if coalesced and coalesced[-1][0] == index:
+            coalesced[-1] = (index, x, y)
+        else:
+            coalesced.append((index, x, y))
+    return coalesced
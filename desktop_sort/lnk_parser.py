@@ -0,0 +1,325 @@
+import os
+import re
+import struct
+import sys
+import uuid
+
+
+# --- Формат Shell Link (.lnk), спецификация MS-SHLLINK ---
+
+LNK_HEADER_SIZE = 0x4C
+LNK_CLSID = uuid.UUID("00021401-0000-0000-c000-000000000046")
+MY_COMPUTER_CLSID = uuid.UUID("20d04fe0-3aea-1069-a2d8-08002b30309d")
+
+# LinkFlags
+HAS_LINK_TARGET_ID_LIST = 0x00000001
+HAS_LINK_INFO = 0x00000002
+HAS_NAME = 0x00000004
+HAS_RELATIVE_PATH = 0x00000008
+HAS_WORKING_DIR = 0x00000010
+HAS_ARGUMENTS = 0x00000020
+HAS_ICON_LOCATION = 0x00000040
+IS_UNICODE = 0x00000080
+FORCE_NO_LINK_INFO = 0x00000100
+HAS_EXP_STRING = 0x00000200
+
+# LinkInfoFlags
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x1
+COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX = 0x2
+
+ENVIRONMENT_VARIABLE_DATA_BLOCK = 0xA0000001
+FILE_ENTRY_EXTENSION_SIGNATURE = 0xBEEF0004
+
+_HEADER = struct.Struct("<I16sIIQQQIIIHHII")
+_LINK_INFO_HEADER = struct.Struct("<IIIIIII")  # size, header size, flags, VolumeID, LocalBasePath, CNRL, CommonPathSuffix
+_MAX_BLOCK_SIZE = 1 << 16  # Защита от поврежденных файлов: структуры .lnk заведомо меньше
+
+# Строки без флага IsUnicode записаны в системной ANSI-кодировке
+_ANSI_ENCODING = "mbcs" if sys.platform == "win32" else "cp1252"
+_ENV_VARIABLE = re.compile(r"%([^%]+)%")
+
+
+class LnkParseError(ValueError):
+    """Файл не является корректным ярлыком .lnk."""
+
+
+class ShellLink:
+    """Разобранные поля ярлыка .lnk, нужные для определения цели."""
+
+    def __init__(self):
+        self.link_flags = 0
+        self.file_attributes = 0
+        self.id_list_path = ""
+        self.local_base_path = ""
+        self.network_path = ""
+        self.common_path_suffix = ""
+        self.name = ""
+        self.relative_path = ""
+        self.working_dir = ""
+        self.arguments = ""
+        self.icon_location = ""
+        self.environment_target = ""
+
+    def target_path(self, lnk_path: str = "") -> str:
+        """
+        Возвращает путь к цели ярлыка так же, как WScript.Shell TargetPath:
+        путь из LinkInfo (локальный или сетевой), затем блок переменных окружения,
+        затем LinkTargetIDList и, в последнюю очередь, относительный путь от папки ярлыка.
+        Пустая строка, если цель не является путем файловой системы.
+        """
+        if self.local_base_path:
+            return _join_suffix(self.local_base_path, self.common_path_suffix)
+        if self.network_path:
+            return _join_suffix(self.network_path, self.common_path_suffix)
+        if self.environment_target:
+            return expand_environment_strings(self.environment_target)
+        if self.id_list_path:
+            return self.id_list_path
+        if self.relative_path and lnk_path:
+            relative = expand_environment_strings(self.relative_path).replace("\\", os.sep)
+            return os.path.normpath(os.path.join(os.path.dirname(lnk_path), relative))
+        return ""
+
+
+def expand_environment_strings(value: str) -> str:
+    """Раскрывает переменные окружения вида %NAME% (неизвестные переменные остаются как есть)."""
+    return _ENV_VARIABLE.sub(lambda match: os.environ.get(match.group(1), match.group(0)), value)
+
+
+def _join_suffix(base: str, suffix: str) -> str:
+    if not suffix:
+        return base
+    if base.endswith("\\"):
+        return base + suffix
+    return base + "\\" + suffix
+
+
+def _read_exact(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise LnkParseError("Файл ярлыка обрезан.")
+    return data
+
+
+def _c_string(data: bytes, offset: int, encoding: str = _ANSI_ENCODING) -> str:
+    """Строка, завершающаяся нулем, в однобайтовой кодировке."""
+    if offset < 0 or offset >= len(data):
+        return ""
+    end = data.find(b"\x00", offset)
+    if end < 0:
+        end = len(data)
+    return data[offset:end].decode(encoding, errors="replace")
+
+
+def _c_wstring(data: bytes, offset: int) -> str:
+    """Строка UTF-16 LE, завершающаяся нулем."""
+    if offset < 0 or offset >= len(data):
+        return ""
+    end = offset
+    while end + 1 < len(data) and data[end:end + 2] != b"\x00\x00":
+        end += 2
+    return data[offset:end].decode("utf-16-le", errors="replace")
+
+
+def _parse_link_info(data: bytes, link: ShellLink):
+    """Разбирает структуру LinkInfo (локальный путь или сетевой ресурс + суффикс пути)."""
+    if len(data) < _LINK_INFO_HEADER.size:
+        raise LnkParseError("Структура LinkInfo слишком короткая.")
+    (_, header_size, flags, _, local_base_path_offset,
+     network_link_offset, common_path_suffix_offset) = _LINK_INFO_HEADER.unpack_from(data, 0)
+    unicode_offsets = header_size >= 0x24 and len(data) >= 0x24
+    if unicode_offsets:
+        local_base_path_unicode_offset, common_path_suffix_unicode_offset = struct.unpack_from("<II", data, 0x1C)
+
+    if unicode_offsets and common_path_suffix_unicode_offset:
+        link.common_path_suffix = _c_wstring(data, common_path_suffix_unicode_offset)
+    else:
+        link.common_path_suffix = _c_string(data, common_path_suffix_offset)
+
+    if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        if unicode_offsets and local_base_path_unicode_offset:
+            link.local_base_path = _c_wstring(data, local_base_path_unicode_offset)
+        else:
+            link.local_base_path = _c_string(data, local_base_path_offset)
+
+    if flags & COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX and 0 < network_link_offset < len(data) - 20:
+        network = data[network_link_offset:]
+        network_size, _, net_name_offset = struct.unpack_from("<III", network, 0)
+        network = network[:network_size]
+        if net_name_offset > 0x14 and len(network) >= 0x1C:
+            net_name_unicode_offset = struct.unpack_from("<I", network, 0x14)[0]
+            link.network_path = _c_wstring(network, net_name_unicode_offset)
+        else:
+            link.network_path = _c_string(network, net_name_offset)
+
+
+def _parse_file_entry_name(item: bytes, item_type: int) -> str:
+    """
+    Имя из элемента файловой системы (тип 0x3X): длинное имя из блока расширения 0xBEEF0004
+    или, если его нет, основное (короткое 8.3) имя. Смещения считаются от начала элемента,
+    включая поле размера: тип (2), размер файла (4), время изменения (8), атрибуты (12), имя (14).
+    """
+    if len(item) < 16:
+        return ""
+    if item_type & 0x04: # Основное имя в UTF-16
+        short_name = _c_wstring(item, 14)
+        short_name_end = 14 + (len(short_name) + 1) * 2
+    else:
+        short_name = _c_string(item, 14)
+        short_name_end = 14 + len(short_name.encode(_ANSI_ENCODING, errors="replace")) + 1
+        short_name_end += short_name_end % 2 # Выравнивание на 2 байта
+
+    # Смещение блока расширения записано в последних двух байтах элемента
+    if len(item) >= short_name_end + 2:
+        extension_offset = struct.unpack_from("<H", item, len(item) - 2)[0]
+        if short_name_end <= extension_offset <= len(item) - 20:
+            _, version, signature = struct.unpack_from("<HHI", item, extension_offset)
+            if signature == FILE_ENTRY_EXTENSION_SIGNATURE and version >= 3:
+                name_offset = extension_offset + 18
+                if version >= 7:
+                    name_offset += 18
+                name_offset += 2 # Размер длинной строки
+                if version >= 9:
+                    name_offset += 4
+                if version >= 8:
+                    name_offset += 4
+                long_name = _c_wstring(item, name_offset)
+                if long_name:
+                    return long_name
+    return short_name
+
+
+def _parse_id_list(data: bytes) -> str:
+    """
+    Восстанавливает путь файловой системы из LinkTargetIDList.
+    Поддерживаются "Этот компьютер" -> диск -> папки/файлы; для прочих
+    виртуальных объектов (панель управления и т.п.) возвращается пустая строка.
+    """
+    parts = []
+    offset = 0
+    while offset + 2 <= len(data):
+        item_size = struct.unpack_from("<H", data, offset)[0]
+        if item_size == 0:
+            break
+        if item_size < 3 or offset + item_size > len(data):
+            raise LnkParseError("Поврежденный элемент LinkTargetIDList.")
+        # Элемент вместе с полем размера; тип элемента - третий байт
+        item = data[offset:offset + item_size]
+        item_type = item[2]
+        offset += item_size
+
+        if item_type == 0x1F: # Корневая папка (CLSID)
+            if len(item) >= 20 and uuid.UUID(bytes_le=item[4:20]) == MY_COMPUTER_CLSID:
+                continue
+            return ""
+        if item_type & 0x70 == 0x20: # Том (диск)
+            drive = _c_string(item, 3)
+            if not drive:
+                return ""
+            parts = [drive if drive.endswith("\\") else drive + "\\"]
+            continue
+        if item_type & 0x70 == 0x30: # Папка или файл
+            if not parts:
+                return ""
+            name = _parse_file_entry_name(item, item_type)
+            if not name:
+                return ""
+            parts.append(name)
+            continue
+        return "" # Неизвестный тип элемента: цель не является путем файловой системы
+
+    if not parts:
+        return ""
+    return parts[0] + "\\".join(parts[1:])
+
+
+def _read_string_data(f, is_unicode: bool) -> str:
+    count = struct.unpack("<H", _read_exact(f, 2))[0]
+    if is_unicode:
+        return _read_exact(f, count * 2).decode("utf-16-le", errors="replace")
+    return _read_exact(f, count).decode(_ANSI_ENCODING, errors="replace")
+
+
+def parse_lnk(lnk_path: str, stop_at_target: bool = False) -> ShellLink:
+    """
+    Разбирает ярлык .lnk без COM.
+
+    Читаются только нужные структуры: заголовок, LinkTargetIDList, LinkInfo,
+    StringData и блок переменных окружения из ExtraData.
+    При stop_at_target=True чтение прекращается, как только найден путь в LinkInfo
+    (остальные поля при этом не заполняются).
+
+    Raises:
+        LnkParseError: файл не является корректным ярлыком.
+        OSError: файл не удалось прочитать.
+    """
+    link = ShellLink()
+    with open(lnk_path, "rb") as f:
+        header = f.read(LNK_HEADER_SIZE)
+        if len(header) != LNK_HEADER_SIZE:
+            raise LnkParseError("Файл слишком короткий для заголовка ярлыка.")
+        fields = _HEADER.unpack(header)
+        header_size, clsid = fields[0], fields[1]
+        if header_size != LNK_HEADER_SIZE or uuid.UUID(bytes_le=clsid) != LNK_CLSID:
+            raise LnkParseError("Неверная сигнатура заголовка ярлыка.")
+        link.link_flags = flags = fields[2]
+        link.file_attributes = fields[3]
+
+        # LinkTargetIDList пропускается и читается только если путь не найден в LinkInfo
+        id_list_position = id_list_size = 0
+        if flags & HAS_LINK_TARGET_ID_LIST:
+            id_list_size = struct.unpack("<H", _read_exact(f, 2))[0]
+            id_list_position = f.tell()
+            f.seek(id_list_size, os.SEEK_CUR)
+
+        if flags & HAS_LINK_INFO:
+            link_info_size = struct.unpack("<I", _read_exact(f, 4))[0]
+            if link_info_size < 4 or link_info_size > _MAX_BLOCK_SIZE:
+                raise LnkParseError("Неверный размер структуры LinkInfo.")
+            link_info = struct.pack("<I", link_info_size) + _read_exact(f, link_info_size - 4)
+            if not flags & FORCE_NO_LINK_INFO:
+                _parse_link_info(link_info, link)
+                if stop_at_target and (link.local_base_path or link.network_path):
+                    return link
+
+        is_unicode = bool(flags & IS_UNICODE)
+        if flags & HAS_NAME:
+            link.name = _read_string_data(f, is_unicode)
+        if flags & HAS_RELATIVE_PATH:
+            link.relative_path = _read_string_data(f, is_unicode)
+        if flags & HAS_WORKING_DIR:
+            link.working_dir = _read_string_data(f, is_unicode)
+        if flags & HAS_ARGUMENTS:
+            link.arguments = _read_string_data(f, is_unicode)
+        if flags & HAS_ICON_LOCATION:
+            link.icon_location = _read_string_data(f, is_unicode)
+
+        if flags & HAS_EXP_STRING:
+            # ExtraData: последовательность блоков (размер, сигнатура); блок размером < 4 - терминатор
+            while True:
+                block_header = f.read(8)
+                if len(block_header) < 8:
+                    break
+                block_size, signature = struct.unpack("<II", block_header)
+                if block_size < 8 or block_size > _MAX_BLOCK_SIZE:
+                    break
+                block = _read_exact(f, block_size - 8)
+                if signature == ENVIRONMENT_VARIABLE_DATA_BLOCK and len(block) >= 260 + 520:
+                    # TargetAnsi (260 байт), затем TargetUnicode (520 байт)
+                    link.environment_target = _c_wstring(block[260:780], 0) or _c_string(block[:260], 0)
+                    break
+
+        if id_list_size:
+            f.seek(id_list_position)
+            link.id_list_path = _parse_id_list(_read_exact(f, id_list_size))
+    return link
+
+
+def read_lnk_target(lnk_path: str) -> str:
+    """
+    Возвращает путь к цели ярлыка .lnk без COM (см. ShellLink.target_path).
+
+    Raises:
+        LnkParseError, OSError: см. parse_lnk().
+    """
+    return parse_lnk(lnk_path, stop_at_target=True).target_path(lnk_path)
@@ -0,0 +1,95 @@
+from . import stats
+
+
+def split_path_components(path_lower: str) -> list:
+    """Компоненты пути (в нижнем регистре) с любыми разделителями ('\\' или '/'), без пустых."""
+    return [component for component in path_lower.replace("/", "\\").split("\\") if component]
+
+
+class _PathNode:
+    __slots__ = ("children", "label")
+
+    def __init__(self):
+        self.children = {}
+        self.label = None
+
+
+def _insert(root: _PathNode, components: list, label: str):
+    node = root
+    for component in components:
+        node = node.children.setdefault(component, _PathNode())
+    node.label = label
+
+
+class PathPrefixMatcher:
+    """
+    Правила путей, скомпилированные в деревья компонентов пути.
+
+    - Корни (add_root) - абсолютные пути ("C:\\Program Files", "D:\\Games"): совпадают,
+      если путь начинается с этих компонентов.
+    - Маркеры (add_marker) - последовательности компонентов в любом месте пути
+      ("steamapps\\common", "epic games").
+
+    Сравнение идет по целым компонентам, а не по подстроке: "C:\\Program Files" не совпадает
+    с "C:\\Program Files (x86)", маркер "games" - с "mygames". Стоимость поиска зависит
+    от глубины пути, а не от числа правил.
+    """
+
+    def __init__(self):
+        self._roots = _PathNode()
+        self._markers = _PathNode()
+        self._rules = []
+
+    def add_root(self, path: str, label: str):
+        components = split_path_components(path.lower())
+        if not components:
+            raise ValueError(f"Пустой корневой путь '{path}'.")
+        _insert(self._roots, components, label)
+        self._rules.append(("root", tuple(components), label))
+
+    def add_marker(self, path: str, label: str):
+        components = split_path_components(path.lower())
+        if not components:
+            raise ValueError(f"Пустой маркер пути '{path}'.")
+        _insert(self._markers, components, label)
+        self._rules.append(("marker", tuple(components), label))
+
+    def rules(self) -> tuple:
+        """Все правила в порядке добавления (для версии набора правил)."""
+        return tuple(self._rules)
+
+    def match_components(self, components: list):
+        """
+        Метка правила для папок пути (список компонентов без имени файла) или None.
+        Приоритет у самого длинного совпавшего корня, затем у первого найденного маркера.
+        """
+        if stats.enabled:
+            stats.count("paths.lookups")
+        label = None
+        node = self._roots
+        for component in components:
+            node = node.children.get(component)
+            if node is None:
+                break
+            if node.label is not None:
+                label = node.label
+        if label is not None:
+            return label
+        markers = self._markers.children
+        if not markers:
+            return None
+        for start in range(len(components)):
+            node = markers.get(components[start])
+            position = start + 1
+            while node is not None:
+                if node.label is not None:
+                    return node.label
+                if position == len(components):
+                    break
+                node = node.children.get(components[position])
+                position += 1
+        return None
+
+    def match(self, path_lower: str):
+        """Метка правила для папки, в которой лежит файл path_lower, или None."""
+        return self.match_components(split_path_components(path_lower)[:-1])
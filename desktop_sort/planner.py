@@ -0,0 +1,267 @@
+import logging
+
+from . import stats
+from .layout import Layout
+
+
+# Зоны до этого размера назначаются оптимально (венгерский алгоритм, O(n^3)), большие - в порядке
+# заполнения сетки (O(n log n), суммарное смещение больше). Замеры на CPython 3.11 для случайных позиций:
+# 80 иконок - ~13 мс, 150 - ~70 мс, 200 - ~120 мс; при 150 иконках порядок заполнения дает смещение
+# в ~1.5 раза больше оптимального. 150 перемещений стоят ~300 мс, поэтому до 150 оптимизация окупается.
+HUNGARIAN_MAX_ZONE_SIZE = 150
+# Иконка считается стоящей на месте, если отклоняется от цели меньше чем на эту долю ячейки
+IN_PLACE_TOLERANCE = 0.25
+# Оценка стоимости одного перемещения (LVM_SETITEMPOSITION в процесс Explorer и перерисовка), мс
+DEFAULT_MOVE_COST_MS = 2.0
+
+
+class MovePlan:
+    """
+    План перемещений иконок.
+
+    moves - список (индекс, x, y) в порядке выполнения; одна иконка может встречаться
+    дважды, если ее пришлось временно отставить в свободную ячейку (parked), чтобы разорвать цикл.
+    targets - итоговые позиции {индекс: (x, y)} для всех иконок, in_place - иконки, которые не двигаются.
+    """
+
+    def __init__(self, moves, targets, in_place, parked, total_distance, move_cost_ms: float = DEFAULT_MOVE_COST_MS):
+        self.moves = moves
+        self.targets = targets
+        self.in_place = in_place
+        self.parked = parked
+        self.total_distance = total_distance
+        self.move_cost_ms = move_cost_ms
+
+    @property
+    def move_count(self) -> int:
+        return len(self.moves)
+
+    @property
+    def estimated_cost_ms(self) -> float:
+        return self.move_count * self.move_cost_ms
+
+    def summary(self) -> str:
+        return (f"Перемещений: {self.move_count} (на месте: {len(self.in_place)}, временно отставлено: {len(self.parked)}), "
+                f"суммарное смещение: {self.total_distance} px, оценка времени: {self.estimated_cost_ms:.1f} мс")
+
+    def __len__(self):
+        return self.move_count
+
+
+def _distance(a, b) -> int:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _hungarian(cost):
+    """
+    Оптимальное назначение для квадратной матрицы стоимостей (венгерский алгоритм с потенциалами, O(n^3)).
+    Возвращает список: для строки i - номер назначенного столбца.
+    """
+    n = len(cost)
+    infinity = float("inf")
+    u = [0] * (n + 1)
+    v = [0] * (n + 1)
+    owner = [0] * (n + 1)  # owner[j] - строка, назначенная столбцу j (нумерация с 1)
+    way = [0] * (n + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        min_value = [infinity] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            delta = infinity
+            j1 = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    current = row[j - 1] - u[i0] - v[j]
+                    if current < min_value[j]:
+                        min_value[j] = current
+                        way[j] = j0
+                    if min_value[j] < delta:
+                        delta = min_value[j]
+                        j1 = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_value[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    assignment = [0] * n
+    for j in range(1, n + 1):
+        if owner[j]:
+            assignment[owner[j] - 1] = j - 1
+    return assignment
+
+
+def _assign_zone(indices, cells, current, cell_of, in_place_distance):
+    """
+    Назначает иконкам зоны ячейки зоны с минимальным суммарным смещением.
+    Иконки, уже стоящие в одной из ячеек зоны (с допуском), остаются на месте.
+    """
+    cell_numbers = {cell_of(*position): cell_number for cell_number, position in enumerate(cells)}
+    free_cells = set(range(len(cells)))
+    assignment = {}
+    remaining = []
+    for index in indices:
+        coords = current.get(index)
+        cell_number = cell_numbers.get(cell_of(*coords)) if coords is not None else None
+        if cell_number in free_cells and _distance(coords, cells[cell_number]) <= in_place_distance:
+            free_cells.discard(cell_number)
+            assignment[index] = cells[cell_number]
+        else:
+            remaining.append(index)
+    if not remaining:
+        return assignment
+
+    free = sorted(free_cells)
+    if len(remaining) <= HUNGARIAN_MAX_ZONE_SIZE:
+        cost = [[_distance(current.get(index, cells[cell_number]), cells[cell_number]) for cell_number in free]
+                for index in remaining]
+        for row, column in enumerate(_hungarian(cost)):
+            assignment[remaining[row]] = cells[free[column]]
+        return assignment
+
+    # Большая зона: сопоставление в порядке заполнения сетки (столбец, затем строка) -
+    # сохраняет взаимное расположение иконок и работает за O(n log n)
+    logging.info(f"В зоне {len(remaining)} перемещаемых иконок (больше {HUNGARIAN_MAX_ZONE_SIZE}), "
+                 f"назначение в порядке заполнения сетки вместо оптимального.")
+    free.sort(key=lambda cell_number: cells[cell_number])
+    remaining.sort(key=lambda index: current.get(index, (0, 0)))
+    for index, cell_number in zip(remaining, free):
+        assignment[index] = cells[cell_number]
+    return assignment
+
+
+@stats.timed("planner.plan_moves")
+def plan_moves(icons_info: list, layout: Layout, keep_order: bool = False,
+               move_cost_ms: float = DEFAULT_MOVE_COST_MS) -> MovePlan:
+    """
+    Строит минимальный план перемещений от текущих позиций к раскладке.
+
+    1. Внутри каждой зоны ячейки назначаются иконкам так, чтобы суммарное смещение было
+       минимальным (задача о назначениях), если keep_order=False; иначе используется
+       порядок из раскладки (например, по имени). Если в зоне больше HUNGARIAN_MAX_ZONE_SIZE
+       перемещаемых иконок, назначение не оптимально: иконки сопоставляются ячейкам в порядке
+       заполнения сетки (быстрее, но суммарное смещение больше).
+    2. Иконки, уже стоящие в своей ячейке (с допуском IN_PLACE_TOLERANCE ячейки), не двигаются.
+    3. Перемещения упорядочиваются так, чтобы иконка не ставилась в ячейку, которую еще занимает
+       другая перемещаемая иконка; циклы (обмены местами) разрываются временным перемещением
+       одной иконки в свободную ячейку сетки.
+
+    Args:
+        icons_info (list): Записи get_desktop_icon_info() (используются 'index' и 'coords').
+        layout (Layout): Результат compute_layout().
+        keep_order (bool): Не переставлять иконки внутри зоны.
+        move_cost_ms (float): Оценка стоимости одного перемещения для отчета.
+
+    Returns:
+        MovePlan: План; ничего не выполняется.
+    """
+    current = {record['index']: tuple(record['coords']) for record in icons_info if record.get('coords') is not None}
+    in_place_distance = IN_PLACE_TOLERANCE * (layout.cell_width + layout.cell_height) / 2
+
+    if keep_order:
+        targets = dict(layout.positions)
+    else:
+        targets = {}
+        for zone in layout.zones:
+            targets.update(_assign_zone(zone.indices, zone.positions, current, layout.cell_of, in_place_distance))
+
+    in_place = []
+    pending = {}
+    total_distance = 0
+    for index, target in targets.items():
+        coords = current.get(index)
+        if coords is not None and _distance(coords, target) <= in_place_distance:
+            in_place.append(index)
+        else:
+            pending[index] = target
+            if coords is not None:
+                total_distance += _distance(coords, target)
+
+    moves, parked = _order_moves(pending, current, layout, targets)
+    plan = MovePlan(moves, targets, in_place, parked, total_distance, move_cost_ms)
+    logging.info(plan.summary())
+    return plan
+
+
+def _order_moves(pending, current, layout, targets):
+    """
+    Упорядочивает перемещения по зависимостям "ячейка назначения должна освободиться".
+    Возвращает (список ходов, список временно отставленных иконок).
+    """
+    # Кто из перемещаемых иконок сейчас занимает каждую ячейку
+    occupants = {}
+    for index in pending:
+        coords = current.get(index)
+        if coords is not None:
+            occupants.setdefault(layout.cell_of(*coords), []).append(index)
+
+    waiting = {index: 0 for index in pending}  # Сколько иконок еще занимают ячейку назначения
+    dependents = {index: [] for index in pending}  # Кто ждет, пока иконка освободит свою ячейку
+    for index, target in pending.items():
+        for occupant in occupants.get(layout.cell_of(*target), ()):
+            if occupant != index:
+                waiting[index] += 1
+                dependents[occupant].append(index)
+
+    moves = []
+    parked = []
+    released = set()
+    done = set()
+    ready = sorted(index for index, count in waiting.items() if count == 0)
+    ready.reverse()
+
+    def release(index):
+        if index in released:
+            return
+        released.add(index)
+        for dependent in dependents[index]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0 and dependent not in done:
+                ready.append(dependent)
+
+    parking_cells = None
+    remaining = len(pending)
+    while remaining:
+        if ready:
+            index = ready.pop()
+            if index in done:
+                continue
+            done.add(index)
+            remaining -= 1
+            moves.append((index, *pending[index]))
+            release(index)
+            continue
+        # Все оставшиеся иконки ждут друг друга: отставляем одну во временную ячейку
+        if parking_cells is None:
+            parking_cells = _iter_parking_cells(current, layout, targets)
+        index = min(index for index in pending if index not in done and index not in released and dependents[index])
+        x, y = next(parking_cells)
+        moves.append((index, x, y))
+        parked.append(index)
+        release(index)
+    return moves, parked
+
+
+def _iter_parking_cells(current, layout, targets):
+    """Свободные ячейки сетки (не заняты сейчас и не являются целью) для временного размещения."""
+    busy = {layout.cell_of(*coords) for coords in current.values()}
+    busy.update(layout.cell_of(*target) for target in targets.values())
+    rows = max((row for _, row in busy), default=0) + 1
+    column = 0
+    while True:
+        for row in range(rows):
+            if (column, row) not in busy:
+                yield (layout.origin_x + column * layout.cell_width, layout.origin_y + row * layout.cell_height)
+        column += 1
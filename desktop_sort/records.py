@@ -0,0 +1,174 @@
+from array import array
+
+from .codes import ItemType, category_code, category_name, item_type_code, item_type_name
+
+
+# Поля записи об иконке в порядке get_desktop_icon_info()
+ICON_RECORD_FIELDS = ('index', 'name', 'coords', 'type', 'full_path', 'category', 'classified_name',
+                      'original_desktop_type', 'error')
+# Код "нет категории" (запись с ошибкой) в IconRecordArray.category_codes
+NO_CATEGORY = -1
+
+
+class IconRecord:
+    """
+    Запись об иконке рабочего стола (результат iter_desktop_icons() и get_desktop_icon_info()).
+
+    Поля - атрибуты со __slots__ (без словаря на каждую иконку); тип и исходный тип - коды
+    ItemType, категория - код Category (общие объекты, а не строки на каждую иконку).
+    Для совместимости с кодом, работающим со словарями, поддерживаются record['поле'],
+    record.get('поле') и to_dict() (по умолчанию - прежний словарь get_desktop_icon_info()).
+    """
+
+    __slots__ = ICON_RECORD_FIELDS
+
+    def __init__(self, index: int, name: str, coords: tuple, item_type=None, full_path=None, category=None,
+                 classified_name=None, original_desktop_type=None, error=None):
+        self.index = index
+        self.name = name
+        self.coords = coords
+        self.type = item_type
+        self.full_path = full_path
+        self.category = category
+        self.classified_name = classified_name
+        self.original_desktop_type = original_desktop_type
+        self.error = error
+
+    def __getitem__(self, key):
+        if key not in ICON_RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in ICON_RECORD_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key) -> bool:
+        return key in ICON_RECORD_FIELDS
+
+    def get(self, key, default=None):
+        if key not in ICON_RECORD_FIELDS:
+            return default
+        return getattr(self, key)
+
+    def keys(self) -> tuple:
+        return ICON_RECORD_FIELDS
+
+    def to_dict(self, display_names: bool = True, language: str = None, include_error: bool = False) -> dict:
+        """
+        Словарь в формате записи get_desktop_icon_info() (например, для JSON).
+
+        По умолчанию - прежний формат: типы и категория - названия на языке language
+        (см. codes.set_language()), поля 'error' нет. При display_names=False типы и категория -
+        целые коды, при include_error=True добавляется поле 'error' (None или текст ошибки).
+        """
+        record = {field: getattr(self, field) for field in ICON_RECORD_FIELDS}
+        if not include_error:
+            del record['error']
+        if display_names:
+            for field in ('type', 'original_desktop_type'):
+                if record[field] is not None:
+                    record[field] = item_type_name(record[field], language)
+            record['category'] = category_name(record['category'], language)
+        return record
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "IconRecord":
+        """Запись из словаря (типы и категория - коды или названия)."""
+        item_type = record.get('type')
+        original_type = record.get('original_desktop_type')
+        return cls(record['index'], record['name'], record.get('coords'),
+                   None if item_type is None else item_type_code(item_type), record.get('full_path'),
+                   category_code(record.get('category')), record.get('classified_name'),
+                   None if original_type is None else item_type_code(original_type), record.get('error'))
+
+    def __eq__(self, other):
+        if not isinstance(other, IconRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in ICON_RECORD_FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"IconRecord(index={self.index!r}, name={self.name!r}, type={self.type!r}, category={self.category!r})"
+
+
+def _type_code(item_type) -> int:
+    return -1 if item_type is None else item_type_code(item_type)
+
+
+def _type_from_code(code: int):
+    return None if code < 0 else ItemType(code)
+
+
+class IconRecordArray:
+    """
+    Набор записей об иконках в виде столбцов (struct of arrays) для больших проходов:
+    индексы и координаты - array('q'), тип, исходный тип и категория - коды (ItemType, Category)
+    в array('h'), строковые поля - списки.
+
+    Отдельные IconRecord не хранятся: records[i] и итерация создают их по требованию,
+    поэтому набор можно передавать в compute_layout() и plan_moves() как список записей.
+    Для расчетов по столбцам без создания объектов используйте indices, xs, ys и category_codes
+    (NO_CATEGORY - запись без категории, название - codes.category_name(код)).
+
+    Набор дешевле по памяти (~60 байт на запись против ~110 у IconRecord и ~280 у словаря),
+    но построение дороже: ~0.6 мкс на запись вместе с созданием IconRecord против ~0.3 мкс
+    у списка словарей (benchmarks/run_benchmarks.py --only records). Он нужен для больших
+    проходов по столбцам, а не вместо списка записей для одного рабочего стола.
+    """
+
+    def __init__(self, records=()):
+        self.indices = array('q')
+        self.xs = array('q')
+        self.ys = array('q')
+        self.names = []
+        self.full_paths = []
+        self.classified_names = []
+        self.errors = []
+        self.type_codes = array('h')
+        self.original_type_codes = array('h')
+        self.category_codes = array('h')
+        self.extend(records)
+
+    def append(self, record):
+        """Добавляет запись (IconRecord или словарь в формате get_desktop_icon_info())."""
+        self.extend((record,))
+
+    def extend(self, records):
+        """
+        Добавляет записи (IconRecord или словари) по столбцам: каждый столбец заполняется одним
+        проходом, без обращения к записи через get() для каждого поля.
+        """
+        records = [record if record.__class__ is IconRecord else IconRecord.from_dict(record) for record in records]
+        coords = [record.coords or (0, 0) for record in records]
+        self.indices.extend([record.index for record in records])
+        self.xs.extend([x for x, _ in coords])
+        self.ys.extend([y for _, y in coords])
+        self.names.extend([record.name for record in records])
+        self.full_paths.extend([record.full_path for record in records])
+        self.classified_names.extend([record.classified_name for record in records])
+        self.errors.extend([record.error for record in records])
+        self.type_codes.extend([_type_code(record.type) for record in records])
+        self.original_type_codes.extend([_type_code(record.original_desktop_type) for record in records])
+        self.category_codes.extend([NO_CATEGORY if record.category is None else category_code(record.category)
+                                    for record in records])
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, position: int) -> IconRecord:
+        category = self.category_codes[position]
+        return IconRecord(self.indices[position], self.names[position], (self.xs[position], self.ys[position]),
+                          _type_from_code(self.type_codes[position]), self.full_paths[position],
+                          None if category == NO_CATEGORY else category_code(category), self.classified_names[position],
+                          _type_from_code(self.original_type_codes[position]), self.errors[position])
+
+    def __iter__(self):
+        for position in range(len(self.indices)):
+            yield self[position]
+
+    def to_dicts(self, display_names: bool = True, language: str = None, include_error: bool = False) -> list:
+        """Записи словарями IconRecord.to_dict() (по умолчанию - прежний формат)."""
+        return [record.to_dict(display_names, language, include_error) for record in self]
@@ -0,0 +1,169 @@
+import logging
+import time
+from collections import deque
+
+from . import stats
+from .classifier import get_classifier
+from .desktop_items import DesktopIndex, determine_item_type, get_desktop_paths, init_com_for_thread
+from .records import IconRecord
+
+
+# Потоков для разрешения ярлыков (диск и COM) в конвейере iter_desktop_icons(workers=...)
+DEFAULT_RESOLVE_WORKERS = 4
+# Максимум иконок в обработке на один поток (ограничивает память и отставание от чтения ListView)
+IN_FLIGHT_PER_WORKER = 8
+
+
+def make_icon_record(index: int, name: str, coords: tuple, item_type, full_path, category,
+                     classified_name, original_desktop_type, error=None) -> IconRecord:
+    """Запись об иконке (IconRecord, поля как у словаря get_desktop_icon_info()); error - текст ошибки или None."""
+    return IconRecord(index, name, coords, item_type, full_path, category, classified_name,
+                      original_desktop_type, # Для отладки, если нужно
+                      error)
+
+
+def _error_record(index: int, item_name: str, coords: tuple, error: Exception) -> IconRecord:
+    logging.warning(f"Не удалось обработать иконку {index} ('{item_name}'): {error}", exc_info=error)
+    if stats.enabled:
+        stats.count("icons.errors")
+    return make_icon_record(index, item_name, coords, None, None, None, None, None,
+                            error=str(error) or type(error).__name__)
+
+
+def classify_icon(index: int, item_name: str, coords: tuple, item_description: tuple, classifier) -> IconRecord:
+    """Запись об иконке по результату determine_item_type() (item_description) и ее категории."""
+    item_name_for_classification, item_type, item_full_path, initial_type_before_resolve = item_description
+    icon_data_for_classification = {
+        'name': item_name_for_classification,
+        'type': item_type,
+        'full_path': item_full_path,
+        'original_icon_name': item_name, # Имя иконки как на рабочем столе
+        'original_desktop_type': initial_type_before_resolve # Тип до разрешения ярлыков
+    }
+    try:
+        item_category = classifier.classify(icon_data_for_classification)
+    except Exception as e:
+        return _error_record(index, item_name, coords, e)
+    return make_icon_record(index, item_name, coords, item_type, item_full_path, item_category,
+                            item_name_for_classification, initial_type_before_resolve)
+
+
+def describe_icon(index: int, item_name: str, coords: tuple, desktop_index: DesktopIndex, classifier,
+                  shortcut_cache=None) -> IconRecord:
+    """
+    Определяет тип, полный путь и категорию одной иконки.
+    Ошибка не прерывает проход: возвращается запись с 'error' и пустыми типом и категорией.
+    """
+    try:
+        # Определяем тип элемента, его полный путь, имя для классификации и начальный тип
+        item_description = determine_item_type(item_name, desktop_index, shortcut_cache)
+    except Exception as e:
+        return _error_record(index, item_name, coords, e)
+    return classify_icon(index, item_name, coords, item_description, classifier)
+
+
+def _iter_snapshot_items(session, count):
+    """(индекс, имя, (x, y)) по пакетам снимка ListView; непрочитанные значения заменяются заглушками."""
+    for batch in session.iter_snapshot(count):
+        for index, snapshot_name, snapshot_coords in batch:
+            item_name = snapshot_name if snapshot_name is not None else f"Неизвестная иконка {index}"
+            coords = snapshot_coords if snapshot_coords is not None else (0, 0)
+            yield index, item_name, coords
+
+
+def _iter_serial(items, desktop_index, classifier, shortcut_cache):
+    for index, item_name, coords in items:
+        yield describe_icon(index, item_name, coords, desktop_index, classifier, shortcut_cache)
+
+
+def _iter_pipelined(items, desktop_index, classifier, shortcut_cache, workers: int, max_in_flight: int):
+    """
+    Конвейер: чтение ListView (текущий поток) -> determine_item_type в пуле потоков -> классификация
+    (текущий поток, в порядке индексов). В обработке не больше max_in_flight иконок: дальше
+    чтение ждет, пока освободится самая старая.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    pending = deque()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="desktop-resolve",
+                              initializer=init_com_for_thread)
+
+    def finish():
+        index, item_name, coords, future = pending.popleft()
+        try:
+            item_description = future.result()
+        except Exception as e:
+            return _error_record(index, item_name, coords, e)
+        return classify_icon(index, item_name, coords, item_description, classifier)
+
+    try:
+        for index, item_name, coords in items:
+            if len(pending) >= max_in_flight:
+                if stats.enabled:
+                    stats.count("pipeline.backpressure_waits")
+                yield finish()
+            pending.append((index, item_name, coords,
+                            pool.submit(determine_item_type, item_name, desktop_index, shortcut_cache)))
+        while pending:
+            yield finish()
+    finally:
+        # Генератор закрыт досрочно: задачи, которые еще не начались, отменяются
+        for _, _, _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def iter_desktop_icons(session, game_titles, desktop_paths=None, shortcut_cache=None, count: int = None,
+                       workers: int = 1, max_in_flight: int = None):
+    """
+    Генератор записей об иконках рабочего стола (IconRecord) в порядке индексов ListView.
+
+    Имена и позиции читаются из ListView пакетами (DesktopListViewSession.iter_snapshot()),
+    каждая запись выдается сразу после определения типа и категории, поэтому раскладка
+    или вывод могут начинаться до конца прохода, а в памяти держится один пакет.
+
+    При workers > 1 типы элементов (разбор ярлыков, обращения к диску, COM) определяются
+    в пуле из workers потоков параллельно с чтением ListView; COM инициализируется
+    в каждом потоке пула. Порядок записей сохраняется.
+
+    Ошибка при обработке отдельной иконки не прерывает проход: для нее выдается запись
+    с текстом ошибки в 'error' (у остальных записей 'error' равен None). Ошибки подключения
+    к ListView (OSError) выбрасываются из генератора; уже выданные записи остаются у вызывающего.
+
+    Args:
+        session (DesktopListViewSession): Открытая сессия ListView рабочего стола.
+        game_titles: Список названий игр, каталог или готовый IconClassifier.
+        desktop_paths (list, optional): Папки рабочего стола (по умолчанию get_desktop_paths()).
+        shortcut_cache (ShortcutResolutionCache, optional): Постоянный кэш разрешения ярлыков.
+        count (int, optional): Уже известное число иконок (иначе запрашивается LVM_GETITEMCOUNT).
+        workers (int): Потоков для определения типов; 1 - последовательно в текущем потоке.
+        max_in_flight (int, optional): Максимум иконок в обработке (по умолчанию IN_FLIGHT_PER_WORKER на поток).
+
+    Кэши (ярлыков и классификации) записываются на диск, когда генератор исчерпан или закрыт.
+    """
+    start = time.perf_counter_ns()
+    # Один проход os.scandir по папкам рабочего стола для определения типов
+    with stats.timer("desktop.scan"):
+        desktop_index = DesktopIndex.scan(get_desktop_paths() if desktop_paths is None else desktop_paths)
+    # Правила классификации компилируются один раз на весь проход
+    classifier = get_classifier(game_titles)
+    items = _iter_snapshot_items(session, count)
+    if workers > 1:
+        records = _iter_pipelined(items, desktop_index, classifier, shortcut_cache, workers,
+                                  max(1, max_in_flight or workers * IN_FLIGHT_PER_WORKER))
+    else:
+        records = _iter_serial(items, desktop_index, classifier, shortcut_cache)
+    first = True
+    try:
+        for record in records:
+            if first:
+                first = False
+                if stats.enabled:
+                    stats.add_time("icons.time_to_first", time.perf_counter_ns() - start)
+            yield record
+    finally:
+        records.close()
+        items.close()
+        if shortcut_cache is not None:
+            shortcut_cache.flush()
+        classifier.flush()
@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from functools import wraps
+
+
+# Сбор статистики выключен по умолчанию. В горячих местах проверяется `if stats.enabled:`,
+# поэтому при выключенной статистике стоимость - одна проверка флага.
+enabled = False
+
+_lock = threading.Lock()
+_timers = {}  # имя -> [число вызовов, суммарное время (нс), максимальное время (нс)]
+_counters = {}  # имя -> значение
+_started_ns = time.perf_counter_ns()
+
+
+def enable():
+    """Включает сбор статистики (таймеры этапов, счетчики вызовов и кэшей)."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Сбрасывает все накопленные значения."""
+    global _started_ns
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _started_ns = time.perf_counter_ns()
+
+
+def count(name: str, amount: int = 1):
+    """Увеличивает счетчик name (только если статистика включена)."""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def record_cache(name: str, hit: bool):
+    """Учитывает обращение к кэшу name: счетчики name.hits / name.misses."""
+    if not enabled:
+        return
+    key = f"{name}.hits" if hit else f"{name}.misses"
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def add_time(name: str, elapsed_ns: int):
+    """Учитывает вызов этапа name длительностью elapsed_ns (только если статистика включена)."""
+    if not enabled:
+        return
+    with _lock:
+        entry = _timers.get(name)
+        if entry is None:
+            _timers[name] = [1, elapsed_ns, elapsed_ns]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ns
+            if elapsed_ns > entry[2]:
+                entry[2] = elapsed_ns
+
+
+class _Timer:
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        add_time(self.name, time.perf_counter_ns() - self._start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """
+    Контекстный менеджер для замера этапа:
+        with stats.timer("ipc.snapshot"):
+            ...
+    При выключенной статистике возвращает общий пустой объект.
+    """
+    return _Timer(name) if enabled else _NULL_TIMER
+
+
+def timed(name: str):
+    """Декоратор: замеряет время каждого вызова функции под именем name."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add_time(name, time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> dict:
+    """
+    Текущие значения: {'elapsed_s', 'timers': {имя: {calls, total_ms, mean_us, max_us}},
+    'counters': {имя: значение}, 'cache_hit_rates': {кэш: доля попаданий}}.
+    """
+    with _lock:
+        timers = {name: list(entry) for name, entry in _timers.items()}
+        counters = dict(_counters)
+        started_ns = _started_ns
+    cache_hit_rates = {}
+    for name, value in counters.items():
+        if name.endswith(".hits"):
+            cache = name[:-len(".hits")]
+            total = value + counters.get(f"{cache}.misses", 0)
+            cache_hit_rates[cache] = value / total if total else 0.0
+    for name in counters:
+        if name.endswith(".misses"):
+            cache_hit_rates.setdefault(name[:-len(".misses")], 0.0)
+    return {
+        'elapsed_s': (time.perf_counter_ns() - started_ns) / 1e9,
+        'timers': {
+            name: {
+                'calls': calls,
+                'total_ms': total_ns / 1e6,
+                'mean_us': total_ns / calls / 1e3,
+                'max_us': max_ns / 1e3,
+            }
+            for name, (calls, total_ns, max_ns) in sorted(timers.items())
+        },
+        'counters': dict(sorted(counters.items())),
+        'cache_hit_rates': dict(sorted(cache_hit_rates.items())),
+    }
+
+
+def dump_json(filename: str = None) -> str:
+    """Возвращает статистику в JSON; если задан filename, записывает ее в файл."""
+    import json
+
+    text = json.dumps(snapshot(), ensure_ascii=False, indent=2)
+    if filename:
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def format_table() -> str:
+    """Статистика в виде текстовой таблицы."""
+    data = snapshot()
+    lines = [f"Статистика за {data['elapsed_s']:.3f} с"]
+    if data['timers']:
+        lines.append(f"{'Этап':<40} {'вызовов':>9} {'всего, мс':>11} {'среднее, мкс':>13} {'макс, мкс':>11}")
+        for name, timer_data in data['timers'].items():
+            lines.append(f"{name:<40} {timer_data['calls']:>9} {timer_data['total_ms']:>11.2f} "
+                         f"{timer_data['mean_us']:>13.1f} {timer_data['max_us']:>11.1f}")
+    if data['counters']:
+        lines.append(f"{'Счетчик':<40} {'значение':>9}")
+        for name, value in data['counters'].items():
+            lines.append(f"{name:<40} {value:>9}")
+    if data['cache_hit_rates']:
+        lines.append(f"{'Кэш':<40} {'попадания':>9}")
+        for name, rate in data['cache_hit_rates'].items():
+            lines.append(f"{name:<40} {rate:>8.1%}")
+    return "\n".join(lines)
+
+
+def install_dump_signal():
+    """
+    Печатает таблицу статистики по сигналу (SIGUSR1 в Linux/macOS, Ctrl+Break в Windows),
+    не прерывая работу. Возвращает False, если сигнал недоступен.
+    """
+    import signal
+
+    signal_number = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+    if signal_number is None:
+        return False
+    try:
+        signal.signal(signal_number, lambda signum, frame: logging.info("\n" + format_table()))
+    except (ValueError, OSError) as e:
+        logging.warning(f"Не удалось установить обработчик сигнала для статистики: {e}")
+        return False
+    return True
@@ -0,0 +1,468 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from . import stats
+from .title_matcher import GameTitleMatcher, PARTIAL_MATCH_MIN_LENGTH
+
+
+# --- Формат бинарного индекса названий игр ---
+# Заголовок: сигнатура, версия формата, количество названий,
+# размер и mtime_ns исходного текстового файла (для проверки актуальности), число и размер якорей.
+# Затем таблица смещений (count + 1 значений uint32) и блок названий в UTF-8.
+# Названия нормализованы (strip().lower()), без дубликатов и отсортированы по байтам UTF-8,
+# что совпадает с порядком сравнения строк Python.
+# В конце - якоря для поиска подстроки: различные первые PARTIAL_MATCH_MIN_LENGTH символов
+# названий. Сначала диапазоны [lo, hi) номеров названий с этим началом (пары uint32; такие
+# названия идут подряд), затем сами якоря в UTF-8 через "\n" в том же порядке.
+# Для каталога из 41 тыс. названий якорей около 7.5 тыс.
+INDEX_MAGIC = b"GTIX"
+INDEX_VERSION = 2
+_SIGNATURE = struct.Struct("<4sH")  # magic, version
+_HEADER = struct.Struct("<4sHHIQQII")  # magic, version, reserved, count, source_size, source_mtime_ns, anchor_count, anchors_size
+_OFFSET = struct.Struct("<I")
+_RANGE = struct.Struct("<II")
+
+
+def load_game_titles(filename="game_titles.txt") -> list:
+    """
+    Загружает названия игр из файла.
+
+    Args:
+        filename (str): Имя файла для загрузки. По умолчанию "game_titles.txt".
+
+    Returns:
+        list: Список названий игр в нижнем регистре.
+              Возвращает пустой список в случае ошибки.
+    """
+    game_titles = []
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                game_titles.append(line.strip().lower())
+        logging.info(f"Успешно загружено {len(game_titles)} названий игр из файла '{filename}'.")
+    except FileNotFoundError:
+        logging.warning(f"Файл с названиями игр '{filename}' не найден. Используется пустой список игр.")
+    except Exception as e:
+        logging.error(f"Произошла ошибка при чтении файла '{filename}': {e}")
+    return game_titles
+
+
+def source_version(size: int, mtime_ns: int) -> str:
+    """Версия текстового каталога по размеру и mtime_ns (см. MappedTitleCatalog.version, LazyTitleCatalog.version)."""
+    return f"source:{size}:{mtime_ns}"
+
+
+def default_index_path(source_filename: str) -> str:
+    """Путь к бинарному индексу рядом с текстовым каталогом (например, game_titles.txt.idx)."""
+    return source_filename + ".idx"
+
+
+def build_title_index(source_filename="game_titles.txt", index_filename=None) -> str:
+    """
+    Компилирует текстовый каталог названий игр в бинарный индекс.
+
+    Запись атомарна: индекс пишется во временный файл и подменяется через os.replace,
+    поэтому параллельные запуски не увидят частично записанный файл.
+
+    Returns:
+        str: Путь к созданному индексу.
+    """
+    if index_filename is None:
+        index_filename = default_index_path(source_filename)
+    source_stat = os.stat(source_filename)
+    titles = set()
+    with open(source_filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            title = line.strip().lower()
+            if title:
+                titles.add(title)
+    encoded_titles = sorted(title.encode('utf-8') for title in titles)
+
+    anchors = {}
+    for i, title in enumerate(encoded_titles):
+        anchor = title.decode('utf-8')[:PARTIAL_MATCH_MIN_LENGTH]
+        if len(anchor) == PARTIAL_MATCH_MIN_LENGTH:
+            lo, _ = anchors.get(anchor, (i, i))
+            anchors[anchor] = (lo, i + 1)
+    ranges = b"".join(_RANGE.pack(lo, hi) for lo, hi in anchors.values())
+    encoded_anchors = "\n".join(anchors).encode('utf-8')
+
+    offsets = bytearray()
+    position = 0
+    for title in encoded_titles:
+        offsets += _OFFSET.pack(position)
+        position += len(title)
+    offsets += _OFFSET.pack(position)
+
+    header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0, len(encoded_titles),
+                          source_stat.st_size, source_stat.st_mtime_ns, len(anchors), len(encoded_anchors))
+    temp_filename = f"{index_filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_filename, 'wb') as f:
+            f.write(header)
+            f.write(offsets)
+            f.write(b"".join(encoded_titles))
+            f.write(ranges)
+            f.write(encoded_anchors)
+        os.replace(temp_filename, index_filename)
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+    logging.info(f"Построен индекс названий игр '{index_filename}': {len(encoded_titles)} названий.")
+    return index_filename
+
+
+class MappedTitleCatalog:
+    """
+    Каталог названий игр поверх бинарного индекса, отображенного в память (mmap).
+
+    Поиск выполняется бинарным поиском по байтам UTF-8 без создания строк Python
+    для всего каталога. Интерфейс совместим с GameTitleMatcher
+    (`in`, len(), matches_part()), поэтому объект можно передавать в IconClassifier.
+
+    Для поиска подстроки (matches_part) в памяти держится небольшой словарь якорей
+    (первые PARTIAL_MATCH_MIN_LENGTH символов названий -> диапазон названий с этим началом,
+    ~7.5 тыс. записей): позиции имени без якоря пропускаются, а бинарный поиск идет только
+    внутри диапазона. Поиск подстроки все равно в несколько раз медленнее, чем
+    в GameTitleMatcher (сравнение срезов mmap вместо словаря Python), зато открытие каталога
+    занимает около миллисекунды вместо ~30 мс и десятков МБ на построение индекса всех названий.
+    """
+
+    def __init__(self, index_filename: str):
+        with open(index_filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version = _SIGNATURE.unpack_from(self._mmap, 0)
+            if magic == INDEX_MAGIC and version == INDEX_VERSION:
+                _, _, _, count, source_size, source_mtime_ns, anchor_count, anchors_size = \
+                    _HEADER.unpack_from(self._mmap, 0)
+        except struct.error:
+            self._mmap.close()
+            raise ValueError(f"Файл '{index_filename}' не является индексом названий игр (слишком короткий).")
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Файл '{index_filename}' не является индексом названий игр версии {INDEX_VERSION}.")
+        self.index_filename = index_filename
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        self._count = count
+        offsets_start = _HEADER.size
+        self._blob_start = offsets_start + (count + 1) * _OFFSET.size
+        if self._blob_start > len(self._mmap):
+            self._mmap.close()
+            raise ValueError(f"Индекс названий игр '{index_filename}' поврежден (обрезан).")
+        # Таблица смещений читается напрямую из отображенной памяти;
+        # на little-endian платформах - через memoryview без распаковки struct.
+        if sys.byteorder == "little":
+            self._offsets = memoryview(self._mmap)[offsets_start:self._blob_start].cast("I")
+        else:
+            self._offsets = [_OFFSET.unpack_from(self._mmap, offsets_start + i * _OFFSET.size)[0]
+                             for i in range(count + 1)]
+        ranges_start = self._blob_start + self._offsets[count]
+        anchors_start = ranges_start + anchor_count * _RANGE.size
+        if anchors_start + anchors_size > len(self._mmap):
+            self.close()
+            raise ValueError(f"Индекс названий игр '{index_filename}' поврежден (обрезан).")
+        anchors = self._mmap[anchors_start:anchors_start + anchors_size].decode('utf-8').split("\n") if anchor_count else []
+        ranges = _RANGE.iter_unpack(self._mmap[ranges_start:anchors_start])
+        self._anchors = dict(zip(anchors, ranges))
+        if len(self._anchors) != anchor_count:
+            self.close()
+            raise ValueError(f"Индекс названий игр '{index_filename}' поврежден (таблица якорей).")
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._mmap.close()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def version(self) -> str:
+        """Версия каталога для кэшей классификации: размер и mtime_ns исходного файла."""
+        return source_version(self.source_size, self.source_mtime_ns)
+
+    def _title_bytes(self, i: int) -> bytes:
+        blob_start = self._blob_start
+        return self._mmap[blob_start + self._offsets[i]:blob_start + self._offsets[i + 1]]
+
+    def _bisect_right(self, key: bytes, lo: int, hi: int) -> int:
+        """Индекс первого названия, строго большего key, среди названий [lo, hi)."""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < self._title_bytes(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _bisect_left(self, key: bytes) -> int:
+        """Индекс первого названия, не меньшего key."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, name_lower: str) -> bool:
+        """Точное совпадение имени (в нижнем регистре) с названием игры."""
+        if stats.enabled:
+            stats.count("titles.exact_lookups")
+        key = name_lower.encode('utf-8')
+        i = self._bisect_left(key)
+        return i < self._count and self._title_bytes(i) == key
+
+    def has_prefix(self, prefix_lower: str) -> bool:
+        """Проверяет, начинается ли хотя бы одно название с prefix_lower."""
+        key = prefix_lower.encode('utf-8')
+        i = self._bisect_left(key)
+        return i < self._count and self._title_bytes(i).startswith(key)
+
+    def iter_prefix(self, prefix_lower: str):
+        """Возвращает (генератором) названия, начинающиеся с prefix_lower, в порядке сортировки."""
+        key = prefix_lower.encode('utf-8')
+        i = self._bisect_left(key)
+        while i < self._count:
+            title = self._title_bytes(i)
+            if not title.startswith(key):
+                break
+            yield title.decode('utf-8')
+            i += 1
+
+    def matches_part(self, name_lower: str) -> bool:
+        """
+        Проверяет, содержит ли имя (в нижнем регистре) хотя бы одно название игры
+        длиной не менее PARTIAL_MATCH_MIN_LENGTH символов как подстроку.
+
+        Для каждой позиции имени, с которой начинается хотя бы одно название (по якорям),
+        ищется самое длинное название, являющееся префиксом оставшейся части, среди названий
+        с тем же якорем: берется наибольшее название <= суффикса; если оно не префикс,
+        суффикс укорачивается до общего префикса с ним, и поиск повторяется левее.
+        """
+        probes = 0  # Шаги спуска по индексу (для статистики)
+        found = False
+        anchors = self._anchors
+        for start in range(len(name_lower) - PARTIAL_MATCH_MIN_LENGTH + 1):
+            # Диапазон названий, начинающихся с этих символов; если таких нет, спуск не нужен
+            bounds = anchors.get(name_lower[start:start + PARTIAL_MATCH_MIN_LENGTH])
+            if bounds is None:
+                continue
+            lo, hi = bounds
+            suffix = name_lower[start:]
+            key = suffix.encode('utf-8')
+            # Минимальная длина в байтах UTF-8 для PARTIAL_MATCH_MIN_LENGTH символов
+            min_key_length = len(suffix[:PARTIAL_MATCH_MIN_LENGTH].encode('utf-8'))
+            while len(key) >= min_key_length:
+                probes += 1
+                i = self._bisect_right(key, lo, hi) - 1
+                if i < lo:
+                    break
+                title = self._title_bytes(i)
+                if key.startswith(title):
+                    # Самое длинное название-префикс; более короткие не нужны
+                    found = True
+                    break
+                common = 0
+                limit = min(len(title), len(key))
+                while common < limit and title[common] == key[common]:
+                    common += 1
+                key = key[:common]
+                hi = i
+            if found:
+                break
+        if stats.enabled:
+            stats.count("titles.partial_scans")
+            stats.count("titles.index_probes", probes)
+        return found
+
+
+def open_title_catalog(source_filename="game_titles.txt", index_filename=None):
+    """
+    Открывает каталог названий игр для классификации.
+
+    Использует бинарный индекс (mmap), перестраивая его, если текстовый файл изменился
+    или формат индекса устарел. Если индекс недоступен для записи или чтения,
+    каталог загружается в память через load_game_titles().
+
+    Returns:
+        MappedTitleCatalog или GameTitleMatcher.
+    """
+    if index_filename is None:
+        index_filename = default_index_path(source_filename)
+    try:
+        source_stat = os.stat(source_filename)
+    except FileNotFoundError:
+        logging.warning(f"Файл с названиями игр '{source_filename}' не найден. Используется пустой список игр.")
+        return GameTitleMatcher([])
+
+    try:
+        catalog = MappedTitleCatalog(index_filename)
+        if catalog.source_size == source_stat.st_size and catalog.source_mtime_ns == source_stat.st_mtime_ns:
+            logging.info(f"Загружен индекс названий игр '{index_filename}': {len(catalog)} названий.")
+            return catalog
+        catalog.close()
+        logging.info(f"Файл '{source_filename}' изменился, индекс названий игр будет перестроен.")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logging.warning(f"Не удалось открыть индекс названий игр '{index_filename}': {e}. Индекс будет перестроен.")
+
+    try:
+        build_title_index(source_filename, index_filename)
+        return MappedTitleCatalog(index_filename)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Не удалось построить индекс названий игр '{index_filename}': {e}. Каталог загружается в память.")
+        # Пустые строки файла не считаются названиями - как при построении индекса
+        return GameTitleMatcher(title for title in load_game_titles(source_filename) if title)
+
+
+class LazyTitleCatalog:
+    """
+    Каталог названий игр, который открывается при первом обращении.
+
+    Большинство иконок классифицируются до сравнения с названиями игр (папки, системные
+    элементы, интернет-ярлыки, документы по расширению), поэтому каталог открывается
+    (open_title_catalog()) только когда он действительно нужен. Потокобезопасно:
+    при одновременном первом обращении из нескольких потоков каталог открывается один раз,
+    а close() во время поиска в другом потоке не закрывает отображение в память под ним -
+    каталог закрывается после завершения последнего поиска.
+    Время открытия попадает в статистику (таймер "titles.load").
+    """
+
+    def __init__(self, source_filename="game_titles.txt", index_filename=None, opener=None):
+        """
+        Args:
+            source_filename (str): Текстовый каталог названий игр.
+            index_filename (str, optional): Бинарный индекс (по умолчанию рядом с каталогом).
+            opener (callable, optional): Функция открытия (source_filename, index_filename),
+                                         по умолчанию open_title_catalog.
+        """
+        self.source_filename = source_filename
+        self.index_filename = index_filename
+        self._opener = opener or open_title_catalog
+        self._catalog = None
+        self._version = None
+        # Защищает self._catalog и счетчики поисков
+        self._lock = threading.Lock()
+        # id(каталога) -> число выполняющихся с ним поисков
+        self._in_flight = {}
+        # id закрытых через close() каталогов, с которыми еще выполняются поиски
+        self._retired = set()
+
+    @property
+    def loaded(self) -> bool:
+        return self._catalog is not None
+
+    @property
+    def version(self) -> str:
+        """
+        Версия каталога для кэшей классификации. Определяется по os.stat() исходного файла
+        без открытия каталога и запоминается при первом обращении.
+        """
+        if self._version is None:
+            try:
+                source_stat = os.stat(self.source_filename)
+                self._version = source_version(source_stat.st_size, source_stat.st_mtime_ns)
+            except OSError:
+                self._version = "source:missing"
+        return self._version
+
+    def _open(self):
+        """Открывает каталог; вызывается под self._lock."""
+        start = time.perf_counter_ns()
+        catalog = self._opener(self.source_filename, self.index_filename)
+        elapsed_ns = time.perf_counter_ns() - start
+        if stats.enabled:
+            stats.add_time("titles.load", elapsed_ns)
+        logging.info(f"Каталог названий игр открыт по первому обращению за {elapsed_ns / 1e6:.1f} мс.")
+        self._catalog = catalog
+        return catalog
+
+    def get(self):
+        """
+        Возвращает открытый каталог (MappedTitleCatalog или GameTitleMatcher), открывая его при необходимости.
+        Объект нельзя использовать после close(); поиск через методы LazyTitleCatalog от этого защищен.
+        """
+        with self._lock:
+            catalog = self._catalog
+            if catalog is None:
+                catalog = self._open()
+        return catalog
+
+    def _acquire(self):
+        """Текущий каталог, занятый поиском до _release()."""
+        with self._lock:
+            catalog = self._catalog
+            if catalog is None:
+                catalog = self._open()
+            key = id(catalog)
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        return catalog
+
+    def _release(self, catalog):
+        """Освобождает каталог; закрытый через close() каталог закрывается после последнего поиска."""
+        key = id(catalog)
+        with self._lock:
+            remaining = self._in_flight[key] - 1
+            if remaining:
+                self._in_flight[key] = remaining
+                return
+            del self._in_flight[key]
+            if key not in self._retired:
+                return
+            self._retired.remove(key)
+        _close_catalog(catalog)
+
+    def __contains__(self, name_lower: str) -> bool:
+        catalog = self._acquire()
+        try:
+            return name_lower in catalog
+        finally:
+            self._release(catalog)
+
+    def matches_part(self, name_lower: str) -> bool:
+        catalog = self._acquire()
+        try:
+            return catalog.matches_part(name_lower)
+        finally:
+            self._release(catalog)
+
+    def __len__(self):
+        return len(self.get())
+
+    def close(self):
+        """
+        Закрывает открытый каталог; следующее обращение откроет его заново.
+        Если в других потоках еще идет поиск, каталог закрывается после его завершения.
+        """
+        with self._lock:
+            catalog = self._catalog
+            self._catalog = None
+            self._version = None
+            if catalog is None:
+                return
+            busy = id(catalog) in self._in_flight
+            if busy:
+                self._retired.add(id(catalog))
+        if not busy:
+            _close_catalog(catalog)
+
+
+def _close_catalog(catalog):
+    if hasattr(catalog, "close"):
+        catalog.close()
+
+
+if __name__ == "__main__":
+    # Шаг сборки: python -m desktop_sort.title_catalog [game_titles.txt [game_titles.txt.idx]]
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    build_title_index(*sys.argv[1:3])
@@ -0,0 +1,112 @@
+import logging
+
+from . import stats
+
+
+# Минимальная длина названия игры, участвующего в поиске подстроки.
+# Соответствует исходному условию `len(game_title_part) > 3`.
+PARTIAL_MATCH_MIN_LENGTH = 4
+
+
+class KeywordMatcher:
+    """
+    Поиск любого из набора ключевых слов как подстроки строки.
+
+    Ключевые слова индексируются по "якорю" - первым anchor_length символам
+    (anchor_length равна длине самого короткого слова, но не больше PARTIAL_MATCH_MIN_LENGTH).
+    Для каждой позиции в строке проверяются только слова, начинающиеся с найденного якоря,
+    поэтому стоимость проверки зависит от длины строки, а не от числа ключевых слов.
+
+    Полноценный автомат Ахо-Корасик на 41 тыс. названий игр дает ~460 тыс. состояний
+    (около 100 МБ словарей Python и секунды на построение), поэтому используется
+    индекс по якорям: он дает те же решения при построении за десятки миллисекунд.
+    """
+
+    def __init__(self, keywords):
+        """
+        Args:
+            keywords (iterable): Ключевые слова (сравнение регистрозависимое,
+                                 обычно передаются строки в нижнем регистре).
+        """
+        self._keywords = {keyword for keyword in keywords if keyword}
+        self._anchor_length = min((len(keyword) for keyword in self._keywords), default=1)
+        self._anchor_length = min(self._anchor_length, PARTIAL_MATCH_MIN_LENGTH)
+        anchors = {}
+        for keyword in self._keywords:
+            anchors.setdefault(keyword[:self._anchor_length], set()).add(len(keyword))
+        # Для каждого якоря храним отсортированные длины слов, чтобы прерывать перебор,
+        # как только слово не помещается в оставшуюся часть строки.
+        self._anchor_lengths = {anchor: tuple(sorted(lengths)) for anchor, lengths in anchors.items()}
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def contains_any(self, text: str) -> bool:
+        """Эквивалентно `any(keyword in text for keyword in keywords)`."""
+        anchor_lengths = self._anchor_lengths
+        keywords = self._keywords
+        anchor_length = self._anchor_length
+        text_length = len(text)
+        for start in range(text_length - anchor_length + 1):
+            lengths = anchor_lengths.get(text[start:start + anchor_length])
+            if lengths is None:
+                continue
+            remaining = text_length - start
+            for length in lengths:
+                if length > remaining:
+                    break
+                if text[start:start + length] in keywords:
+                    return True
+        return False
+
+
+class GameTitleMatcher:
+    """
+    Индекс названий игр, построенный один раз из списка load_game_titles().
+
+    Точное совпадение проверяется по множеству (O(1) вместо линейного поиска по списку),
+    поиск подстроки (шаг 6 get_icon_category) - через KeywordMatcher.
+    """
+
+    def __init__(self, game_titles):
+        """
+        Args:
+            game_titles (iterable): Названия игр в нижнем регистре (как возвращает load_game_titles()).
+        """
+        self._titles = set(game_titles)
+        self._partial = KeywordMatcher(title for title in self._titles if len(title) >= PARTIAL_MATCH_MIN_LENGTH)
+        self._version = None
+        logging.debug(f"Построен индекс названий игр: {len(self._titles)} названий.")
+
+    def __len__(self):
+        return len(self._titles)
+
+    @property
+    def version(self) -> str:
+        """Версия каталога для кэшей классификации: хеш отсортированных названий (вычисляется один раз)."""
+        if self._version is None:
+            import hashlib
+            digest = hashlib.blake2b(digest_size=16)
+            for title in sorted(self._titles):
+                digest.update(title.encode("utf-8"))
+                digest.update(b"\n")
+            self._version = "titles:" + digest.hexdigest()
+        return self._version
+
+    def __contains__(self, name_lower: str) -> bool:
+        """Точное совпадение имени (в нижнем регистре) с названием игры."""
+        if stats.enabled:
+            stats.count("titles.exact_lookups")
+        return name_lower in self._titles
+
+    def matches_part(self, name_lower: str) -> bool:
+        """
+        Проверяет, содержит ли имя (в нижнем регистре) хотя бы одно название игры
+        длиной не менее PARTIAL_MATCH_MIN_LENGTH символов как подстроку.
+
+        Эквивалентно `any(t in name_lower for t in game_titles if len(t) > 3)`.
+        """
+        if stats.enabled:
+            stats.count("titles.partial_scans")
+            stats.count("titles.partial_positions", max(0, len(name_lower) - PARTIAL_MATCH_MIN_LENGTH + 1))
+        return self._partial.contains_any(name_lower)
@@ -0,0 +1,151 @@
+from . import stats
+
+
+def split_url(url_lower: str) -> tuple:
+    """
+    Разбирает URL (в нижнем регистре) на (схема, хост, путь) без urllib.
+
+    Схема - часть до "://" ("" если ее нет), хост - без учетных данных, порта и завершающей точки,
+    путь - от первого "/" после хоста без "?" и "#". Для URL без "://" (например, "youtube.com/watch")
+    хостом считается начало строки.
+    """
+    scheme, separator, rest = url_lower.partition("://")
+    if not separator:
+        scheme, rest = "", url_lower
+    end = len(rest)
+    for delimiter in "/?#":
+        position = rest.find(delimiter)
+        if position != -1 and position < end:
+            end = position
+    host = rest[:end]
+    path = rest[end:]
+    if host:
+        host = host.rpartition("@")[2]
+        if host.startswith("["):  # IPv6-адрес
+            host = host[:host.find("]") + 1]
+        else:
+            host = host.partition(":")[0]
+        host = host.rstrip(".")
+    for delimiter in "?#":
+        path = path.partition(delimiter)[0]
+    return scheme, host, path
+
+
+def _path_segments(path: str) -> tuple:
+    return tuple(segment for segment in path.split("/") if segment)
+
+
+class _HostNode:
+    __slots__ = ("children", "category", "path_rules")
+
+    def __init__(self):
+        self.children = {}
+        self.category = None
+        # Правила с путем для этого хоста: (сегменты пути, категория), самые длинные первыми
+        self.path_rules = ()
+
+
+class SiteMatcher:
+    """
+    Правила для интернет-ярлыков, скомпилированные один раз.
+
+    - Правила схем ("steam://rungameid/", "epicgames://") - словарь схема -> (префикс остатка, категория),
+      поиск не зависит от числа схем.
+    - Правила сайтов ("youtube.com", "docs.google.com") - дерево меток хоста от домена верхнего уровня:
+      правило совпадает с самим хостом и его поддоменами ("www.youtube.com"), но не с
+      "notyoutube.com" или "youtube.com.example". Стоимость поиска зависит от числа меток хоста,
+      а не от числа правил.
+    - Правила с путем ("epicgames.com/store") хранятся в узле хоста и сравниваются по сегментам пути
+      ("/store/p/game", но не "/storefront").
+
+    При нескольких совпадениях побеждает наиболее точное: более длинный хост, затем правило с путем.
+    """
+
+    def __init__(self, sites=None, schemes=None):
+        """
+        Args:
+            sites (dict): Правила сайтов: "хост" или "хост/путь" -> код категории (Category или register_category()).
+            schemes (dict): Правила схем: "схема://префикс" -> код категории.
+        """
+        self._root = _HostNode()
+        self._schemes = {}
+        self._rules = []
+        for rule, category in (schemes or {}).items():
+            self.add_scheme(rule, category)
+        for rule, category in (sites or {}).items():
+            self.add_site(rule, category)
+
+    def add_scheme(self, rule: str, category: int):
+        rule = rule.lower()
+        scheme, separator, prefix = rule.partition("://")
+        if not separator:
+            raise ValueError(f"Правило схемы '{rule}' должно содержать '://'.")
+        prefixes = [entry for entry in self._schemes.get(scheme, ()) if entry[0] != prefix]
+        prefixes.append((prefix, category))
+        prefixes.sort(key=lambda entry: len(entry[0]), reverse=True)
+        self._schemes[scheme] = tuple(prefixes)
+        self._rules.append(("scheme", rule, category))
+
+    def add_site(self, rule: str, category: int):
+        rule = rule.lower()
+        _, host, path = split_url(rule)
+        if not host:
+            raise ValueError(f"В правиле сайта '{rule}' нет имени хоста.")
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.children.setdefault(label, _HostNode())
+        segments = _path_segments(path)
+        if segments:
+            path_rules = [entry for entry in node.path_rules if entry[0] != segments]
+            path_rules.append((segments, category))
+            path_rules.sort(key=lambda entry: len(entry[0]), reverse=True)
+            node.path_rules = tuple(path_rules)
+        else:
+            node.category = category
+        self._rules.append(("site", rule, category))
+
+    def rules(self) -> tuple:
+        """Все правила в порядке добавления (для версии набора правил)."""
+        return tuple(self._rules)
+
+    def match_scheme(self, url_lower: str):
+        """Категория по правилу схемы или None."""
+        scheme, separator, rest = url_lower.partition("://")
+        if not separator:
+            return None
+        for prefix, category in self._schemes.get(scheme, ()):
+            if rest.startswith(prefix):
+                return category
+        return None
+
+    def match(self, url_lower: str):
+        """Категория URL (в нижнем регистре) по правилам схем и сайтов или None."""
+        if stats.enabled:
+            stats.count("sites.lookups")
+        category = self.match_scheme(url_lower)
+        if category is not None:
+            return category
+        _, host, path = split_url(url_lower)
+        if not host:
+            return None
+        segments = None
+        node = self._root
+        best = None
+        for label in reversed(host.split(".")):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if node.path_rules:
+                if segments is None:
+                    segments = _path_segments(path)
+                for rule_segments, rule_category in node.path_rules:
+                    if segments[:len(rule_segments)] == rule_segments:
+                        best = rule_category
+                        break
+                else:
+                    if node.category is not None:
+                        best = node.category
+                continue
+            if node.category is not None:
+                best = node.category
+        return best
@@ -2,340 +2,38 @@ import os
 import ctypes
 from ctypes import wintypes
 
-import win32api
-import win32gui
-import win32con
-import ctypes
 import struct
 import time
-from pywinauto import Desktop
-from pywinauto.controls.uia_controls import ListViewWrapper # Для более точной подсказки типов
 import logging
-import configparser # Добавляем импорт для работы с файлами .url
 import sys
-import os
 import re
 import json  # Для примера данных
+import argparse
+
+# win32gui (pywin32) импортируется в функциях, которые работают с окнами Windows,
+# чтобы модуль импортировался без pywin32 (например, для классификации в Linux)
+from desktop_sort import stats
+from desktop_sort.classifier import IconClassifier
+from desktop_sort.codes import CATEGORY_NAMES, DEFAULT_LANGUAGE, set_language
+from desktop_sort.title_catalog import LazyTitleCatalog
+from desktop_sort.desktop_items import DesktopIndex
+from desktop_sort.cache import ClassificationCache, ShortcutResolutionCache
+from desktop_sort.listview import LVM_SETITEMPOSITION, DesktopListViewSession
+from desktop_sort.scanner import DEFAULT_RESOLVE_WORKERS, iter_desktop_icons
+from desktop_sort.layout import compute_layout
+from desktop_sort.planner import plan_moves
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
-# --- Определение структур Windows API с помощью ctypes ---
-
-# Константы для VirtualAllocEx
-MEM_COMMIT = 0x1000
-MEM_RESERVE = 0x2000
-MEM_RELEASE = 0x8000
-PAGE_READWRITE = 0x04
-
-# !!! ДОБАВЛЕННЫЕ КОНСТАНТЫ ДЛЯ LISTVIEW !!!
-LVM_FIRST = 0x1000
-LVM_GETITEMCOUNT = LVM_FIRST + 4
-LVM_GETITEMTEXTW = LVM_FIRST + 75
-LVM_GETITEMPOSITION = LVM_FIRST + 16
-LVM_SETITEMPOSITION = LVM_FIRST + 15
-
-LVIF_TEXT = 0x0001 # Флаг для LVITEM.mask, чтобы указать, что нужен текст
-
-# Загрузка DLL-библиотек
-kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-user32 = ctypes.WinDLL('user32', use_last_error=True)
-
-# Структура LVITEM (ListView Item) для получения текста
-class LVITEM(ctypes.Structure):
-    _fields_ = [
-        ("mask", wintypes.UINT),
-        ("iItem", wintypes.INT),
-        ("iSubItem", wintypes.INT),
-        ("state", wintypes.UINT),
-        ("stateMask", wintypes.UINT),
-        ("pszText", wintypes.LPWSTR),  # LPWSTR для Unicode (wide string)
-        ("cchTextMax", wintypes.INT),
-        ("iImage", wintypes.INT),
-        ("lParam", wintypes.LPARAM),
-        ("iIndent", wintypes.INT),
-        ("iGroupId", wintypes.INT),
-        ("cColumns", wintypes.UINT),
-        ("puColumns", ctypes.POINTER(wintypes.UINT)),
-        ("piColFmt", ctypes.POINTER(wintypes.INT)),
-        ("iGroup", wintypes.INT),
-    ]
-
-# Структура POINT для получения координат
-class POINT(ctypes.Structure):
-    _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
-
-
-def load_game_titles(filename="game_titles.txt") -> list:
-    """
-    Загружает названия игр из файла.
-
-    Args:
-        filename (str): Имя файла для загрузки. По умолчанию "game_titles.txt".
-
-    Returns:
-        list: Список названий игр в нижнем регистре.
-              Возвращает пустой список в случае ошибки.
-    """
-    game_titles = []
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line in f:
-                game_titles.append(line.strip().lower())
-        logging.info(f"Успешно загружено {len(game_titles)} названий игр из файла '{filename}'.")
-    except FileNotFoundError:
-        logging.warning(f"Файл с названиями игр '{filename}' не найден. Используется пустой список игр.")
-    except Exception as e:
-        logging.error(f"Произошла ошибка при чтении файла '{filename}': {e}")
-    return game_titles
-
-
-def get_icon_category(icon_info: dict, game_titles: list) -> str:
-    """
-    Определяет категорию иконки на основе ее информации и списка названий игр.
-    Использует расширенную информацию об иконке, включая оригинальное имя и тип.
-    """
-    # Инициализация переменных из icon_info
-    name_lower = icon_info['name'].lower() # Имя для классификации (например, имя цели ярлыка)
-    resolved_icon_type_lower = icon_info['type'].lower() if icon_info['type'] else "неизвестный тип"
-    path_lower = icon_info['full_path'].lower() if icon_info['full_path'] else ""
-    original_icon_name_lower = icon_info['original_icon_name'].lower()
-    original_desktop_type_lower = icon_info['original_desktop_type'].lower()
-
-    file_extension = None
-    if path_lower and resolved_icon_type_lower != "папка" and \
-       not path_lower.startswith("http") and \
-       not path_lower.startswith("steam:") and \
-       not path_lower.startswith("epicgames:") and \
-       '.' in os.path.basename(path_lower):
-        file_extension = os.path.splitext(os.path.basename(path_lower))[1].lower()
-
-    # Определения списков и словарей
-    system_names_exact = ["корзина", "этот компьютер", "мой компьютер", "панель управления", "network", "сеть", "computer", "control panel", "recycle bin"]
-
-    doc_extensions = [
-        '.txt', '.md', '.log', '.doc', '.docx', '.rtf', '.odt', '.tex', '.json', '.xml',
-        '.yaml', '.ini', '.cfg', '.pdf', '.xls', '.xlsx', '.ppt', '.pptx', '.csv',
-        '.epub', '.mobi'
-    ]
-    img_extensions = [
-        '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg', '.tiff', '.webp',
-        '.psd', '.ai', '.raw', '.heic', '.heif'
-    ]
-    video_extensions = [
-        '.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mpeg', '.mpg'
-    ]
-    audio_extensions = [
-        '.mp3', '.wav', '.ogg', '.flac', '.aac', '.m4a', '.wma'
-    ]
-    archive_extensions = [
-        '.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso'
-    ]
-    dev_extensions = [
-        '.py', '.pyw', '.js', '.html', '.css', '.java', '.class', '.cpp', '.c', '.h',
-        '.hpp', '.cs', '.sh', '.bat', '.ps1', '.php', '.rb', '.go', '.swift', '.kt',
-        '.kts', '.sql', '.ipynb', '.jar', '.sln', '.csproj', '.vb', '.ts'
-    ]
-
-    known_program_exe_strict = {
-        "chrome.exe": "Браузеры", "firefox.exe": "Браузеры", "msedge.exe": "Браузеры",
-        "opera.exe": "Браузеры", "iexplore.exe": "Браузеры",
-        "winword.exe": "Офисные программы", "excel.exe": "Офисные программы",
-        "powerpnt.exe": "Офисные программы", "outlook.exe": "Офисные программы",
-        "libreoffice.exe": "Офисные программы", "soffice.bin": "Офисные программы",
-        "pycharm64.exe": "Разработка", "pycharm.exe": "Разработка",
-        "idea64.exe": "Разработка", "idea.exe": "Разработка",
-        "code.exe": "Разработка", "devenv.exe": "Разработка", "atom.exe": "Разработка",
-        "sublimetext.exe": "Разработка", "notepad++.exe": "Разработка",
-        "vlc.exe": "Мультимедиа", "wmplayer.exe": "Мультимедиа", "spotify.exe": "Мультимедиа",
-        "itunes.exe": "Мультимедиа", "audacity.exe": "Мультимедиа",
-        "photoshop.exe": "Графика и 3D", "gimp-2.10.exe": "Графика и 3D", "gimp.exe": "Графика и 3D",
-        "blender.exe": "Графика и 3D",
-        "obs64.exe": "Утилиты", "obs32.exe": "Утилиты",
-        "utorrent.exe": "Утилиты", "qbittorrent.exe": "Утилиты", "filezilla.exe": "Утилиты",
-        "explorer.exe": "Системные", "taskmgr.exe": "Системные", "cmd.exe": "Системные",
-        "powershell.exe": "Системные", "regedit.exe": "Системные", "control.exe": "Системные",
-        "discord.exe": "Мессенджеры", "telegram.exe": "Мессенджеры", "skype.exe": "Мессенджеры",
-        "zoom.exe": "Мессенджеры", "slack.exe": "Мессенджеры",
-        "steam.exe": "Игровые платформы", "epicgameslauncher.exe": "Игровые платформы",
-        "battle.net.exe": "Игровые платформы", "origin.exe": "Игровые платформы",
-        "goggalaxy.exe": "Игровые платформы", "ubisoftconnect.exe": "Игровые платформы",
-        "fileweederapp.exe": "Утилиты", "hfs.exe": "Утилиты", "x360ce.exe": "Утилиты",
-        "engine.exe": "Программы" # Generic, hopefully caught by game name first
-    }
-    known_program_keywords_broader = {
-        "visual studio", "pycharm", "intellij idea", "android studio",
-        "google chrome", "mozilla firefox", "microsoft edge", "opera browser",
-        "microsoft office", "libreoffice", "openoffice",
-        "adobe photoshop", "adobe illustrator", "adobe premiere", "adobe acrobat",
-        "autodesk autocad", "autodesk maya", "autodesk 3ds max",
-        "obs studio", "vlc media player", "windows media player",
-        "control panel", "панель управления", "диспетчер задач", "task manager",
-        "command prompt", "powershell", "terminal",
-        "steam", "epic games launcher", "battle.net", "origin client", "gog galaxy", "uplay", "ubisoft connect",
-        "utorrent", "bittorrent", "discord", "telegram desktop", "skype", "zoom meetings",
-        "audacity", "blender", "gimp", "notepad++", "sublime text", "vs code",
-        "fileweeder", "http file server"
-    }
-
-    known_games_keywords_strict = [
-        "minecraft", "fortnite", "valorant", "league of legends", "dota 2",
-        "counter-strike", "csgo", "cs:go", "cyberpunk 2077", "the witcher", "ведьмак",
-        "grand theft auto", "gta v", "stray", "elden ring", "baldurs gate", "baldurs gate 3",
-        "starcraft", "diablo", "overwatch", "world of warcraft",
-        "call of duty", "battlefield", "apex legends", "genshin impact",
-        "terraria", "stardew valley", "doom", "fallout", "skyrim",
-        "civilization", "sims", "fifa", "nba 2k",
-        "lego® звездные войны™ скайуокер сага", "корсары - гпк rev.3" # From logs, will be lowercased by logic
-    ]
-    # Convert strict game keywords to lowercase once, as they are compared with lowercased names
-    known_games_keywords_strict = [kw.lower() for kw in known_games_keywords_strict]
-
-    game_path_indicators = [
-        os.path.join("steam", "steamapps", "common"), # Relative to Program Files or library
-        os.path.join("steamlibrary", "steamapps", "common"),
-        os.path.join("epic games"),
-        os.path.join("gog games"),
-        os.path.join("origin games"),
-        os.path.join("ubisoft", "ubisoft game launcher", "games"),
-        os.path.join("blizzard"),
-        os.path.join("riot games"),
-        os.path.join("my games"),
-        "games" + os.sep, # e.g. D:\Games\
-        "игры" + os.sep   # e.g. D:\Игры\
-    ]
-    # Add Program Files paths dynamically
-    pf_paths = [os.environ.get("ProgramFiles", "C:\\Program Files"),
-                os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)")]
-    for pf_path in pf_paths:
-        if pf_path: # Ensure the env variable exists
-            game_path_indicators.append(os.path.join(pf_path.lower(), "steam", "steamapps", "common"))
-            # Add other specific game launcher paths under Program Files if needed
-
-    # 1. Папки
-    if resolved_icon_type_lower == "папка":
-        return "Папки"
-
-    # 2. Системные элементы
-    if original_desktop_type_lower == "неизвестный тип" and original_icon_name_lower in system_names_exact:
-        return "Системные"
-
-    # 3. Интернет-ярлыки
-    if original_desktop_type_lower == "интернет-ярлык":
-        if path_lower.startswith("steam://rungameid/"):
-            return "Игры" # Steam игры - особый случай
-        if path_lower.startswith("epicgames://"): # Hypothetical, for Epic Games Launcher if it uses such links
-             return "Игры"
-        # Известные сайты/сервисы
-        known_sites = {
-            "docs.google.com": "Документы (Онлайн)",
-            "youtube.com": "Мультимедиа (Онлайн)", "youtu.be": "Мультимедиа (Онлайн)",
-            "github.com": "Разработка (Онлайн)",
-            "figma.com": "Дизайн (Онлайн)",
-            "drive.google.com": "Файлы (Облако)", "onedrive.live.com": "Файлы (Облако)", "dropbox.com": "Файлы (Облако)",
-            # Можно добавить игровые магазины или страницы игр, если они не через спец. протоколы
-            "store.steampowered.com": "Игры (Магазин)", "epicgames.com/store": "Игры (Магазин)", "gog.com": "Игры (Магазин)",
-        }
-        for domain, category in known_sites.items():
-            if domain in path_lower:
-                return category
-        return "Интернет-ссылки" # Общая категория для остальных URL
-
-    # 4. Классификация по расширению файла (используем file_extension)
-    if file_extension:
-        if file_extension in doc_extensions: return "Документы"
-        if file_extension in img_extensions: return "Изображения"
-        if file_extension in video_extensions: return "Видео"
-        if file_extension in audio_extensions: return "Аудио"
-        if file_extension in archive_extensions: return "Архивы"
-        if file_extension in dev_extensions: return "Файлы разработки"
-        # .exe файлы будут обработаны ниже, чтобы сначала проверить на известные программы/игры
-
-    # 5. Идентификация известных неигровых программ
-    exe_name = None
-    if file_extension == ".exe" and path_lower:
-        exe_name = os.path.basename(path_lower) # path_lower здесь это resolved path
-        if exe_name in known_program_exe_strict:
-            return known_program_exe_strict[exe_name]
-
-    # Проверка по ключевым словам для программ (имя и путь)
-    # name_lower - это resolved name, original_icon_name_lower - это имя иконки на раб. столе
-    for keyword_set in [name_lower, original_icon_name_lower, path_lower]:
-        if any(prog_keyword in keyword_set for prog_keyword in known_program_keywords_broader):
-            return "Программы"
-
-    # Проверка на Program Files или System32 для .exe и ярлыков, указывающих на .exe
-    if resolved_icon_type_lower == "исполняемый файл" or \
-       (original_desktop_type_lower == "ярлык" and file_extension == ".exe"): # Ярлык на .exe
-        program_files_paths = [
-            os.environ.get("ProgramFiles", "C:\\Program Files").lower() + os.sep,
-            os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)").lower() + os.sep,
-            os.environ.get("WinDir", "C:\\Windows").lower() + os.sep + "system32" + os.sep,
-        ]
-        if any(pf_path in path_lower for pf_path in program_files_paths):
-            # Исключаем игровые лаунчеры, которые могут быть в Program Files, но уже отнесены к программам
-            # или если игра случайно установлена в Program Files, но её имя есть в game_titles
-            if name_lower in game_titles or original_icon_name_lower in game_titles:
-                 return "Игры" # Если игра по названию, но в Program Files
-            if exe_name and exe_name.lower() in ["steam.exe", "epicgameslauncher.exe", "gog galaxy.exe", "battle.net launcher.exe"]: # Уже обработано выше, но для надежности
-                return "Программы"
-            return "Программы"
-
-
-    # 6. Идентификация игр (game_titles - основной список из файла)
-    # name_lower это resolved name (например, "witcher3.exe" -> "witcher3")
-    # original_icon_name_lower это имя иконки на рабочем столе (например, "Ведьмак 3")
-    # game_titles are already lowercase
-    if name_lower in game_titles or original_icon_name_lower in game_titles:
-        return "Игры"
-    # Partial matches with game_titles (which is a list of lowercase strings)
-    if any(game_title_part in name_lower for game_title_part in game_titles if len(game_title_part) > 3):
-        return "Игры"
-    if any(game_title_part in original_icon_name_lower for game_title_part in game_titles if len(game_title_part) > 3):
-        return "Игры"
-
-    # known_games_keywords_strict are already lowercased during initialization
-    for keyword in known_games_keywords_strict:
-        if keyword in name_lower or keyword in original_icon_name_lower:
-            return "Игры"
-
-    # Проверка пути для игр (если это .exe или ярлык на .exe)
-    # path_lower is already lowercase. game_path_indicators should be constructed with lowercase components.
-    if resolved_icon_type_lower == "исполняемый файл" or \
-       (original_desktop_type_lower == "ярлык" and file_extension == ".exe"):
-        # Ensure all indicators are lowercase for comparison with path_lower
-        normalized_game_path_indicators = [ind.lower().replace("\\", os.sep).replace("/", os.sep) for ind in game_path_indicators]
-        normalized_path_lower = path_lower.replace("\\", os.sep).replace("/", os.sep)
-        if any(indicator in normalized_path_lower for indicator in normalized_game_path_indicators):
-            return "Игры"
-
-    # 7. Обработка оставшихся .exe файлов
-    # Если дошли до сюда, и это .exe, то это, скорее всего, программа (не системная, не известная игра)
-    if resolved_icon_type_lower == "исполняемый файл" or file_extension == ".exe":
-        return "Программы"
-
-    # 8. Оставшиеся ярлыки (которые не указывают на известные игры/программы или не были разрешены в .exe)
-    if original_desktop_type_lower == "ярлык":
-        return "Ярлыки (Прочее)" # Общая категория для неопознанных ярлыков
-
-    # 9. Прочие файлы (если есть расширение, но не подошло под предыдущие категории)
-    if file_extension: # Любой файл с расширением, не классифицированный выше
-        return "Файлы (Прочее)"
-
-    # 10. Категория по умолчанию
-    return "Неизвестно" # Если ничего не подошло
-
-
-# Структура POINT для получения координат
-class POINT(ctypes.Structure):
-    _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
-
 def get_desktop_listview_handle():
     """
     Возвращает HWND (handle) элемента SysListView32, который отображает иконки рабочего стола.
     Ищет по двум основным путям, по которым может быть организован рабочий стол в Windows.
     """
 
+    import win32gui
+
     # --- Путь 1: Progman -> SHELLDLL_DefView -> SysListView32 ---
     # Это классический путь для рабочего стола, где Progman является основным окном,
     # а SHELLDLL_DefView - это его дочернее окно, содержащее список иконок.
@@ -395,7 +93,8 @@ def get_desktop_listview_handle():
 
 
 # --- Основная функция для получения информации об иконках ---
-def get_desktop_icon_info(hwnd_listview: int, game_titles_list: list) -> list:
+@stats.timed("icons.get_desktop_icon_info")
+def get_desktop_icon_info(hwnd_listview: int, game_titles_list, shortcut_cache=None, session=None, workers: int = 1) -> list:
     """
     Принимает HWND окна SysListView32 рабочего стола и извлекает
     имя, текущие координаты, ИНДЕКС, ТИП и ПОЛНЫЙ ПУТЬ каждой иконки.
@@ -404,511 +103,79 @@ def get_desktop_icon_info(hwnd_listview: int, game_titles_list: list) -> list:
 
     Args:
         hwnd_listview (int): HWND окна SysListView32 (список иконок).
-        game_titles_list (list): Список названий игр для классификации.
+        game_titles_list: Список названий игр для классификации или готовый IconClassifier.
+        shortcut_cache (ShortcutResolutionCache, optional): Постоянный кэш разрешения ярлыков.
+                        Изменения записываются на диск в конце прохода.
+        session (DesktopListViewSession, optional): Открытая сессия ListView (процесс Explorer и удаленные буферы
+                        переиспользуются между вызовами). Если не задана, создается временная сессия для hwnd_listview.
+        workers (int): Потоков для разрешения ярлыков параллельно с чтением ListView (1 - последовательно).
 
     Returns:
-        list: Список словарей, где каждый словарь содержит
-              {'index': N, 'name': 'Имя иконки', 'coords': (X, Y), 'type': 'Тип иконки', 'full_path': 'Полный путь'}.
-              Возвращает пустой список в случае ошибки.
-    """
+        list: Список записей IconRecord с полями index, name, coords (X, Y), type, full_path, category
+              (доступны и как record['index'], ...; record.to_dict() - прежний словарь).
+              Иконки, которые не удалось обработать, пропускаются (см. лог); при ошибке посреди прохода
+              возвращаются уже прочитанные иконки. Пустой список - если ListView недоступен.
 
-    # --- Вспомогательные функции, вложенные для соблюдения требования "только одна функция" ---
-    def _get_desktop_paths():
-        """Возвращает пути к рабочему столу пользователя и общему рабочему столу."""
-        # Предполагается, что 'os' модуль импортирован в глобальной области видимости
-        paths = []
-        try:
-            # Рабочий стол текущего пользователя
-            user_desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-            if os.path.isdir(user_desktop):
-                paths.append(user_desktop)
-        except Exception as e:
-            logging.warning(f"Не удалось определить путь к рабочему столу пользователя: {e}")
-
-        try:
-            # Общий рабочий стол (Public Desktop)
-            public_var = os.environ.get("PUBLIC", None)
-            if public_var:
-                public_desktop = os.path.join(public_var, "Desktop")
-                if os.path.isdir(public_desktop):
-                    paths.append(public_desktop)
-            else:  # Попытка найти через стандартный путь, если переменная PUBLIC отсутствует
-                # Этот путь может отличаться в зависимости от системы/языка
-                alt_public_desktop = os.path.join(os.environ.get("SystemDrive", "C:"), r"Users\Public\Desktop")
-                if os.path.isdir(alt_public_desktop):
-                    paths.append(alt_public_desktop)
-        except Exception as e:
-            logging.warning(f"Не удалось определить путь к общему рабочему столу: {e}")
-
-        if not paths:
-            logging.warning("Не удалось найти пути к папкам рабочего стола. Определение типов файлов будет ограничено.")
-        return paths
-
-    def _determine_item_type(item_name: str, desktop_search_paths: list, game_titles_list: list) -> tuple[str, str, str, str]:
-        """
-        Определяет тип элемента рабочего стола, его полный путь, имя для классификации и начальный тип.
-        Для ярлыков (.lnk) возвращает тип целевого элемента, путь к цели, имя цели и "ярлык" как начальный тип.
-        Для интернет-ярлыков (.url) возвращает "интернет-ярлык", URL, имя .url файла и "интернет-ярлык" как начальный тип.
-        Возвращает кортеж (имя_для_классификации, тип, полный_путь_или_url_или_пустая_строка, начальный_тип_до_разрешения).
-        """
-        # game_titles_list не используется напрямую в этой функции
-
-        def _resolve_lnk_target(lnk_path: str) -> str:
-            """Внутренняя вспомогательная функция для разрешения цели ярлыка .lnk."""
-            try:
-                # Импорт win32com.client и pythoncom должен быть здесь,
-                # чтобы избежать глобальных зависимостей, если функция используется отдельно.
-                # Убедитесь, что у вас установлен пакет 'pywin32' (pip install pywin32).
-                import pythoncom
-                from win32com.client import Dispatch
-
-                target_path = ""
-                com_initialized_here = False
-                try:
-                    # Попытка инициализировать COM. Если уже инициализирован, это вызовет ошибку.
-                    pythoncom.CoInitialize()
-                    com_initialized_here = True
-                except pythoncom.com_error as e:
-                    # Если COM уже инициализирован (например, -2147417850 = CO_E_ALREADYINITIALIZED)
-                    # нам не нужно его инициализировать, и мы не должны его деинициализировать позже.
-                    if e.args and e.args[0] == -2147417850:  # RPC_E_CHANGED_MODE or CO_E_ALREADYINITIALIZED
-                        pass  # COM уже инициализирован, продолжаем
-                    else:
-                        raise  # Перевыбросить другие ошибки COM
-
-                try:
-                    shell = Dispatch("WScript.Shell")
-                    shortcut = shell.CreateShortcut(lnk_path)
-                    target_path = shortcut.TargetPath
-                finally:
-                    if com_initialized_here:
-                        pythoncom.CoUninitialize()  # Деинициализировать только если мы его инициализировали
-
-                return target_path
-            except ImportError:
-                logging.warning(
-                    "Модули 'pythoncom' или 'win32com.client' не найдены. Установите 'pywin32' для разрешения ярлыков.")
-                return ""
-            except Exception as e:
-                logging.warning(f"Не удалось разрешить ярлык '{lnk_path}': {e}")
-                return ""
+    Для обработки иконок по мере чтения используйте desktop_sort.scanner.iter_desktop_icons().
+    """
 
-        def _resolve_url_target(url_path: str) -> str:
-            """Внутренняя вспомогательная функция для извлечения URL из файла .url."""
-            config = configparser.ConfigParser()
-            try:
-                # Файлы .url часто используют кодировку UTF-16 LE или системную.
-                # Пытаемся сначала UTF-8, потом UTF-16 LE, потом latin-1.
-                try:
-                    with open(url_path, 'r', encoding='utf-8') as f:
-                        config.read_string(f.read())
-                except UnicodeDecodeError:
-                    try:
-                        with open(url_path, 'r', encoding='utf-16-le') as f:
-                            config.read_string(f.read())
-                    except UnicodeDecodeError:
-                        with open(url_path, 'r', encoding='latin-1') as f:
-                            config.read_string(f.read())
-
-                if 'InternetShortcut' in config and 'URL' in config['InternetShortcut']:
-                    return config['InternetShortcut']['URL']
-                else:
-                    logging.warning(f"Файл .url '{url_path}' не содержит раздел [InternetShortcut] или ключ URL.")
-                    return ""
-            except FileNotFoundError:
-                logging.warning(f"Файл .url '{url_path}' не найден.")
-                return ""
-            except configparser.Error as e:
-                logging.warning(f"Ошибка при парсинге файла .url '{url_path}': {e}")
-                return ""
-            except Exception as e:
-                logging.warning(f"Неизвестная ошибка при обработке файла .url '{url_path}': {e}")
-                return ""
-
-
-        determined_type = "неизвестный тип" # Это будет тип цели или сам тип файла
-        initial_type_before_resolve = "неизвестный тип" # Тип файла как он есть на рабочем столе
-        determined_path = ""
-        final_item_name_for_classification = item_name # По умолчанию используется исходное имя
-
-        original_item_name_without_ext, original_item_ext = os.path.splitext(item_name)
-        original_item_ext = original_item_ext.lower()
-
-        # 1. Поиск на рабочих столах (пользовательском и общем)
-        for search_path_dir in desktop_search_paths:
-            # A. Проверяем как есть (может быть папка или файл с расширением)
-            full_path_candidate = os.path.join(search_path_dir, item_name)
-            if os.path.exists(full_path_candidate):
-                if os.path.isdir(full_path_candidate):
-                    initial_type_before_resolve = "папка"
-                    determined_type = "папка"
-                    determined_path = full_path_candidate
-                    final_item_name_for_classification = os.path.basename(full_path_candidate)
-                    return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-                elif os.path.isfile(full_path_candidate):
-                    name_part, ext_part = os.path.splitext(full_path_candidate)
-                    ext_lower = ext_part.lower()
-
-                    if ext_lower == '.lnk':
-                        initial_type_before_resolve = "ярлык"
-                        target_path = _resolve_lnk_target(full_path_candidate)
-                        if target_path and os.path.exists(target_path):
-                            determined_path = target_path
-                            if os.path.isdir(target_path):
-                                determined_type = "папка"
-                                final_item_name_for_classification = os.path.basename(target_path)
-                            else:
-                                target_name_no_ext, target_ext = os.path.splitext(os.path.basename(target_path))
-                                final_item_name_for_classification = target_name_no_ext
-                                target_ext_lower = target_ext.lower()
-                                if target_ext_lower == '.exe': determined_type = "исполняемый файл"
-                                elif target_ext_lower in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico']: determined_type = "изображение"
-                                elif target_ext_lower in ['.txt', '.doc', '.docx', '.rtf', '.odt']: determined_type = "текстовый файл"
-                                elif target_ext_lower == '.pdf': determined_type = "пдф"
-                                else: determined_type = "файл"
-                        else:
-                            determined_type = "ярлык" # Остается ярлыком, если цель не найдена
-                            determined_path = full_path_candidate
-                            final_item_name_for_classification = original_item_name_without_ext if original_item_ext == ".lnk" else item_name
-                        return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-                    elif ext_lower == '.url':
-                        initial_type_before_resolve = "интернет-ярлык"
-                        target_url = _resolve_url_target(full_path_candidate)
-                        if target_url:
-                            determined_type = "интернет-ярлык"
-                            determined_path = target_url
-                            final_item_name_for_classification = original_item_name_without_ext if original_item_ext == ".url" else item_name
-                        else:
-                            determined_type = "интернет-ярлык"
-                            determined_path = full_path_candidate
-                            final_item_name_for_classification = original_item_name_without_ext if original_item_ext == ".url" else item_name
-                        return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-                    # Обычные файлы (не ярлыки)
-                    initial_type_before_resolve = "файл" # Общий начальный тип для файлов
-                    final_item_name_for_classification = os.path.splitext(os.path.basename(full_path_candidate))[0]
-                    if ext_lower in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.ico']:
-                        determined_type = "изображение"
-                        initial_type_before_resolve = "изображение"
-                    elif ext_lower == '.txt':
-                        determined_type = "текстовый файл"
-                        initial_type_before_resolve = "текстовый файл"
-                    elif ext_lower == '.pdf':
-                        determined_type = "пдф"
-                        initial_type_before_resolve = "пдф"
-                    elif ext_lower == '.exe':
-                        determined_type = "исполняемый файл"
-                        initial_type_before_resolve = "исполняемый файл"
-                    else:
-                        determined_type = "файл" # Остается "файл", если не более специфичный тип
-                    determined_path = full_path_candidate
-                    return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-            shortcut_path_candidate_lnk = os.path.join(search_path_dir, item_name + ".lnk")
-            if os.path.isfile(shortcut_path_candidate_lnk):
-                initial_type_before_resolve = "ярлык"
-                target_path = _resolve_lnk_target(shortcut_path_candidate_lnk)
-                if target_path and os.path.exists(target_path):
-                    determined_path = target_path
-                    if os.path.isdir(target_path):
-                        determined_type = "папка"
-                        final_item_name_for_classification = os.path.basename(target_path)
-                    else:
-                        target_name_no_ext, target_ext = os.path.splitext(os.path.basename(target_path))
-                        final_item_name_for_classification = target_name_no_ext
-                        target_ext_lower = target_ext.lower()
-                        if target_ext_lower == '.exe': determined_type = "исполняемый файл"
-                        elif target_ext_lower in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico']: determined_type = "изображение"
-                        elif target_ext_lower in ['.txt', '.doc', '.docx', '.rtf', '.odt']: determined_type = "текстовый файл"
-                        elif target_ext_lower == '.pdf': determined_type = "пдф"
-                        else: determined_type = "файл"
-                else:
-                    determined_type = "ярлык"
-                    determined_path = shortcut_path_candidate_lnk
-                    final_item_name_for_classification = item_name
-                return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-            shortcut_path_candidate_url = os.path.join(search_path_dir, item_name + ".url")
-            if os.path.isfile(shortcut_path_candidate_url):
-                initial_type_before_resolve = "интернет-ярлык"
-                target_url = _resolve_url_target(shortcut_path_candidate_url)
-                if target_url:
-                    determined_type = "интернет-ярлык"
-                    determined_path = target_url
-                    final_item_name_for_classification = item_name
-                else:
-                    determined_type = "интернет-ярлык"
-                    determined_path = shortcut_path_candidate_url
-                    final_item_name_for_classification = item_name
-                return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-            if original_item_ext == ".lnk": # item_name из ListView уже содержит .lnk
-                full_path_candidate_with_ext = os.path.join(search_path_dir, item_name)
-                if os.path.isfile(full_path_candidate_with_ext):
-                    initial_type_before_resolve = "ярлык"
-                    target_path = _resolve_lnk_target(full_path_candidate_with_ext)
-                    if target_path and os.path.exists(target_path):
-                        determined_path = target_path
-                        if os.path.isdir(target_path):
-                            determined_type = "папка"
-                            final_item_name_for_classification = os.path.basename(target_path)
-                        else:
-                            target_name_no_ext, target_ext = os.path.splitext(os.path.basename(target_path))
-                            final_item_name_for_classification = target_name_no_ext
-                            target_ext_lower = target_ext.lower()
-                            if target_ext_lower == '.exe': determined_type = "исполняемый файл"
-                            elif target_ext_lower in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico']: determined_type = "изображение"
-                            elif target_ext_lower in ['.txt', '.doc', '.docx', '.rtf', '.odt']: determined_type = "текстовый файл"
-                            elif target_ext_lower == '.pdf': determined_type = "пдф"
-                            else: determined_type = "файл"
-                    else:
-                        determined_type = "ярлык"
-                        determined_path = full_path_candidate_with_ext
-                        final_item_name_for_classification = original_item_name_without_ext
-                    return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-            elif original_item_ext == ".url": # item_name из ListView уже содержит .url
-                full_path_candidate_with_ext = os.path.join(search_path_dir, item_name)
-                if os.path.isfile(full_path_candidate_with_ext):
-                    initial_type_before_resolve = "интернет-ярлык"
-                    target_url = _resolve_url_target(full_path_candidate_with_ext)
-                    if target_url:
-                        determined_type = "интернет-ярлык"
-                        determined_path = target_url
-                        final_item_name_for_classification = original_item_name_without_ext
-                    else:
-                        determined_type = "интернет-ярлык"
-                        determined_path = full_path_candidate_with_ext
-                        final_item_name_for_classification = original_item_name_without_ext
-                    return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-        # Эвристика, если файл не найден на рабочих столах
-        final_item_name_for_classification = original_item_name_without_ext if original_item_ext else item_name
-        if original_item_ext == ".lnk":
-            initial_type_before_resolve = "ярлык"
-            determined_type = "ярлык"
-        elif original_item_ext == ".url":
-            initial_type_before_resolve = "интернет-ярлык"
-            determined_type = "интернет-ярлык"
-        elif original_item_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.ico']:
-            initial_type_before_resolve = "изображение"
-            determined_type = "изображение"
-        elif original_item_ext == '.txt':
-            initial_type_before_resolve = "текстовый файл"
-            determined_type = "текстовый файл"
-        elif original_item_ext == '.pdf':
-            initial_type_before_resolve = "пдф"
-            determined_type = "пдф"
-        elif original_item_ext == '.exe':
-            initial_type_before_resolve = "исполняемый файл"
-            determined_type = "исполняемый файл"
-        elif original_item_ext: # Любой другой известный расширение
-            initial_type_before_resolve = "файл"
-            determined_type = "файл"
-        # Если нет расширения и файл не найден (например, "Корзина"), initial_type_before_resolve и determined_type остаются "неизвестный тип"
-
-        return final_item_name_for_classification, determined_type, determined_path, initial_type_before_resolve
-
-    # --- Конец вложенных вспомогательных функций ---
-
-    if not hwnd_listview:
+    if not hwnd_listview and session is None:
         logging.error("Предоставлен недействительный HWND SysListView32.")
         return []
 
     results = []
-    h_process = None
-    remote_lvitem = 0
-    remote_text_buffer = 0
-    remote_point = 0
-
-    # Получаем пути к рабочим столам для определения типов
-    desktop_paths_list = _get_desktop_paths()
-
-    # Внимание: для выполнения этого кода необходимы следующие объекты/модули,
-    # которые предполагаются импортированными/определенными вне этой функции:
-    # ctypes.wintypes as wintypes
-    # win32con (из pywin32)
-    # kernel32 (ctypes.WinDLL('kernel32'))
-    # user32 (ctypes.WinDLL('user32'))
-    # LVITEM, POINT (ctypes.Structure definitions)
-    # LVM_GETITEMCOUNT, LVM_GETITEMTEXTW, LVM_GETITEMPOSITION, LVIF_TEXT, MEM_COMMIT, MEM_RESERVE, MEM_RELEASE, PAGE_READWRITE
-    # В случае отсутствия, их необходимо определить или импортировать.
+    failed = 0
+    owns_session = session is None
+    if owns_session:
+        session = DesktopListViewSession(hwnd_listview)
 
     try:
-        # Проверка наличия объектов, используемых в основном блоке функции:
-        # Исправлена ошибка TypeError: all() takes exactly one argument (8 given)
-        # путем оборачивания всех условий в один кортеж.
-        if not all((
-            hasattr(ctypes, 'wintypes') and hasattr(ctypes.wintypes, 'DWORD'),
-            hasattr(ctypes, 'wintypes') and hasattr(ctypes.wintypes, 'SIZE'),
-            hasattr(ctypes, 'wintypes') and hasattr(ctypes.wintypes, 'WCHAR'),
-            hasattr(sys.modules.get('__main__'), 'win32con') or hasattr(sys.modules.get(__name__), 'win32con'), # Check for win32con
-            hasattr(sys.modules.get('__main__'), 'kernel32') or hasattr(sys.modules.get(__name__), 'kernel32'), # Check for kernel32
-            hasattr(sys.modules.get('__main__'), 'user32') or hasattr(sys.modules.get(__name__), 'user32'),     # Check for user32
-            hasattr(sys.modules.get('__main__'), 'LVITEM') or hasattr(sys.modules.get(__name__), 'LVITEM'),     # Check for LVITEM
-            hasattr(sys.modules.get('__main__'), 'POINT') or hasattr(sys.modules.get(__name__), 'POINT')       # Check for POINT
-        )):
-            logging.error("Необходимые ctypes структуры, константы или модули (wintypes, win32con, kernel32, user32, LVITEM, POINT) не определены или недоступны в текущем контексте.")
-            return []
-
-
-        pid = ctypes.wintypes.DWORD()
-        user32.GetWindowThreadProcessId(hwnd_listview, ctypes.byref(pid))
-        process_id = pid.value
-        if not process_id:
-            logging.error(f"Не удалось получить PID для HWND {hwnd_listview}.")
-            return []
-
-        h_process = kernel32.OpenProcess(
-            win32con.PROCESS_VM_OPERATION |
-            win32con.PROCESS_VM_READ |
-            win32con.PROCESS_VM_WRITE |
-            win32con.PROCESS_QUERY_INFORMATION,
-            False,
-            process_id
-        )
-        if not h_process:
-            error_code = ctypes.get_last_error()
-            logging.error(
-                f"Не удалось открыть процесс {process_id}. Ошибка Windows API: {error_code} - {ctypes.FormatError(error_code)}. Попробуйте запустить скрипт с правами администратора.")
-            return []
-
-        lvitem_size = ctypes.sizeof(LVITEM)
-        remote_lvitem = kernel32.VirtualAllocEx(h_process, 0, lvitem_size, MEM_COMMIT | MEM_RESERVE, PAGE_READWRITE)
-        if not remote_lvitem:
-            logging.error(
-                f"Не удалось выделить удаленную память для LVITEM. Ошибка: {ctypes.FormatError(ctypes.get_last_error())}")
-            return []  # finally блок выполнит очистку h_process
-
-        text_buffer_max_chars = 256
-        text_buffer_size = text_buffer_max_chars * ctypes.sizeof(ctypes.wintypes.WCHAR)
-        remote_text_buffer = kernel32.VirtualAllocEx(h_process, 0, text_buffer_size, MEM_COMMIT | MEM_RESERVE,
-                                                     PAGE_READWRITE)
-        if not remote_text_buffer:
-            logging.error(
-                f"Не удалось выделить удаленную память для буфера текста. Ошибка: {ctypes.FormatError(ctypes.get_last_error())}")
-            return []
-
-        point_size = ctypes.sizeof(POINT)
-        remote_point = kernel32.VirtualAllocEx(h_process, 0, point_size, MEM_COMMIT | MEM_RESERVE, PAGE_READWRITE)
-        if not remote_point:
-            logging.error(
-                f"Не удалось выделить удаленную память для POINT. Ошибка: {ctypes.FormatError(ctypes.get_last_error())}")
+        try:
+            backend = session.ensure_connected()
+        except OSError as e:
+            logging.error(str(e))
             return []
 
-        count = user32.SendMessageW(hwnd_listview, LVM_GETITEMCOUNT, 0, 0)
+        count = backend.item_count()
         if count == -1:
-            error_code = ctypes.get_last_error()
             logging.warning(
-                f"LVM_GETITEMCOUNT вернул {count}. Возможно, нет элементов или произошла ошибка. Ошибка Windows API: {ctypes.FormatError(error_code) if error_code else 'N/A'}")
-            if count == -1:
-                return []
+                f"LVM_GETITEMCOUNT вернул {count}. Возможно, нет элементов или произошла ошибка. Ошибка Windows API: {backend.last_error()}")
+            return []
         elif count == 0:
             logging.info("На рабочем столе нет иконок (LVM_GETITEMCOUNT вернул 0).")
             return []
 
         logging.info(f"Найдено {count} иконок на рабочем столе.")
 
-        for i in range(count):
-            item_name = f"Неизвестная иконка {i}"
-            item_type = "неизвестный тип"
-            item_full_path = ""  # Инициализация для каждой иконки
-            x, y = 0, 0
-
-            lvitem_py = LVITEM()
-            lvitem_py.mask = LVIF_TEXT
-            lvitem_py.iItem = i
-            lvitem_py.iSubItem = 0
-            lvitem_py.cchTextMax = text_buffer_max_chars
-            lvitem_py.pszText = remote_text_buffer
-
-            bytes_written = ctypes.wintypes.SIZE()
-            if not kernel32.WriteProcessMemory(h_process, remote_lvitem, ctypes.byref(lvitem_py), lvitem_size,
-                                               ctypes.byref(bytes_written)):
-                logging.warning(
-                    f"Не удалось записать LVITEM в удаленный процесс для элемента {i}. Ошибка: {ctypes.FormatError(ctypes.get_last_error())}. Пропускаем получение имени.")
-            else:
-                ret_text = user32.SendMessageW(hwnd_listview, LVM_GETITEMTEXTW, i, remote_lvitem)
-                if ret_text > 0:
-                    buffer = ctypes.create_unicode_buffer(text_buffer_max_chars)
-                    bytes_read = ctypes.wintypes.SIZE()
-                    if kernel32.ReadProcessMemory(h_process, remote_text_buffer, buffer, text_buffer_size,
-                                                  ctypes.byref(bytes_read)):
-                        item_name = buffer.value.strip()
-                    else:
-                        logging.warning(
-                            f"Не удалось прочитать текст элемента {i} из удаленного процесса. Ошибка: {ctypes.FormatError(ctypes.get_last_error())}")
-                else:
-                    error_code = ctypes.get_last_error()
-                    logging.warning(
-                        f"Не удалось получить текст для элемента {i}. Код возврата SendMessage: {ret_text}. Ошибка Windows API: {ctypes.FormatError(error_code) if error_code else 'N/A'}")
-
-            # Определяем тип элемента, его полный путь, имя для классификации и начальный тип
-            item_name_for_classification, item_type, item_full_path, initial_type_before_resolve = \
-                _determine_item_type(item_name, desktop_paths_list, game_titles_list)
-
-            ret_pos = user32.SendMessageW(hwnd_listview, LVM_GETITEMPOSITION, i, remote_point)
-            if ret_pos == 1:
-                point_py = POINT()
-                bytes_read_pos = ctypes.wintypes.SIZE()
-                if kernel32.ReadProcessMemory(h_process, remote_point, ctypes.byref(point_py), point_size,
-                                              ctypes.byref(bytes_read_pos)):
-                    x, y = point_py.x, point_py.y
-                else:
-                    logging.warning(
-                        f"Не удалось прочитать POINT для элемента {i} ('{item_name}') из удаленного процесса. Ошибка: {ctypes.FormatError(ctypes.get_last_error())}")
-            else:
-                error_code = ctypes.get_last_error()
-                logging.warning(
-                    f"Не удалось получить позицию для элемента {i} ('{item_name}'). Код возврата SendMessage: {ret_pos}. Ошибка Windows API: {ctypes.FormatError(error_code) if error_code else 'N/A'}")
-
-            # Создаем словарь данных для классификации
-            icon_data_for_classification = {
-                'name': item_name_for_classification,
-                'type': item_type,
-                'full_path': item_full_path,
-                'original_icon_name': item_name, # Имя иконки как на рабочем столе
-                'original_desktop_type': initial_type_before_resolve # Тип до разрешения ярлыков
-            }
-            # Получаем категорию иконки
-            item_category = get_icon_category(icon_data_for_classification, game_titles_list)
-
-            # Добавляем информацию об иконке, включая категорию, в список результатов
-            results.append({
-                'index': i,
-                'name': item_name,
-                'coords': (x, y),
-                'type': item_type,
-                'full_path': item_full_path,
-                'category': item_category,
-                'classified_name': item_name_for_classification,
-                'original_desktop_type': initial_type_before_resolve # Для отладки, если нужно
-            })
+        # Имена и позиции читаются пакетами (один ReadProcessMemory на пакет), тип и категория
+        # определяются по мере чтения; ошибка отдельной иконки не прерывает проход
+        for record in iter_desktop_icons(session, game_titles_list, shortcut_cache=shortcut_cache, count=count,
+                                         workers=workers):
+            if record.error is not None:
+                failed += 1
+                continue
+            results.append(record)
 
     except Exception as e:
-        logging.error(f"Произошла общая ошибка при получении данных об иконках: {e}", exc_info=True)
-        error_code = ctypes.get_last_error()
+        logging.error(f"Произошла общая ошибка при получении данных об иконках: {e}. "
+                      f"Возвращаются уже прочитанные иконки ({len(results)}).", exc_info=True)
+        # ctypes.get_last_error() и ctypes.FormatError() есть только в Windows
+        error_code = ctypes.get_last_error() if os.name == "nt" else 0
         if error_code != 0:
             logging.error(f"Дополнительная ошибка Windows API: {error_code} - {ctypes.FormatError(error_code)}")
-        return []
     finally:
-        if h_process:
-            if remote_lvitem:
-                kernel32.VirtualFreeEx(h_process, remote_lvitem, 0, MEM_RELEASE)
-            if remote_text_buffer:
-                kernel32.VirtualFreeEx(h_process, remote_text_buffer, 0, MEM_RELEASE)
-            if remote_point:
-                kernel32.VirtualFreeEx(h_process, remote_point, 0, MEM_RELEASE)
-            kernel32.CloseHandle(h_process)
+        if owns_session:
+            session.close()
 
+    if failed:
+        logging.warning(f"Не удалось обработать иконок: {failed} (подробности выше в логе).")
     return results
 
 
 
 
 
-def move_desktop_icon(hwnd_listview: int, item_index: int, x: int, y: int) -> bool:
+def move_desktop_icon(hwnd_listview: int, item_index: int, x: int, y: int, session=None) -> bool:
     """
     Перемещает иконку рабочего стола в заданные клиентские координаты.
 
@@ -926,12 +193,23 @@ def move_desktop_icon(hwnd_listview: int, item_index: int, x: int, y: int) -> bo
                           и LVM_FINDITEM).
         x (int): Новая X-координата иконки (относительно клиентской области SysListView32).
         y (int): Новая Y-координата иконки (относительно клиентской области SysListView32).
+        session (DesktopListViewSession, optional): Открытая сессия ListView. Если задана, перемещение
+                          выполняется через нее (LVM_SETITEMPOSITION32 с переиспользуемым буфером POINT).
 
     Returns:
         bool: True, если сообщение о перемещении было отправлено успешно, False в противном случае.
               Успешная отправка сообщения не гарантирует, что иконка останется
               на месте из-за вышеупомянутого автоупорядочивания.
     """
+    if session is not None:
+        try:
+            return session.set_position(item_index, x, y)
+        except OSError as e:
+            logging.warning(f"Не удалось переместить иконку {item_index}: {e}")
+            return False
+
+    import win32gui
+
     if not win32gui.IsWindow(hwnd_listview):
         # В случае, если передан недействительный HWND.
         # В реальном приложении можно было бы логировать эту ошибку.
@@ -973,6 +251,36 @@ def move_desktop_icon(hwnd_listview: int, item_index: int, x: int, y: int) -> bo
         # print(f"Ошибка при перемещении иконки: {e}")
         return False
 
+def move_desktop_icons(hwnd_listview: int, moves, session=None) -> dict:
+    """
+    Перемещает несколько иконок рабочего стола за одну перерисовку.
+
+    Повторные перемещения одной иконки сводятся к последнему; на время пакета перерисовка
+    отключается (WM_SETREDRAW), в конце окно перерисовывается один раз.
+    Как и move_desktop_icon, работает только при отключенном автоупорядочивании.
+
+    Args:
+        hwnd_listview (int): HWND окна рабочего стола (SysListView32).
+        moves (iterable): Перемещения (индекс, x, y), например MovePlan.moves.
+        session (DesktopListViewSession, optional): Открытая сессия ListView; если не задана,
+                          создается временная сессия для hwnd_listview.
+
+    Returns:
+        dict: {индекс: True/False} - результат для каждой иконки (пустой словарь при ошибке подключения).
+    """
+    owns_session = session is None
+    if owns_session:
+        session = DesktopListViewSession(hwnd_listview)
+    try:
+        return session.move_many(moves)
+    except OSError as e:
+        logging.error(f"Не удалось переместить иконки: {e}")
+        return {}
+    finally:
+        if owns_session:
+            session.close()
+
+
 def get_windows_screen_info():
     """
     Возвращает словарь с информацией о разрешении экрана и масштабировании
@@ -1171,13 +479,12 @@ def get_desktop_items():
             else: # Для других ОС, если не найдено
                 raise FileNotFoundError(f"Папка рабочего стола не найдена по '{desktop_path}'.")
 
-        # Получаем список имен файлов и папок в директории рабочего стола
-        item_names = os.listdir(desktop_path)
+        # Один проход os.scandir по папке рабочего стола (тот же индекс, что и для определения типов иконок)
+        desktop_index = DesktopIndex()
+        desktop_index.add_folder(desktop_path)
 
-        # Создаем список полных путей к каждому элементу
-        full_paths = [os.path.join(desktop_path, name) for name in item_names]
-
-        return full_paths
+        # Список полных путей к каждому элементу
+        return desktop_index.paths()
 
     except FileNotFoundError:
         print(f"Ошибка: Не удалось найти папку рабочего стола. Проверьте, существует ли она по адресу '{desktop_path}'.")
@@ -1191,6 +498,31 @@ def get_desktop_items():
 
 # Пример использования функции:
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Информация об иконках рабочего стола и их раскладка по категориям.")
+    parser.add_argument("--stats", action="store_true",
+                        help="Собирать статистику (время этапов, счетчики вызовов и кэшей) и вывести таблицу в конце.")
+    parser.add_argument("--stats-json", metavar="FILE", help="Записать статистику в JSON-файл (включает сбор статистики).")
+    parser.add_argument("--workers", type=int, default=DEFAULT_RESOLVE_WORKERS,
+                        help=f"Потоков для разрешения ярлыков (по умолчанию {DEFAULT_RESOLVE_WORKERS}; 1 - последовательно).")
+    parser.add_argument("--serve", action="store_true",
+                        help="Запустить резидентный сервис (NDJSON через локальный сокет, клиент: python -m desktop_sort.daemon).")
+    parser.add_argument("--language", default=DEFAULT_LANGUAGE, choices=sorted(CATEGORY_NAMES),
+                        help="Язык названий типов и категорий в выводе.")
+    args = parser.parse_args()
+    set_language(args.language)
+    if args.stats or args.stats_json:
+        stats.enable()
+        # Таблица по запросу во время работы: SIGUSR1 (Linux/macOS) или Ctrl+Break (Windows)
+        stats.install_dump_signal()
+
+    if args.serve:
+        from desktop_sort.daemon import DesktopSortService, serve
+        stats.enable()
+        # Классификатор, индекс названий игр, кэши и подключение к Explorer остаются открытыми между запросами
+        serve(DesktopSortService(session_factory=lambda: DesktopListViewSession(find_hwnd=get_desktop_listview_handle),
+                                 screen_info_provider=get_windows_screen_info, workers=args.workers))
+        sys.exit(0)
+
     # desktop_elements = get_desktop_items()
     screen_info = get_windows_screen_info()
     #
@@ -1217,6 +549,7 @@ if __name__ == "__main__":
     if desktop_handle:
         print(f"Найден HWND окна рабочего стола (SysListView32): {desktop_handle}")
         try:
+            import win32gui
             # Попытка получить заголовок или класс окна для проверки
             window_text = win32gui.GetWindowText(desktop_handle)
             window_class = win32gui.GetClassName(desktop_handle)
@@ -1236,10 +569,14 @@ if __name__ == "__main__":
         print("Не удалось найти HWND окна рабочего стола.")
 
     if desktop_handle:
-        game_titles_list = load_game_titles() # Загружаем список названий игр
         logging.info("Получение информации об иконках рабочего стола...")
-        # Передаем game_titles_list в функцию
-        icons_info = get_desktop_icon_info(desktop_handle, game_titles_list)
+        # Ярлыки разрешаются через постоянный кэш, результаты классификации тоже сохраняются между запусками
+        with ShortcutResolutionCache() as shortcut_cache, ClassificationCache() as classification_cache, \
+                DesktopListViewSession(desktop_handle, find_hwnd=get_desktop_listview_handle) as session:
+            # Правила компилируются один раз; каталог названий игр открывается только если
+            # какая-то иконка дойдет до сравнения с названиями игр
+            game_titles_list = IconClassifier(LazyTitleCatalog(), store=classification_cache)
+            icons_info = get_desktop_icon_info(desktop_handle, game_titles_list, shortcut_cache, session, workers=args.workers)
 
         if icons_info:
             print("\n--- Информация об иконках рабочего стола ---")
@@ -1250,8 +587,23 @@ if __name__ == "__main__":
 
             print(f"\nВсего иконок: {len(icons_info)}")
 
-            # move_desktop_icon(desktop_handle, 3, 1000, 1000)
+            # Целевая раскладка по зонам категорий (иконки пока не перемещаются)
+            layout = compute_layout(icons_info, screen_info)
+            print("\n--- Зоны раскладки ---")
+            for zone in layout.zones:
+                print(f"{zone.category}: {len(zone)} иконок, столбцы {zone.first_line}-{zone.first_line + zone.line_count - 1}")
+            move_plan = plan_moves(icons_info, layout)
+            print(move_plan.summary())
+            # move_desktop_icons(desktop_handle, move_plan.moves, session)
+
+            # move_desktop_icon(desktop_handle, 3, 1000, 1000, session)
         else:
             print("Не удалось получить информацию об иконках.")
     else:
         print("Не удалось найти HWND SysListView32 рабочего стола. Убедитесь, что вы работаете на Windows и рабочий стол активен.")
+
+    if args.stats:
+        print("\n" + stats.format_table())
+    if args.stats_json:
+        stats.dump_json(args.stats_json)
+        print(f"Статистика записана в '{args.stats_json}'.")
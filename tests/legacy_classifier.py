@@ -0,0 +1,244 @@
+import os as _os
+from types import SimpleNamespace
+
+
+# Эталон для тестов совместимости: get_icon_category из main.py до переноса классификации
+# в desktop_sort.classifier (тело функции без изменений). Переменные окружения не используются:
+# пути Program Files/WinDir берутся по умолчанию, как у IconClassifier(environ={}).
+os = SimpleNamespace(path=_os.path, sep=_os.sep, environ={})
+
+
+def get_icon_category(icon_info: dict, game_titles: list) -> str:
+    """
+    Определяет категорию иконки на основе ее информации и списка названий игр.
+    Использует расширенную информацию об иконке, включая оригинальное имя и тип.
+    """
+    # Инициализация переменных из icon_info
+    name_lower = icon_info['name'].lower() # Имя для классификации (например, имя цели ярлыка)
+    resolved_icon_type_lower = icon_info['type'].lower() if icon_info['type'] else "неизвестный тип"
+    path_lower = icon_info['full_path'].lower() if icon_info['full_path'] else ""
+    original_icon_name_lower = icon_info['original_icon_name'].lower()
+    original_desktop_type_lower = icon_info['original_desktop_type'].lower()
+
+    file_extension = None
+    if path_lower and resolved_icon_type_lower != "папка" and \
+       not path_lower.startswith("http") and \
+       not path_lower.startswith("steam:") and \
+       not path_lower.startswith("epicgames:") and \
+       '.' in os.path.basename(path_lower):
+        file_extension = os.path.splitext(os.path.basename(path_lower))[1].lower()
+
+    # Определения списков и словарей
+    system_names_exact = ["корзина", "этот компьютер", "мой компьютер", "панель управления", "network", "сеть", "computer", "control panel", "recycle bin"]
+
+    doc_extensions = [
+        '.txt', '.md', '.log', '.doc', '.docx', '.rtf', '.odt', '.tex', '.json', '.xml',
+        '.yaml', '.ini', '.cfg', '.pdf', '.xls', '.xlsx', '.ppt', '.pptx', '.csv',
+        '.epub', '.mobi'
+    ]
+    img_extensions = [
+        '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg', '.tiff', '.webp',
+        '.psd', '.ai', '.raw', '.heic', '.heif'
+    ]
+    video_extensions = [
+        '.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mpeg', '.mpg'
+    ]
+    audio_extensions = [
+        '.mp3', '.wav', '.ogg', '.flac', '.aac', '.m4a', '.wma'
+    ]
+    archive_extensions = [
+        '.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso'
+    ]
+    dev_extensions = [
+        '.py', '.pyw', '.js', '.html', '.css', '.java', '.class', '.cpp', '.c', '.h',
+        '.hpp', '.cs', '.sh', '.bat', '.ps1', '.php', '.rb', '.go', '.swift', '.kt',
+        '.kts', '.sql', '.ipynb', '.jar', '.sln', '.csproj', '.vb', '.ts'
+    ]
+
+    known_program_exe_strict = {
+        "chrome.exe": "Браузеры", "firefox.exe": "Браузеры", "msedge.exe": "Браузеры",
+        "opera.exe": "Браузеры", "iexplore.exe": "Браузеры",
+        "winword.exe": "Офисные программы", "excel.exe": "Офисные программы",
+        "powerpnt.exe": "Офисные программы", "outlook.exe": "Офисные программы",
+        "libreoffice.exe": "Офисные программы", "soffice.bin": "Офисные программы",
+        "pycharm64.exe": "Разработка", "pycharm.exe": "Разработка",
+        "idea64.exe": "Разработка", "idea.exe": "Разработка",
+        "code.exe": "Разработка", "devenv.exe": "Разработка", "atom.exe": "Разработка",
+        "sublimetext.exe": "Разработка", "notepad++.exe": "Разработка",
+        "vlc.exe": "Мультимедиа", "wmplayer.exe": "Мультимедиа", "spotify.exe": "Мультимедиа",
+        "itunes.exe": "Мультимедиа", "audacity.exe": "Мультимедиа",
+        "photoshop.exe": "Графика и 3D", "gimp-2.10.exe": "Графика и 3D", "gimp.exe": "Графика и 3D",
+        "blender.exe": "Графика и 3D",
+        "obs64.exe": "Утилиты", "obs32.exe": "Утилиты",
+        "utorrent.exe": "Утилиты", "qbittorrent.exe": "Утилиты", "filezilla.exe": "Утилиты",
+        "explorer.exe": "Системные", "taskmgr.exe": "Системные", "cmd.exe": "Системные",
+        "powershell.exe": "Системные", "regedit.exe": "Системные", "control.exe": "Системные",
+        "discord.exe": "Мессенджеры", "telegram.exe": "Мессенджеры", "skype.exe": "Мессенджеры",
+        "zoom.exe": "Мессенджеры", "slack.exe": "Мессенджеры",
+        "steam.exe": "Игровые платформы", "epicgameslauncher.exe": "Игровые платформы",
+        "battle.net.exe": "Игровые платформы", "origin.exe": "Игровые платформы",
+        "goggalaxy.exe": "Игровые платформы", "ubisoftconnect.exe": "Игровые платформы",
+        "fileweederapp.exe": "Утилиты", "hfs.exe": "Утилиты", "x360ce.exe": "Утилиты",
+        "engine.exe": "Программы" # Generic, hopefully caught by game name first
+    }
+    known_program_keywords_broader = {
+        "visual studio", "pycharm", "intellij idea", "android studio",
+        "google chrome", "mozilla firefox", "microsoft edge", "opera browser",
+        "microsoft office", "libreoffice", "openoffice",
+        "adobe photoshop", "adobe illustrator", "adobe premiere", "adobe acrobat",
+        "autodesk autocad", "autodesk maya", "autodesk 3ds max",
+        "obs studio", "vlc media player", "windows media player",
+        "control panel", "панель управления", "диспетчер задач", "task manager",
+        "command prompt", "powershell", "terminal",
+        "steam", "epic games launcher", "battle.net", "origin client", "gog galaxy", "uplay", "ubisoft connect",
+        "utorrent", "bittorrent", "discord", "telegram desktop", "skype", "zoom meetings",
+        "audacity", "blender", "gimp", "notepad++", "sublime text", "vs code",
+        "fileweeder", "http file server"
+    }
+
+    known_games_keywords_strict = [
+        "minecraft", "fortnite", "valorant", "league of legends", "dota 2",
+        "counter-strike", "csgo", "cs:go", "cyberpunk 2077", "the witcher", "ведьмак",
+        "grand theft auto", "gta v", "stray", "elden ring", "baldurs gate", "baldurs gate 3",
+        "starcraft", "diablo", "overwatch", "world of warcraft",
+        "call of duty", "battlefield", "apex legends", "genshin impact",
+        "terraria", "stardew valley", "doom", "fallout", "skyrim",
+        "civilization", "sims", "fifa", "nba 2k",
+        "lego® звездные войны™ скайуокер сага", "корсары - гпк rev.3" # From logs, will be lowercased by logic
+    ]
+    # Convert strict game keywords to lowercase once, as they are compared with lowercased names
+    known_games_keywords_strict = [kw.lower() for kw in known_games_keywords_strict]
+
+    game_path_indicators = [
+        os.path.join("steam", "steamapps", "common"), # Relative to Program Files or library
+        os.path.join("steamlibrary", "steamapps", "common"),
+        os.path.join("epic games"),
+        os.path.join("gog games"),
+        os.path.join("origin games"),
+        os.path.join("ubisoft", "ubisoft game launcher", "games"),
+        os.path.join("blizzard"),
+        os.path.join("riot games"),
+        os.path.join("my games"),
+        "games" + os.sep, # e.g. D:\Games\
+        "игры" + os.sep   # e.g. D:\Игры\
+    ]
+    # Add Program Files paths dynamically
+    pf_paths = [os.environ.get("ProgramFiles", "C:\\Program Files"),
+                os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)")]
+    for pf_path in pf_paths:
+        if pf_path: # Ensure the env variable exists
+            game_path_indicators.append(os.path.join(pf_path.lower(), "steam", "steamapps", "common"))
+            # Add other specific game launcher paths under Program Files if needed
+
+    # 1. Папки
+    if resolved_icon_type_lower == "папка":
+        return "Папки"
+
+    # 2. Системные элементы
+    if original_desktop_type_lower == "неизвестный тип" and original_icon_name_lower in system_names_exact:
+        return "Системные"
+
+    # 3. Интернет-ярлыки
+    if original_desktop_type_lower == "интернет-ярлык":
+        if path_lower.startswith("steam://rungameid/"):
+            return "Игры" # Steam игры - особый случай
+        if path_lower.startswith("epicgames://"): # Hypothetical, for Epic Games Launcher if it uses such links
+             return "Игры"
+        # Известные сайты/сервисы
+        known_sites = {
+            "docs.google.com": "Документы (Онлайн)",
+            "youtube.com": "Мультимедиа (Онлайн)", "youtu.be": "Мультимедиа (Онлайн)",
+            "github.com": "Разработка (Онлайн)",
+            "figma.com": "Дизайн (Онлайн)",
+            "drive.google.com": "Файлы (Облако)", "onedrive.live.com": "Файлы (Облако)", "dropbox.com": "Файлы (Облако)",
+            # Можно добавить игровые магазины или страницы игр, если они не через спец. протоколы
+            "store.steampowered.com": "Игры (Магазин)", "epicgames.com/store": "Игры (Магазин)", "gog.com": "Игры (Магазин)",
+        }
+        for domain, category in known_sites.items():
+            if domain in path_lower:
+                return category
+        return "Интернет-ссылки" # Общая категория для остальных URL
+
+    # 4. Классификация по расширению файла (используем file_extension)
+    if file_extension:
+        if file_extension in doc_extensions: return "Документы"
+        if file_extension in img_extensions: return "Изображения"
+        if file_extension in video_extensions: return "Видео"
+        if file_extension in audio_extensions: return "Аудио"
+        if file_extension in archive_extensions: return "Архивы"
+        if file_extension in dev_extensions: return "Файлы разработки"
+        # .exe файлы будут обработаны ниже, чтобы сначала проверить на известные программы/игры
+
+    # 5. Идентификация известных неигровых программ
+    exe_name = None
+    if file_extension == ".exe" and path_lower:
+        exe_name = os.path.basename(path_lower) # path_lower здесь это resolved path
+        if exe_name in known_program_exe_strict:
+            return known_program_exe_strict[exe_name]
+
+    # Проверка по ключевым словам для программ (имя и путь)
+    # name_lower - это resolved name, original_icon_name_lower - это имя иконки на раб. столе
+    for keyword_set in [name_lower, original_icon_name_lower, path_lower]:
+        if any(prog_keyword in keyword_set for prog_keyword in known_program_keywords_broader):
+            return "Программы"
+
+    # Проверка на Program Files или System32 для .exe и ярлыков, указывающих на .exe
+    if resolved_icon_type_lower == "исполняемый файл" or \
+       (original_desktop_type_lower == "ярлык" and file_extension == ".exe"): # Ярлык на .exe
+        program_files_paths = [
+            os.environ.get("ProgramFiles", "C:\\Program Files").lower() + os.sep,
+            os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)").lower() + os.sep,
+            os.environ.get("WinDir", "C:\\Windows").lower() + os.sep + "system32" + os.sep,
+        ]
+        if any(pf_path in path_lower for pf_path in program_files_paths):
+            # Исключаем игровые лаунчеры, которые могут быть в Program Files, но уже отнесены к программам
+            # или если игра случайно установлена в Program Files, но её имя есть в game_titles
+            if name_lower in game_titles or original_icon_name_lower in game_titles:
+                 return "Игры" # Если игра по названию, но в Program Files
+            if exe_name and exe_name.lower() in ["steam.exe", "epicgameslauncher.exe", "gog galaxy.exe", "battle.net launcher.exe"]: # Уже обработано выше, но для надежности
+                return "Программы"
+            return "Программы"
+
+
+    # 6. Идентификация игр (game_titles - основной список из файла)
+    # name_lower это resolved name (например, "witcher3.exe" -> "witcher3")
+    # original_icon_name_lower это имя иконки на рабочем столе (например, "Ведьмак 3")
+    # game_titles are already lowercase
+    if name_lower in game_titles or original_icon_name_lower in game_titles:
+        return "Игры"
+    # Partial matches with game_titles (which is a list of lowercase strings)
+    if any(game_title_part in name_lower for game_title_part in game_titles if len(game_title_part) > 3):
+        return "Игры"
+    if any(game_title_part in original_icon_name_lower for game_title_part in game_titles if len(game_title_part) > 3):
+        return "Игры"
+
+    # known_games_keywords_strict are already lowercased during initialization
+    for keyword in known_games_keywords_strict:
+        if keyword in name_lower or keyword in original_icon_name_lower:
+            return "Игры"
+
+    # Проверка пути для игр (если это .exe или ярлык на .exe)
+    # path_lower is already lowercase. game_path_indicators should be constructed with lowercase components.
+    if resolved_icon_type_lower == "исполняемый файл" or \
+       (original_desktop_type_lower == "ярлык" and file_extension == ".exe"):
+        # Ensure all indicators are lowercase for comparison with path_lower
+        normalized_game_path_indicators = [ind.lower().replace("\\", os.sep).replace("/", os.sep) for ind in game_path_indicators]
+        normalized_path_lower = path_lower.replace("\\", os.sep).replace("/", os.sep)
+        if any(indicator in normalized_path_lower for indicator in normalized_game_path_indicators):
+            return "Игры"
+
+    # 7. Обработка оставшихся .exe файлов
+    # Если дошли до сюда, и это .exe, то это, скорее всего, программа (не системная, не известная игра)
+    if resolved_icon_type_lower == "исполняемый файл" or file_extension == ".exe":
+        return "Программы"
+
+    # 8. Оставшиеся ярлыки (которые не указывают на известные игры/программы или не были разрешены в .exe)
+    if original_desktop_type_lower == "ярлык":
+        return "Ярлыки (Прочее)" # Общая категория для неопознанных ярлыков
+
+    # 9. Прочие файлы (если есть расширение, но не подошло под предыдущие категории)
+    if file_extension: # Любой файл с расширением, не классифицированный выше
+        return "Файлы (Прочее)"
+
+    # 10. Категория по умолчанию
+    return "Неизвестно" # Если ничего не подошло
@@ -0,0 +1,240 @@
+"""
+Генератор корпуса ярлыков .lnk для tests/test_lnk_parser.py.
+
+Файлы собираются побайтно по спецификации MS-SHLLINK и хранятся в репозитории,
+чтобы парсер проверялся в Linux без Windows. Ожидаемые значения - в expected.json.
+Перегенерация (из корня репозитория):
+
+    python tests/lnk_corpus/generate.py
+"""
+import json
+import os
+import struct
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from desktop_sort.lnk_parser import (  # noqa: E402
+    COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX, ENVIRONMENT_VARIABLE_DATA_BLOCK, FORCE_NO_LINK_INFO,
+    HAS_ARGUMENTS, HAS_EXP_STRING, HAS_LINK_INFO, HAS_LINK_TARGET_ID_LIST, HAS_NAME, HAS_RELATIVE_PATH,
+    HAS_WORKING_DIR, IS_UNICODE, LNK_CLSID, LNK_HEADER_SIZE, MY_COMPUTER_CLSID, VOLUME_ID_AND_LOCAL_BASE_PATH,
+)
+
+
+CORPUS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTROL_PANEL_CLSID = uuid.UUID("21ec2020-3aea-1069-a2dd-08002b30309d")
+
+
+def header(flags: int, attributes: int = 0x20) -> bytes:
+    return struct.pack("<I16sIIQQQIIIHHII", LNK_HEADER_SIZE, LNK_CLSID.bytes_le, flags, attributes,
+                       0, 0, 0, 0, 0, 1, 0, 0, 0, 0)
+
+
+def _cstring(value: str) -> bytes:
+    return value.encode("cp1252") + b"\0"
+
+
+def _wstring(value: str) -> bytes:
+    return value.encode("utf-16-le") + b"\0\0"
+
+
+def link_info_local(path: str, suffix: str = "", unicode: bool = False) -> bytes:
+    """LinkInfo с VolumeID и LocalBasePath (при unicode - и LocalBasePathUnicode/CommonPathSuffixUnicode)."""
+    header_size = 0x24 if unicode else 0x1C
+    volume_id = struct.pack("<IIII", 0x11, 3, 0x1234, 0x10) + b"\0"
+    local_base_path = _cstring(path.encode("cp1252", "replace").decode("cp1252"))
+    common_path_suffix = _cstring(suffix.encode("cp1252", "replace").decode("cp1252"))
+    volume_offset = header_size
+    path_offset = volume_offset + len(volume_id)
+    suffix_offset = path_offset + len(local_base_path)
+    body = volume_id + local_base_path + common_path_suffix
+    extra = b""
+    if unicode:
+        unicode_path_offset = header_size + len(body)
+        if unicode_path_offset % 2:
+            body += b"\0"
+            unicode_path_offset += 1
+        unicode_path = _wstring(path)
+        unicode_suffix_offset = unicode_path_offset + len(unicode_path)
+        body += unicode_path + _wstring(suffix)
+        extra = struct.pack("<II", unicode_path_offset, unicode_suffix_offset)
+    size = header_size + len(body)
+    return struct.pack("<IIIIIII", size, header_size, VOLUME_ID_AND_LOCAL_BASE_PATH,
+                       volume_offset, path_offset, 0, suffix_offset) + extra + body
+
+
+def link_info_network(net_name: str, suffix: str) -> bytes:
+    """LinkInfo с CommonNetworkRelativeLink (\\\\сервер\\ресурс) и CommonPathSuffix."""
+    header_size = 0x1C
+    net_name_bytes = _cstring(net_name)
+    network = struct.pack("<IIIII", 0x14 + len(net_name_bytes), 0x2, 0x14, 0, 0x00020000) + net_name_bytes
+    network_offset = header_size
+    suffix_offset = network_offset + len(network)
+    body = network + _cstring(suffix)
+    return struct.pack("<IIIIIII", header_size + len(body), header_size, COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX,
+                       0, 0, network_offset, suffix_offset) + body
+
+
+def _item(payload: bytes) -> bytes:
+    return struct.pack("<H", len(payload) + 2) + payload
+
+
+def id_root(clsid: uuid.UUID = MY_COMPUTER_CLSID) -> bytes:
+    return _item(b"\x1f\x50" + clsid.bytes_le)
+
+
+def id_drive(drive: str) -> bytes:
+    return _item(b"\x2f" + _cstring(drive).ljust(22, b"\0"))
+
+
+def id_file_entry(short_name: str, long_name: str = None, folder: bool = True, version: int = 3) -> bytes:
+    """Элемент файловой системы: короткое ANSI-имя и, если задано, длинное имя в блоке 0xBEEF0004."""
+    item_type = 0x31 if folder else 0x32
+    name = _cstring(short_name)
+    if len(name) % 2:
+        name += b"\0"
+    body = bytes([item_type, 0]) + struct.pack("<IIH", 0, 0, 0x10 if folder else 0x20) + name
+    if long_name is None:
+        return _item(body)
+    extension_offset = 2 + len(body) # Смещение считается от начала элемента (с полем размера)
+    extension = struct.pack("<HHIIIH", 0, version, 0xBEEF0004, 0, 0, 0x2E)
+    if version >= 7:
+        extension += b"\0" * 18
+    extension += struct.pack("<H", 0) # Размер длинной строки
+    if version >= 9:
+        extension += b"\0" * 4
+    if version >= 8:
+        extension += b"\0" * 4
+    extension += _wstring(long_name) + struct.pack("<H", extension_offset)
+    extension = struct.pack("<H", len(extension)) + extension[2:]
+    return _item(body + extension)
+
+
+def id_list(*items: bytes) -> bytes:
+    data = b"".join(items) + b"\0\0"
+    return struct.pack("<H", len(data)) + data
+
+
+def string_data(value: str, unicode: bool = True) -> bytes:
+    if unicode:
+        return struct.pack("<H", len(value)) + value.encode("utf-16-le")
+    encoded = value.encode("cp1252")
+    return struct.pack("<H", len(encoded)) + encoded
+
+
+def environment_block(target: str) -> bytes:
+    ansi = target.encode("cp1252").ljust(260, b"\0")
+    wide = target.encode("utf-16-le").ljust(520, b"\0")
+    return struct.pack("<II", 8 + 260 + 520, ENVIRONMENT_VARIABLE_DATA_BLOCK) + ansi + wide
+
+
+TERMINAL_BLOCK = b"\0\0\0\0"
+
+
+def build_corpus() -> dict:
+    """Возвращает {имя файла: (содержимое, ожидаемые значения)}."""
+    corpus = {}
+    program_path = "C:\\Program Files\\App\\app.exe"
+    corpus["ansi_local.lnk"] = (
+        header(HAS_LINK_INFO) + link_info_local(program_path) + TERMINAL_BLOCK,
+        {"target": program_path, "local_base_path": program_path},
+    )
+
+    game_path = "D:\\Игры\\Ведьмак 3"
+    corpus["unicode_local_suffix.lnk"] = (
+        header(HAS_LINK_INFO | IS_UNICODE) + link_info_local(game_path, "witcher3.exe", unicode=True) + TERMINAL_BLOCK,
+        {"target": game_path + "\\witcher3.exe", "local_base_path": game_path, "common_path_suffix": "witcher3.exe"},
+    )
+
+    corpus["network_share.lnk"] = (
+        header(HAS_LINK_INFO) + link_info_network("\\\\server\\share", "docs\\report.docx") + TERMINAL_BLOCK,
+        {"target": "\\\\server\\share\\docs\\report.docx", "network_path": "\\\\server\\share"},
+    )
+
+    corpus["idlist_long_names.lnk"] = (
+        header(HAS_LINK_TARGET_ID_LIST) + id_list(
+            id_root(), id_drive("C:\\"),
+            id_file_entry("PROGRA~1", "Program Files"),
+            id_file_entry("MYGAME~1", "My Game Deluxe", version=9),
+            id_file_entry("GAME~1.EXE", "Game Launcher.exe", folder=False, version=8),
+        ) + TERMINAL_BLOCK,
+        {"target": "C:\\Program Files\\My Game Deluxe\\Game Launcher.exe"},
+    )
+
+    corpus["idlist_short_names.lnk"] = (
+        header(HAS_LINK_TARGET_ID_LIST) + id_list(
+            id_root(), id_drive("E:\\"), id_file_entry("TOOLS"), id_file_entry("RUN.EXE", folder=False),
+        ) + TERMINAL_BLOCK,
+        {"target": "E:\\TOOLS\\RUN.EXE"},
+    )
+
+    corpus["idlist_control_panel.lnk"] = (
+        header(HAS_LINK_TARGET_ID_LIST) + id_list(id_root(CONTROL_PANEL_CLSID), _item(b"\x71" + b"\0" * 20))
+        + TERMINAL_BLOCK,
+        {"target": ""},
+    )
+
+    # Флаг ForceNoLinkInfo: LinkInfo игнорируется, путь берется из LinkTargetIDList
+    corpus["force_no_link_info.lnk"] = (
+        header(HAS_LINK_TARGET_ID_LIST | HAS_LINK_INFO | FORCE_NO_LINK_INFO) + id_list(
+            id_root(), id_drive("C:\\"), id_file_entry("REAL", "Real Target"),
+        ) + link_info_local("C:\\Stale\\target.exe") + TERMINAL_BLOCK,
+        {"target": "C:\\Real Target", "local_base_path": ""},
+    )
+
+    # Только StringData: относительный путь от папки ярлыка, рабочая папка, аргументы, имя
+    flags = HAS_NAME | HAS_RELATIVE_PATH | HAS_WORKING_DIR | HAS_ARGUMENTS | IS_UNICODE
+    corpus["relative_unicode.lnk"] = (
+        header(flags) + string_data("Заметки") + string_data("..\\targets\\заметки.txt")
+        + string_data("C:\\Users\\user\\Documents") + string_data("--open") + TERMINAL_BLOCK,
+        {"relative_target": ["..", "targets", "заметки.txt"], "name": "Заметки",
+         "relative_path": "..\\targets\\заметки.txt", "working_dir": "C:\\Users\\user\\Documents",
+         "arguments": "--open"},
+    )
+
+    corpus["relative_ansi.lnk"] = (
+        header(HAS_RELATIVE_PATH | HAS_WORKING_DIR) + string_data(".\\bin\\tool.exe", unicode=False)
+        + string_data("C:\\Work", unicode=False) + TERMINAL_BLOCK,
+        {"relative_target": ["bin", "tool.exe"], "relative_path": ".\\bin\\tool.exe", "working_dir": "C:\\Work"},
+    )
+
+    # Блок переменных окружения (ExtraData); StringData перед ним должны быть пропущены корректно
+    corpus["environment_block.lnk"] = (
+        header(HAS_WORKING_DIR | HAS_EXP_STRING | IS_UNICODE) + string_data("%LNK_TEST_ROOT%")
+        + environment_block("%LNK_TEST_ROOT%\\Tools\\tool.exe") + TERMINAL_BLOCK,
+        {"environment": {"LNK_TEST_ROOT": "C:\\Env"}, "target": "C:\\Env\\Tools\\tool.exe",
+         "environment_target": "%LNK_TEST_ROOT%\\Tools\\tool.exe", "working_dir": "%LNK_TEST_ROOT%"},
+    )
+
+    # Поврежденные файлы: ожидается LnkParseError
+    valid = corpus["ansi_local.lnk"][0]
+    corpus["corrupt_empty.lnk"] = (b"", {"error": True})
+    corpus["corrupt_truncated_header.lnk"] = (valid[:40], {"error": True})
+    corpus["corrupt_bad_clsid.lnk"] = (valid[:4] + CONTROL_PANEL_CLSID.bytes_le + valid[20:], {"error": True})
+    corpus["corrupt_truncated_link_info.lnk"] = (valid[:LNK_HEADER_SIZE + 12], {"error": True})
+    corpus["corrupt_link_info_size.lnk"] = (
+        header(HAS_LINK_INFO) + struct.pack("<I", 0x7FFFFFFF) + valid[LNK_HEADER_SIZE + 4:], {"error": True})
+    corpus["corrupt_id_list_item.lnk"] = (
+        header(HAS_LINK_TARGET_ID_LIST) + struct.pack("<H", 8) + struct.pack("<H", 200) + b"\0" * 6 + TERMINAL_BLOCK,
+        {"error": True})
+    corpus["corrupt_truncated_string_data.lnk"] = (
+        header(HAS_RELATIVE_PATH | IS_UNICODE) + struct.pack("<H", 50) + "abc".encode("utf-16-le"), {"error": True})
+    return corpus
+
+
+def main() -> int:
+    expected = {}
+    for filename, (content, values) in sorted(build_corpus().items()):
+        with open(os.path.join(CORPUS_DIR, filename), "wb") as f:
+            f.write(content)
+        expected[filename] = values
+    with open(os.path.join(CORPUS_DIR, "expected.json"), "w", encoding="utf-8", newline="\n") as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Записано ярлыков: {len(expected)} в '{CORPUS_DIR}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+
+import pytest
+
+from desktop_sort import aio
+from desktop_sort.aio import AsyncDesktopSorter
+from desktop_sort.listview import DesktopListViewSession, FakeListViewBackend
+
+
+class ThreadRecordingBackend(FakeListViewBackend):
+    """FakeListViewBackend, запоминающий потоки, из которых вызывались его методы."""
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.threads = set()
+        self.closed = False
+
+    def _record(self):
+        self.threads.add(threading.current_thread().name)
+
+    def alloc(self, size):
+        self._record()
+        return super().alloc(size)
+
+    def free(self, address):
+        self._record()
+        return super().free(address)
+
+    def write(self, address, data):
+        self._record()
+        return super().write(address, data)
+
+    def read(self, address, size):
+        self._record()
+        return super().read(address, size)
+
+    def send_message(self, message, wparam, lparam):
+        self._record()
+        return super().send_message(message, wparam, lparam)
+
+    def is_alive(self):
+        self._record()
+        return super().is_alive()
+
+    def invalidate(self):
+        self._record()
+        return super().invalidate()
+
+    def close(self):
+        self._record()
+        self.closed = True
+        return super().close()
+
+
+def _items(count: int):
+    return [(f"Иконка {index}", (10 + index, 20)) for index in range(count)]
+
+
+def _sorter(backend, tmp_path, **kwargs):
+    created_in = []
+
+    def factory(hwnd):
+        created_in.append(threading.current_thread().name)
+        return backend
+
+    session = DesktopListViewSession(hwnd=1, backend_factory=factory, batch_size=4)
+    sorter = AsyncDesktopSorter(session, [], desktop_paths=[str(tmp_path)], io_concurrency=3, **kwargs)
+    return sorter, session, created_in
+
+
+def _track_snapshot_close(session):
+    """Оборачивает session.iter_snapshot: запоминает поток, в котором генератор был закрыт или исчерпан."""
+    finished_in = []
+    iter_snapshot = session.iter_snapshot
+
+    def tracked(count=None):
+        try:
+            yield from iter_snapshot(count)
+        finally:
+            finished_in.append(threading.current_thread().name)
+
+    session.iter_snapshot = tracked
+    return finished_in
+
+
+def test_backend_is_used_from_single_ipc_thread(tmp_path):
+    backend = ThreadRecordingBackend(_items(10))
+    sorter, session, created_in = _sorter(backend, tmp_path)
+    finished_in = _track_snapshot_close(session)
+
+    async def run():
+        async with sorter:
+            icons = await sorter.scan(timeout=10)
+            plan, moved = await sorter.apply_layout(icons, keep_order=True, timeout=10)
+            return icons, plan, moved
+
+    icons, plan, moved = asyncio.run(run())
+
+    assert [icon['index'] for icon in icons] == list(range(10))
+    assert moved and all(moved.values())
+    assert len(created_in) == 1 and created_in[0].startswith("desktop-ipc")
+    assert backend.threads == {created_in[0]}
+    assert finished_in == [created_in[0]]
+    assert backend.closed
+
+
+def test_cancelled_scan_closes_snapshot_in_ipc_thread(tmp_path, monkeypatch):
+    backend = ThreadRecordingBackend(_items(12))
+    sorter, session, created_in = _sorter(backend, tmp_path)
+    finished_in = _track_snapshot_close(session)
+    describing = threading.Event()
+    release = threading.Event()
+    describe_icon = aio.describe_icon
+
+    def slow_describe_icon(*args, **kwargs):
+        describing.set()
+        release.wait(5)
+        return describe_icon(*args, **kwargs)
+
+    monkeypatch.setattr(aio, "describe_icon", slow_describe_icon)
+
+    async def run():
+        try:
+            task = asyncio.ensure_future(sorter.scan())
+            while not describing.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            # Уже выполняемые describe_icon должны завершиться, чтобы scan() закрыл генератор
+            release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # Генератор закрывается в потоке ListView (под asyncio.shield); ждем его завершения там же
+            await sorter._run_ipc(lambda: None)
+        finally:
+            await sorter.close()
+
+    asyncio.run(run())
+
+    assert created_in and created_in[0].startswith("desktop-ipc")
+    assert finished_in == [created_in[0]]
+    assert backend.threads == {created_in[0]}
+    # Удаленный буфер снимка возвращен в пул и освобожден при закрытии сессии
+    assert backend.calls["alloc"] == backend.calls["free"]
+    assert session.backend is None
+
+
+def test_scan_timeout_propagates(tmp_path, monkeypatch):
+    backend = ThreadRecordingBackend(_items(4))
+    sorter, session, _ = _sorter(backend, tmp_path)
+    release = threading.Event()
+    describe_icon = aio.describe_icon
+
+    def blocked_describe_icon(*args, **kwargs):
+        release.wait(5)
+        return describe_icon(*args, **kwargs)
+
+    monkeypatch.setattr(aio, "describe_icon", blocked_describe_icon)
+
+    async def run():
+        # scan() после таймаута дожидается уже выполняемых вызовов (сброс кэшей идет в пуле "desktop-io")
+        releaser = threading.Timer(0.2, release.set)
+        releaser.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await sorter.scan(timeout=0.05)
+        finally:
+            release.set()
+            releaser.cancel()
+            await sorter.close()
+
+    asyncio.run(run())
+    assert backend.closed
@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from desktop_sort.batch import _iter_chunks, classify_lines, classify_stream
+from desktop_sort.classifier import IconClassifier
+from desktop_sort.codes import Category
+from desktop_sort.title_catalog import default_index_path
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def titles(tmp_path):
+    path = tmp_path / "titles.txt"
+    path.write_text("witcher 3\nведьмак 3\nportal 2\n", encoding="utf-8")
+    return str(path)
+
+
+def _inventory(count: int) -> list:
+    kinds = [
+        {'name': "Witcher 3", 'type': "исполняемый файл", 'full_path': "D:\\Soft\\W\\witcher3.exe",
+         'original_desktop_type': "ярлык"},
+        {'name': "Отчет", 'full_path': "C:\\Users\\u\\Desktop\\report.docx"},
+        {'name': "YouTube", 'full_path': "https://www.youtube.com/", 'original_desktop_type': "интернет-ярлык"},
+        {'name': "Ведьмак 3", 'type': "исполняемый файл", 'full_path': "D:\\Игры\\w3.exe",
+         'original_desktop_type': "ярлык"},
+    ]
+    return [json.dumps(dict(kinds[number % len(kinds)], id=number), ensure_ascii=False) for number in range(count)]
+
+
+def test_malformed_lines_are_reported_per_line():
+    lines = ['{"name": "Witcher 3", "full_path": "D:\\\\W\\\\witcher3.exe", "type": "исполняемый файл"}',
+             '{"name": ',
+             '["not", "an", "object"]',
+             '{"full_path": "C:\\\\x.txt"}',
+             '{"name": "Отчет", "full_path": "C:\\\\report.docx"}']
+
+    text, count, errors = classify_lines(lines, 10, IconClassifier(["witcher 3"]))
+
+    output = [json.loads(line) for line in text.splitlines()]
+    assert (count, errors) == (5, 3)
+    assert output[0]['category'] == "Игры"
+    assert [record['line'] for record in output[1:4]] == [11, 12, 13]
+    assert output[1]['error'].startswith("JSONDecodeError")
+    assert output[2]['error'].startswith("ValueError")
+    assert output[3]['error'].startswith("KeyError")
+    assert output[4]['category'] == "Документы"
+
+
+def test_codes_instead_of_names():
+    text, _, _ = classify_lines(['{"name": "Отчет", "full_path": "C:\\\\report.docx"}'], 1, IconClassifier([]), None)
+    assert json.loads(text)['category'] == int(Category.DOCUMENTS)
+
+
+def test_chunks_keep_source_line_numbers():
+    stream = io.StringIO("a\n\n  \nb\nc\n\nd\n")
+    assert list(_iter_chunks(stream, 2)) == [(1, ["a\n", "b\n"]), (5, ["c\n", "d\n"])]
+
+
+def test_process_pool_preserves_order(titles):
+    lines = _inventory(150)
+    lines.insert(37, "{broken")
+    source = "\n".join(lines) + "\n"
+
+    serial = io.StringIO()
+    serial_counts = classify_stream(io.StringIO(source), serial, titles, workers=1, chunk_size=7)
+    parallel = io.StringIO()
+    parallel_counts = classify_stream(io.StringIO(source), parallel, titles, workers=3, chunk_size=7)
+
+    assert serial_counts == parallel_counts == (151, 1)
+    assert parallel.getvalue() == serial.getvalue()
+    output = [json.loads(line) for line in parallel.getvalue().splitlines()]
+    assert [record.get('id') for record in output if 'id' in record] == list(range(150))
+    assert output[37] == {'line': 38, 'error': output[37]['error']}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_falls_back_to_memory_catalog_when_index_cannot_be_built(titles, workers, caplog):
+    # Каталог на месте индекса: ни открыть, ни записать индекс нельзя
+    os.mkdir(default_index_path(titles))
+    output = io.StringIO()
+
+    counts = classify_stream(io.StringIO("\n".join(_inventory(8)) + "\n"), output, titles, workers=workers, chunk_size=3)
+
+    assert counts == (8, 0)
+    categories = [json.loads(line)['category'] for line in output.getvalue().splitlines()]
+    assert categories == ["Игры", "Документы", "Мультимедиа (Онлайн)", "Игры"] * 2
+    assert any("Каталог загружается в память" in record.getMessage() for record in caplog.records)
+
+
+def test_cli_reads_and_writes_utf8_regardless_of_console_encoding(titles):
+    source = "\ufeff" + "\n".join(_inventory(4)) + "\n"
+    environment = dict(os.environ, PYTHONIOENCODING="cp1251", PYTHONPATH=REPO_ROOT)
+
+    result = subprocess.run([sys.executable, "-m", "desktop_sort.batch", "--titles", titles],
+                            input=source.encode("utf-8"), capture_output=True, env=environment, check=True)
+
+    output = [json.loads(line) for line in result.stdout.decode("utf-8").splitlines()]
+    assert [record['name'] for record in output] == ["Witcher 3", "Отчет", "YouTube", "Ведьмак 3"]
+    assert [record['category'] for record in output] == ["Игры", "Документы", "Мультимедиа (Онлайн)", "Игры"]
@@ -0,0 +1,84 @@
+import threading
+
+from desktop_sort.cache import ClassificationCache, ShortcutResolutionCache
+from desktop_sort.codes import Category, ItemType
+
+
+RESULT = ("Игра", ItemType.EXECUTABLE, "C:\\Games\\game.exe", ItemType.SHORTCUT)
+
+
+def test_shortcut_cache_round_trip(tmp_path):
+    filename = str(tmp_path / "shortcuts.sqlite3")
+    with ShortcutResolutionCache(filename) as cache:
+        cache.put("C:\\Desktop\\game.lnk", 100, 5, RESULT)
+        assert cache.get("C:\\Desktop\\game.lnk", 100, 5) == RESULT
+    with ShortcutResolutionCache(filename) as cache:
+        assert cache.get("C:\\Desktop\\game.lnk", 100, 5) == RESULT
+        # Файл ярлыка изменился - запись недействительна
+        assert cache.get("C:\\Desktop\\game.lnk", 101, 5) is None
+
+
+def test_shortcut_cache_keeps_puts_made_during_flush(tmp_path):
+    filename = str(tmp_path / "shortcuts.sqlite3")
+    workers = 4
+    per_worker = 300
+    with ShortcutResolutionCache(filename, max_entries=workers * per_worker) as cache:
+        done = threading.Event()
+
+        def resolve(worker):
+            for number in range(per_worker):
+                path = f"{worker}\\{number}.lnk"
+                cache.put(path, number, 1, RESULT)
+                cache.get(path, number, 1)
+
+        def flush_repeatedly():
+            while not done.is_set():
+                cache.flush()
+
+        flusher = threading.Thread(target=flush_repeatedly)
+        flusher.start()
+        threads = [threading.Thread(target=resolve, args=(worker,)) for worker in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        flusher.join()
+
+    with ShortcutResolutionCache(filename) as cache:
+        missing = [(worker, number) for worker in range(workers) for number in range(per_worker)
+                   if cache.get(f"{worker}\\{number}.lnk", number, 1) != RESULT]
+    assert missing == []
+
+
+def test_classification_cache_keeps_puts_made_during_flush(tmp_path):
+    filename = str(tmp_path / "classification.sqlite3")
+    count = 2000
+    with ClassificationCache(filename) as cache:
+        done = threading.Event()
+
+        def flush_repeatedly():
+            while not done.is_set():
+                cache.flush()
+
+        flusher = threading.Thread(target=flush_repeatedly)
+        flusher.start()
+        for number in range(count):
+            cache.put(f"key-{number}", Category.GAMES)
+        done.set()
+        flusher.join()
+
+    with ClassificationCache(filename) as cache:
+        assert all(cache.get(f"key-{number}") == Category.GAMES for number in range(count))
+
+
+def test_classification_cache_treats_unknown_code_as_miss(tmp_path):
+    filename = str(tmp_path / "classification.sqlite3")
+    with ClassificationCache(filename) as cache:
+        cache.put("stale", Category.GAMES)
+        cache.put("unknown", Category.UNKNOWN)
+    with ClassificationCache(filename) as cache:
+        with cache._lock:
+            cache._connection.execute("UPDATE classifications SET category = 999 WHERE key = 'stale'")
+        assert cache.get("stale") is None
+        assert cache.get("unknown") is Category.UNKNOWN
@@ -0,0 +1,124 @@
+from desktop_sort.classifier import IconClassifier
+from desktop_sort.codes import Category, ItemType
+
+
+def _url(name: str, url: str) -> dict:
+    return {'name': name, 'original_icon_name': name, 'type': ItemType.INTERNET_SHORTCUT,
+            'original_desktop_type': ItemType.INTERNET_SHORTCUT, 'full_path': url}
+
+
+def test_user_site_rule_with_unknown_category():
+    # Category.UNKNOWN == 0: правило должно срабатывать, а не уступать общей категории ссылок
+    classifier = IconClassifier([], sites={"intranet.example": Category.UNKNOWN, "wiki.example": "Неизвестно"})
+    assert classifier.classify(_url("Портал", "https://intranet.example/start")) is Category.UNKNOWN
+    assert classifier.classify(_url("Вики", "https://wiki.example/")) is Category.UNKNOWN
+    assert classifier.classify(_url("Пример", "https://other.example/")) is Category.INTERNET_LINKS
+
+
+def test_user_site_rule_with_custom_category():
+    classifier = IconClassifier([], sites={"tracker.example": "Работа"})
+    category = classifier.classify(_url("Трекер", "https://tracker.example/issues"))
+    assert str(category) == "Работа"
+
+
+def test_get_icon_category_returns_legacy_names():
+    from desktop_sort import codes
+    from desktop_sort.classifier import get_icon_category
+    record = {'name': "Witcher 3", 'original_icon_name': "Witcher 3", 'type': ItemType.EXECUTABLE,
+              'original_desktop_type': ItemType.SHORTCUT, 'full_path': "D:\\Soft\\W\\witcher3.exe"}
+    assert get_icon_category(record, ["witcher 3"]) == "Игры"
+    # Названия типов на входе тоже принимаются, как раньше
+    legacy = dict(record, type="исполняемый файл", original_desktop_type="ярлык")
+    assert get_icon_category(legacy, ["witcher 3"]) == "Игры"
+    codes.set_language("en")
+    try:
+        assert get_icon_category(record, ["witcher 3"]) == "Игры"
+    finally:
+        codes.set_language(codes.DEFAULT_LANGUAGE)
+
+
+def _exe(name: str, path: str) -> dict:
+    return {'name': name, 'original_icon_name': name, 'type': ItemType.EXECUTABLE,
+            'original_desktop_type': ItemType.SHORTCUT, 'full_path': path}
+
+
+def test_memo_is_bounded_lru():
+    classifier = IconClassifier(["witcher 3"], memo_size=3)
+    records = [_exe(f"Tool {number}", f"D:\\Soft\\tool{number}.exe") for number in range(4)]
+    for record in records[:3]:
+        classifier.classify(record)
+    # Обращение к первой записи делает ее самой свежей: вытесняется вторая
+    classifier.classify(records[0])
+    classifier.classify(records[3])
+
+    assert len(classifier._memo) == 3
+    names = [key[0] for key in classifier._memo]
+    assert names == ["Tool 2", "Tool 0", "Tool 3"]
+
+
+def test_memo_disabled():
+    classifier = IconClassifier([], memo_size=0)
+    classifier.classify(_exe("Tool", "D:\\Soft\\tool.exe"))
+    assert len(classifier._memo) == 0
+
+
+def test_store_entries_are_invalidated_by_catalog_version(tmp_path):
+    from desktop_sort.cache import ClassificationCache
+    record = _exe("Witcher 3", "D:\\Soft\\W\\witcher3.exe")
+    with ClassificationCache(str(tmp_path / "classifications.sqlite3")) as store:
+        with_title = IconClassifier(["witcher 3"], memo_size=0, store=store)
+        assert with_title.classify(record) is Category.GAMES
+        store.flush()
+
+        # Тот же каталог (та же версия) - результат из кэша, правила не выполняются
+        same = IconClassifier(["witcher 3"], memo_size=0, store=store)
+        same._classify = None
+        assert same.classify(record) is Category.GAMES
+
+        without_title = IconClassifier(["cyberpunk 2077"], memo_size=0, store=store)
+        assert without_title.game_titles.version != with_title.game_titles.version
+        assert without_title.fingerprint(record) != with_title.fingerprint(record)
+        assert without_title.classify(record) is Category.PROGRAMS
+
+
+def test_store_entries_are_invalidated_by_rule_change(tmp_path):
+    from desktop_sort.cache import ClassificationCache
+    record = _url("Трекер", "https://tracker.example/issues")
+    with ClassificationCache(str(tmp_path / "classifications.sqlite3")) as store:
+        plain = IconClassifier([], memo_size=0, store=store)
+        assert plain.classify(record) is Category.INTERNET_LINKS
+        store.flush()
+
+        with_rule = IconClassifier([], memo_size=0, store=store, sites={"tracker.example": Category.ONLINE_DEVELOPMENT})
+        assert with_rule.ruleset_version != plain.ruleset_version
+        assert with_rule.classify(record) is Category.ONLINE_DEVELOPMENT
+        assert IconClassifier([], memo_size=0, store=store, environ={"ProgramFiles": "E:\\Apps"}).ruleset_version \
+            != plain.ruleset_version
+
+
+def test_get_classifier_tracks_titles_object_and_version(tmp_path):
+    from desktop_sort.classifier import get_classifier
+    from desktop_sort.title_catalog import LazyTitleCatalog
+    titles = ["witcher 3"]
+    first = get_classifier(titles)
+    assert get_classifier(titles) is first
+    assert get_classifier(first) is first
+
+    titles.append("cyberpunk 2077")
+    grown = get_classifier(titles)
+    assert grown is not first
+    assert "cyberpunk 2077" in grown.game_titles
+    assert get_classifier(list(titles)) is not grown
+
+    source = tmp_path / "titles.txt"
+    source.write_text("witcher 3\n", encoding="utf-8")
+    catalog = LazyTitleCatalog(str(source))
+    before = get_classifier(catalog)
+    assert get_classifier(catalog) is before
+    source.write_text("witcher 3\ncyberpunk 2077\n", encoding="utf-8")
+    # Версия LazyTitleCatalog пересчитывается после close()
+    catalog.close()
+    after = get_classifier(catalog)
+    assert after is not before
+    assert after.classify(_exe("Cyberpunk 2077", "D:\\Soft\\C\\cp.exe")) is Category.GAMES
+    catalog.close()
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from desktop_sort import codes
+from desktop_sort.codes import (
+    CUSTOM_CATEGORY_BASE, Category, CustomCategory, ItemType, category_code, category_name, item_type_code,
+    register_category,
+)
+
+
+def test_register_category_code_does_not_depend_on_order():
+    script = ("import sys; from desktop_sort.codes import register_category; "
+              "print(sorted((name, int(register_category(name))) for name in sys.argv[1:]))")
+    names = ["Работа", "Учеба", "Хобби"]
+    runs = [subprocess.run([sys.executable, "-c", script, *order], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+            for order in (names, names[::-1])]
+    assert runs[0] == runs[1]
+    assert f"('Хобби', {int(register_category('Хобби'))})" in runs[0]
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    """Пустой реестр категорий пользователя на время теста; reset() - имитация нового процесса."""
+    def reset():
+        monkeypatch.setattr(codes, "_custom_categories", {})
+        monkeypatch.setattr(codes, "_custom_category_names", {})
+        monkeypatch.setattr(codes, "_CATEGORIES_BY_NAME", dict(BUILTIN_NAMES))
+    reset()
+    return reset
+
+
+BUILTIN_NAMES = {name: code for name, code in codes._CATEGORIES_BY_NAME.items() if code.__class__ is Category}
+
+
+def test_register_category_probes_on_collision(fresh_registry, monkeypatch):
+    monkeypatch.setattr(codes, "CUSTOM_CATEGORY_LIMIT", CUSTOM_CATEGORY_BASE + 2)
+    first = register_category("Первая")
+    second = register_category("Вторая")
+    assert {int(first), int(second)} == {CUSTOM_CATEGORY_BASE, CUSTOM_CATEGORY_BASE + 1}
+    assert register_category("Первая") is first
+    assert str(second) == "Вторая"
+    with pytest.raises(ValueError):
+        register_category("Третья")
+
+
+def test_register_category_ignores_case_and_spaces(fresh_registry):
+    category = register_category("Работа")
+    assert register_category("работа") is category
+    assert register_category("  РАБОТА ") is category
+    assert category_code("рАбОтА") is category
+    assert str(category) == "Работа"
+    assert register_category("игры") is Category.GAMES
+
+
+def test_category_codes_restored_from_cache(fresh_registry, monkeypatch, tmp_path):
+    from desktop_sort.cache import ClassificationCache
+    # Два кода на три названия: без сохраненного соответствия коды зависели бы от порядка
+    monkeypatch.setattr(codes, "CUSTOM_CATEGORY_LIMIT", CUSTOM_CATEGORY_BASE + 2)
+    filename = str(tmp_path / "classification.sqlite3")
+    with ClassificationCache(filename):
+        expected = {name: int(register_category(name)) for name in ("Работа", "Учеба")}
+
+    fresh_registry()
+    with ClassificationCache(filename):
+        assert {name: int(register_category(name)) for name in ("Учеба", "Работа")} == expected
+        assert str(category_code(expected["Работа"])) == "Работа"
+
+
+def test_restore_categories_skips_conflicts(fresh_registry):
+    work = register_category("Работа")
+    free_code = CUSTOM_CATEGORY_BASE if int(work) != CUSTOM_CATEGORY_BASE else CUSTOM_CATEGORY_BASE + 1
+    restored = codes.restore_categories([(int(work) + 0, "Другое"), (free_code, "работа"), (free_code, "Хобби")])
+    assert restored == 1
+    assert register_category("Работа") is work
+    assert int(register_category("Хобби")) == free_code
+    assert int(register_category("Другое")) not in (int(work), free_code)
+
+
+def test_custom_category_round_trip():
+    category = category_code("Мои сайты")
+    assert isinstance(category, CustomCategory)
+    assert int(category) >= CUSTOM_CATEGORY_BASE
+    assert str(category) == category_name(category) == "Мои сайты"
+    assert category_code(int(category)) is category
+    assert category_code("Игры") is Category.GAMES
+    assert category_code("games") is Category.GAMES
+
+
+def test_item_type_code_maps_unknown_values_to_unknown():
+    assert item_type_code(ItemType.SHORTCUT) is ItemType.SHORTCUT
+    assert item_type_code(3) is ItemType.SHORTCUT
+    assert item_type_code(99) is ItemType.UNKNOWN
+    assert item_type_code(-1) is ItemType.UNKNOWN
+    assert item_type_code("ЯРЛЫК") is ItemType.SHORTCUT
+    assert item_type_code("что-то") is ItemType.UNKNOWN
+    assert item_type_code(None) is ItemType.UNKNOWN
+
+
+def test_category_code_maps_unknown_codes_to_unknown():
+    assert category_code(4) is Category.GAMES
+    assert category_code(0) is Category.UNKNOWN
+    assert category_code(999) is Category.UNKNOWN
+    assert category_code(-7) is Category.UNKNOWN
+    assert category_code(10 ** 6) is Category.UNKNOWN
+    assert isinstance(category_code(CUSTOM_CATEGORY_BASE + 5), CustomCategory)
+
+
+def test_unknown_category_codes_in_records_do_not_raise():
+    from desktop_sort.records import IconRecord, IconRecordArray
+    record = IconRecord.from_dict({'index': 0, 'name': "Иконка", 'category': 999, 'type': 42})
+    assert record.category is Category.UNKNOWN
+    assert record.type is ItemType.UNKNOWN
+    assert IconRecordArray([record])[0].category is Category.UNKNOWN
@@ -0,0 +1,213 @@
+import os
+import socket
+import threading
+
+import pytest
+
+from desktop_sort import daemon
+from desktop_sort.cache import ClassificationCache, ShortcutResolutionCache
+from desktop_sort.codes import Category, ItemType
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="нужен Unix-сокет")
+
+
+def _record(name: str, full_path: str) -> dict:
+    return {'name': name, 'original_icon_name': name, 'type': ItemType.EXECUTABLE,
+            'original_desktop_type': ItemType.SHORTCUT, 'full_path': full_path}
+
+
+WITCHER = _record("Witcher 3", "D:\\Soft\\Witcher\\witcher3.exe")
+PORTAL = _record("Portal", "D:\\Soft\\Portal\\portal.exe")
+FOLDER = {'name': "Документы", 'original_icon_name': "Документы", 'type': ItemType.FOLDER,
+          'original_desktop_type': ItemType.FOLDER, 'full_path': "C:\\Docs"}
+
+
+@pytest.fixture
+def service(tmp_path):
+    titles = tmp_path / "titles.txt"
+    titles.write_text("Witcher 3\nHalf-Life\n", encoding="utf-8")
+    service = daemon.DesktopSortService(
+        str(titles), shortcut_cache=ShortcutResolutionCache(str(tmp_path / "shortcuts.sqlite3")),
+        classification_cache=ClassificationCache(str(tmp_path / "classification.sqlite3")))
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def server(service, tmp_path):
+    address = str(tmp_path / "daemon.sock")
+    thread = threading.Thread(target=daemon.serve, args=(service, address), daemon=True)
+    thread.start()
+    # serve() создает сокет в своем потоке: ждем, пока он начнет принимать соединения
+    for _ in range(200):
+        try:
+            with daemon.DaemonClient(address, timeout=5) as client:
+                client.request("ping")
+            break
+        except OSError:
+            threading.Event().wait(0.01)
+    yield address, thread
+    if thread.is_alive():
+        with daemon.DaemonClient(address, timeout=5) as client:
+            client.request("shutdown")
+        thread.join(5)
+
+
+def _add_title(service, title: str):
+    with open(service.titles_filename, "a", encoding="utf-8") as f:
+        f.write(title + "\n")
+
+
+def test_round_trip(server):
+    address, _ = server
+    with daemon.DaemonClient(address, timeout=5) as client:
+        assert client.request("ping")["pid"] == os.getpid()
+        categories = client.request("classify", records=[WITCHER, PORTAL, FOLDER])
+        assert categories == [Category.GAMES, Category.PROGRAMS, Category.FOLDERS]
+        assert client.request("classify", records=[]) == []
+        with pytest.raises(daemon.DaemonError):
+            client.request("classify", records="не список")
+        with pytest.raises(daemon.DaemonError):
+            client.request("unknown")
+        # scan без доступа к ListView - ошибка, соединение остается рабочим
+        with pytest.raises(daemon.DaemonError):
+            client.request("scan")
+        result = client.request("stats")
+        assert result["requests"] >= 6
+        assert result["reloads"] == 0
+
+
+def test_invalid_json_line(server):
+    address, _ = server
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(address)
+        with sock.makefile("rwb") as f:
+            f.write(b"{not json\n")
+            f.flush()
+            assert b'"ok": false' in f.readline()
+
+
+def test_reload_after_titles_edit(server, service):
+    address, _ = server
+    with daemon.DaemonClient(address, timeout=5) as client:
+        assert client.request("classify", records=[PORTAL]) == [Category.PROGRAMS]
+        version = client.request("stats")["catalog_version"]
+        _add_title(service, "Portal")
+        result = client.request("reload")
+        assert result["reloads"] == 1
+        assert result["catalog_version"] != version
+        assert client.request("classify", records=[PORTAL]) == [Category.GAMES]
+        assert client.request("stats")["retired_catalogs"] == 0
+
+
+def test_automatic_reload(service, monkeypatch):
+    monkeypatch.setattr(daemon, "RELOAD_CHECK_INTERVAL", 0.0)
+    assert service.handle({"id": 1, "op": "classify", "records": [PORTAL]})["result"] == [Category.PROGRAMS]
+    _add_title(service, "Portal")
+    assert service.handle({"id": 2, "op": "classify", "records": [PORTAL]})["result"] == [Category.GAMES]
+    assert service.reloads == 1
+    assert not service.maybe_reload()
+
+
+def test_retired_catalog_closed_after_last_request(service):
+    old = service._acquire_classifier()
+    len(old.game_titles)
+    assert old.game_titles.loaded
+    _add_title(service, "Portal")
+    assert service.maybe_reload(force=True)
+    # Запрос со старым классификатором еще выполняется: каталог открыт
+    assert service._retired == [old]
+    assert old.game_titles.loaded
+    service._release_classifier(old)
+    assert service._retired == []
+    assert not old.game_titles.loaded
+    # Без выполняющихся запросов старый каталог закрывается сразу
+    current = service.classifier
+    len(current.game_titles)
+    assert service.maybe_reload(force=True)
+    assert service._retired == []
+    assert not current.game_titles.loaded
+
+
+def test_request_counter_is_thread_safe(service):
+    threads = [threading.Thread(target=lambda: [service.handle({"op": "ping"}) for _ in range(200)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.requests == 8 * 200
+    assert service._in_flight == {}
+
+
+def test_shutdown(server, service):
+    address, thread = server
+    with daemon.DaemonClient(address, timeout=5) as client:
+        client.request("classify", records=[WITCHER])
+        assert client.request("shutdown") is None
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not os.path.exists(address)
+    assert not service.classifier.game_titles.loaded
+    with pytest.raises(OSError):
+        with daemon.DaemonClient(address, timeout=1) as client:
+            client.request("ping")
+
+
+def test_second_server_refuses_running_socket(server, tmp_path):
+    address, thread = server
+    other = daemon.DesktopSortService(
+        str(tmp_path / "titles.txt"), shortcut_cache=ShortcutResolutionCache(":memory:"),
+        classification_cache=ClassificationCache(":memory:"))
+    try:
+        with pytest.raises(OSError):
+            daemon.create_server(other, address)
+    finally:
+        other.close()
+    # Первый сервис продолжает работать
+    with daemon.DaemonClient(address, timeout=5) as client:
+        assert client.request("ping")["pid"] == os.getpid()
+
+
+def test_stale_socket_file_is_replaced(service, tmp_path):
+    address = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(address)
+    stale.close()
+    assert os.path.exists(address)
+    server = daemon.create_server(service, address)
+    try:
+        assert server.server_address == address
+    finally:
+        server.server_close()
+        os.remove(address)
+
+
+def test_tcp_requires_session_token(service, tmp_path):
+    token_path = str(tmp_path / "daemon.token")
+    server = daemon.create_server(service, ("127.0.0.1", 0), token_path=token_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    address = server.server_address
+    try:
+        assert os.path.exists(token_path)
+        if os.name != "nt":
+            assert os.stat(token_path).st_mode & 0o777 == 0o600
+        assert server.allow_reuse_address == (os.name != "nt")
+        with daemon.DaemonClient(address, timeout=5, token_path=token_path) as client:
+            assert client.request("classify", records=[WITCHER]) == [Category.GAMES]
+        with daemon.DaemonClient(address, timeout=5, token_path=str(tmp_path / "missing.token")) as client:
+            with pytest.raises(daemon.DaemonError):
+                client.request("shutdown")
+        with socket.create_connection(address, timeout=5) as sock, sock.makefile("rwb") as f:
+            f.write(b'{"id": 1, "op": "ping", "token": "guess"}\n')
+            f.flush()
+            assert b'"ok": false' in f.readline()
+        # Запрос без токена, в том числе shutdown, не выполнен: сервис отвечает
+        assert thread.is_alive()
+        with daemon.DaemonClient(address, timeout=5, token_path=token_path) as client:
+            assert client.request("ping")["pid"] == os.getpid()
+    finally:
+        server.shutdown()
+        server.server_close()
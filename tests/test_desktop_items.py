@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from desktop_sort.codes import ItemType
+from desktop_sort.desktop_items import DesktopIndex, determine_item_type
+
+
+@pytest.fixture
+def desktops(tmp_path):
+    user = tmp_path / "user"
+    public = tmp_path / "public"
+    user.mkdir()
+    public.mkdir()
+    return user, public
+
+
+def _touch(path, text=""):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _bump_mtime(folder):
+    # mtime папки меняется вместе с содержимым, но разрешение таймера ФС может быть грубым
+    folder_stat = os.stat(folder)
+    os.utime(folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns + 5_000_000_000))
+
+
+def test_lookup_by_name_and_stem(desktops):
+    user, _ = desktops
+    _touch(user / "Отчет.pdf")
+    _touch(user / "Заметки.txt")
+    _touch(user / "Заметки.docx")
+    (user / "Проекты").mkdir()
+    index = DesktopIndex.scan([str(user)])
+
+    assert index.lookup(0, "Отчет.pdf").name == "Отчет.pdf"
+    assert index.lookup(0, "Отчет") is None
+    folder, entry = index.lookup_stem("Отчет")
+    assert (folder, entry.name) == (str(user), "Отчет.pdf")
+    # Несколько файлов с одним именем без расширения - неоднозначно
+    assert index.lookup_stem("Заметки") == (None, None)
+    assert index.lookup_stem("Нет такого") == (None, None)
+
+    assert determine_item_type("Отчет", index) == ("Отчет", ItemType.PDF, str(user / "Отчет.pdf"), ItemType.PDF)
+    assert determine_item_type("Проекты", index) == ("Проекты", ItemType.FOLDER, str(user / "Проекты"), ItemType.FOLDER)
+    assert sorted(os.path.basename(path) for path in index.paths()) == ["Заметки.docx", "Заметки.txt", "Отчет.pdf",
+                                                                         "Проекты"]
+
+
+def test_user_desktop_takes_precedence_over_public(desktops):
+    user, public = desktops
+    _touch(user / "Общий.txt")
+    _touch(public / "Общий.txt")
+    _touch(public / "Только общий.pdf")
+    _touch(user / "Стем.txt")
+    _touch(public / "Стем.pdf")
+    index = DesktopIndex.scan([str(user), str(public)])
+
+    assert index.folders == [str(user), str(public)]
+    assert determine_item_type("Общий.txt", index)[2] == str(user / "Общий.txt")
+    assert determine_item_type("Только общий", index)[2] == str(public / "Только общий.pdf")
+    # Поиск по имени без расширения берет первую папку, в которой имя найдено
+    assert index.lookup_stem("Стем")[0] == str(user)
+
+
+def test_missing_folder_is_skipped(desktops, tmp_path, caplog):
+    user, _ = desktops
+    _touch(user / "a.txt")
+    index = DesktopIndex.scan([str(tmp_path / "absent"), str(user)])
+
+    assert index.folders == [str(user)]
+    assert index.lookup(0, "a.txt") is not None
+    assert any("absent" in record.getMessage() for record in caplog.records)
+
+
+def test_refresh_rereads_only_changed_folders(desktops):
+    user, public = desktops
+    _touch(user / "Старый.txt")
+    _touch(public / "Общий.txt")
+    index = DesktopIndex.scan([str(user), str(public)])
+    public_entries = index._by_name[1][1]
+
+    assert index.refresh() == 0
+
+    os.remove(user / "Старый.txt")
+    _touch(user / "Новый.pdf")
+    _bump_mtime(user)
+    assert index.refresh() == 1
+
+    assert index.lookup(0, "Старый.txt") is None
+    assert index.lookup_stem("Новый")[1].name == "Новый.pdf"
+    assert index._by_name[1][1] is public_entries
+    assert index.refresh() == 0
+
+
+def test_refresh_empties_folder_that_disappeared(desktops, caplog):
+    user, public = desktops
+    _touch(public / "Общий.txt")
+    index = DesktopIndex.scan([str(user), str(public)])
+    public.joinpath("Общий.txt").unlink()
+    public.rmdir()
+
+    assert index.refresh() == 1
+    assert index.lookup(1, "Общий.txt") is None
+    assert any("Не удалось перечитать" in record.getMessage() for record in caplog.records)
+    assert index.refresh() == 0
+
+    public.mkdir()
+    _touch(public / "Вернулся.txt")
+    assert index.refresh() == 1
+    assert index.lookup(1, "Вернулся.txt") is not None
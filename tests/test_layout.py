@@ -0,0 +1,85 @@
+import logging
+
+from desktop_sort.codes import Category
+from desktop_sort.layout import LayoutConfig, ScreenGeometry, compute_layout
+
+
+# Экран по умолчанию 1920x1080 при 96 DPI: 10 ячеек в столбце, 25 столбцов
+ROWS = 10
+COLUMNS = 25
+
+
+def _records(categories):
+    return [{'index': index, 'name': f"Иконка {index:03}", 'category': category}
+            for index, category in enumerate(categories)]
+
+
+def test_error_records_go_to_unknown_zone():
+    records = _records([Category.PROGRAMS, None, Category.UNKNOWN, None])
+
+    layout = compute_layout(records, ScreenGeometry())
+
+    assert [zone.category for zone in layout.zones] == [Category.PROGRAMS, Category.UNKNOWN]
+    assert layout.zones[1].indices == [1, 2, 3]
+
+
+def test_zones_follow_category_order_then_code():
+    categories = [Category.OTHER_FILES, Category.GAMES, Category.SYSTEM, Category.PROGRAMS]
+    records = _records(categories)
+
+    layout = compute_layout(records, ScreenGeometry())
+    assert [zone.category for zone in layout.zones] == [Category.SYSTEM, Category.PROGRAMS, Category.GAMES, Category.OTHER_FILES]
+
+    config = LayoutConfig(category_order=["Игры"])
+    layout = compute_layout(records, ScreenGeometry(), config)
+    # Категории вне порядка идут после него по возрастанию кода
+    rest = sorted([Category.OTHER_FILES, Category.SYSTEM, Category.PROGRAMS], key=int)
+    assert [zone.category for zone in layout.zones] == [Category.GAMES] + rest
+
+
+def test_zones_start_on_new_column_with_gap():
+    records = _records([Category.PROGRAMS] * (ROWS + 1) + [Category.GAMES])
+
+    layout = compute_layout(records, ScreenGeometry())
+
+    programs, games = layout.zones
+    assert programs.line_count == 2
+    assert games.first_line == 3
+    assert layout.cell_of(*layout.positions[ROWS + 1]) == (3, 0)
+    assert layout.overflow == 0
+
+
+def test_gaps_are_dropped_when_zones_do_not_fit(caplog):
+    # 20 зон по одному столбцу: с промежутками нужно 39 столбцов из 25, без них - 20
+    categories = list(Category)[:20]
+    records = _records([category for category in categories for _ in range(ROWS)])
+
+    with caplog.at_level(logging.INFO):
+        layout = compute_layout(records, ScreenGeometry())
+
+    assert layout.overflow == 0
+    assert [zone.first_line for zone in layout.zones] == list(range(len(layout.zones)))
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+
+def test_overflow_goes_past_screen_edge_with_warning(caplog):
+    records = _records([Category.PROGRAMS] * (COLUMNS * ROWS + 3))
+
+    with caplog.at_level(logging.WARNING):
+        layout = compute_layout(records, ScreenGeometry())
+
+    assert layout.overflow == 3
+    assert len(layout.positions) == len(records)
+    off_screen = [index for index, (x, y) in layout.positions.items() if x + layout.cell_width > 1920]
+    assert sorted(off_screen) == [COLUMNS * ROWS, COLUMNS * ROWS + 1, COLUMNS * ROWS + 2]
+    assert len(set(layout.positions.values())) == len(records)
+    assert any("не помещаются" in record.getMessage() for record in caplog.records)
+
+
+def test_row_major_layout_and_dpi_scaling():
+    records = _records([Category.PROGRAMS] * 3)
+
+    layout = compute_layout(records, ScreenGeometry(1920, 1080, 144, 144), LayoutConfig(column_major=False))
+
+    assert (layout.cell_width, layout.cell_height) == (114, 150)
+    assert [layout.cell_of(*layout.positions[index]) for index in range(3)] == [(0, 0), (1, 0), (2, 0)]
@@ -0,0 +1,267 @@
+import pytest
+
+from desktop_sort.layout import Layout, LayoutConfig, ScreenGeometry, compute_layout
+from desktop_sort.listview import (
+    LVM_SETITEMPOSITION32, WM_SETREDRAW, DesktopListViewSession, FakeListViewBackend, coalesce_moves,
+    RemoteBufferPool, iter_snapshot_batches, snapshot_listview,
+)
+from desktop_sort.planner import plan_moves
+
+
+class RecordingBackend(FakeListViewBackend):
+    """FakeListViewBackend, запоминающий отправленные сообщения."""
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.messages = []
+
+    def send_message(self, message: int, wparam: int, lparam: int) -> int:
+        self.messages.append((message, wparam))
+        return super().send_message(message, wparam, lparam)
+
+
+def _items(count: int):
+    return [(f"Иконка {index}", (10 + index, 20 + index)) for index in range(count)]
+
+
+def _session(backend):
+    return DesktopListViewSession(hwnd=1, backend_factory=lambda hwnd: backend)
+
+
+def _positions(backend):
+    return [tuple(coords) for _, coords in backend.items]
+
+
+# --- move_many ---
+
+def test_move_many_single_redraw_pair_and_write():
+    backend = RecordingBackend(_items(5))
+    with _session(backend) as session:
+        results = session.move_many([(0, 100, 100), (3, 200, 300), (4, -5, 70000)])
+
+    assert results == {0: True, 3: True, 4: True}
+    assert _positions(backend)[0] == (100, 100)
+    assert _positions(backend)[3] == (200, 300)
+    assert _positions(backend)[4] == (-5, 70000)
+    redraw = [message for message in backend.messages if message[0] == WM_SETREDRAW]
+    assert redraw == [(WM_SETREDRAW, 0), (WM_SETREDRAW, 1)]
+    assert [wparam for message, wparam in backend.messages if message == LVM_SETITEMPOSITION32] == [0, 3, 4]
+    # Все координаты - одним WriteProcessMemory, перерисовка - один раз
+    assert backend.calls["write"] == 1
+    assert backend.calls["invalidate"] == 1
+    assert backend.repaints == 1
+    assert backend.redraw is True
+
+
+def test_move_many_reports_per_item_success():
+    backend = RecordingBackend(_items(3))
+    with _session(backend) as session:
+        results = session.move_many([(1, 50, 60), (7, 1, 1), (-1, 2, 2)])
+
+    assert results == {1: True, 7: False, -1: False}
+    assert _positions(backend)[1] == (50, 60)
+    assert [wparam for message, wparam in backend.messages if message == LVM_SETITEMPOSITION32] == [1]
+
+
+def test_move_many_write_failure_marks_all_failed():
+    backend = RecordingBackend(_items(3))
+    with _session(backend) as session:
+        session.ensure_connected()
+        backend.write = lambda address, data: False
+        results = session.move_many([(0, 1, 1), (2, 3, 3)])
+
+    assert results == {0: False, 2: False}
+    assert _positions(backend) == [(10, 20), (11, 21), (12, 22)]
+    assert not any(message == WM_SETREDRAW for message, _ in backend.messages)
+
+
+def test_move_many_empty_does_not_connect():
+    session = DesktopListViewSession(hwnd=1, backend_factory=pytest.fail)
+    assert session.move_many([]) == {}
+
+
+def test_move_many_reuses_pool_buffer():
+    backend = RecordingBackend(_items(4))
+    with _session(backend) as session:
+        session.move_many([(0, 1, 1), (1, 2, 2)])
+        session.move_many([(2, 3, 3)])
+        assert session.pool.allocations == 1
+    assert backend.calls["alloc"] == 1
+    assert backend.calls["free"] == 1
+
+
+def test_coalesce_moves_keeps_parking_moves():
+    swap = [(0, 78, 2), (1, 2, 102), (0, 2, 2)]
+    assert coalesce_moves(swap) == swap
+    assert coalesce_moves([(0, 1, 1), (0, 2, 2), (1, 3, 3), (1, 4, 4), (0, 5, 5)]) == [(0, 2, 2), (1, 4, 4), (0, 5, 5)]
+
+
+def test_move_many_executes_swap_plan_in_order():
+    backend = RecordingBackend([("a", (2, 102)), ("b", (2, 2))])
+    with _session(backend) as session:
+        results = session.move_many([(0, 78, 2), (1, 2, 102), (0, 2, 2)])
+
+    assert results == {0: True, 1: True}
+    assert [wparam for message, wparam in backend.messages if message == LVM_SETITEMPOSITION32] == [0, 1, 0]
+    assert _positions(backend) == [(2, 2), (2, 102)]
+
+
+def test_move_many_without_coalescing():
+    backend = RecordingBackend(_items(2))
+    with _session(backend) as session:
+        session.move_many([(0, 1, 1), (0, 2, 2)], coalesce=False)
+    assert [wparam for message, wparam in backend.messages if message == LVM_SETITEMPOSITION32] == [0, 0]
+    assert _positions(backend)[0] == (2, 2)
+
+
+def test_planned_swap_reaches_layout_targets():
+    config = LayoutConfig(category_order=["Папки"])
+    records = [{'index': 0, 'name': 'a', 'category': 'Папки'}, {'index': 1, 'name': 'b', 'category': 'Папки'}]
+    layout = compute_layout(records, ScreenGeometry(), config)
+    assert isinstance(layout, Layout)
+    # Иконки стоят в ячейках друг друга: план - обмен местами через свободную ячейку
+    records[0]['coords'] = layout.positions[1]
+    records[1]['coords'] = layout.positions[0]
+    plan = plan_moves(records, layout, keep_order=True)
+    assert plan.parked
+
+    backend = RecordingBackend([(record['name'], record['coords']) for record in records])
+    with _session(backend) as session:
+        results = session.move_many(plan.moves)
+
+    assert results == {0: True, 1: True}
+    assert _positions(backend) == [tuple(layout.positions[0]), tuple(layout.positions[1])]
+
+
+# --- Пакетное чтение (iter_snapshot_batches, snapshot_listview) ---
+
+def _expected_snapshot(items):
+    return [(index, name, tuple(coords)) for index, (name, coords) in enumerate(items)]
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 64, 1000])
+def test_batched_snapshot_matches_per_item_reads(batch_size):
+    items = _items(150) + [("Ярлык с длинным именем " * 4, (-30, 5000)), ("", (0, 0))]
+    batched = snapshot_listview(FakeListViewBackend(items), batch_size=batch_size)
+    per_item = snapshot_listview(FakeListViewBackend(items), batch_size=1)
+    assert batched == per_item
+    assert [(index, coords) for index, _, coords in batched] == [(index, tuple(coords)) for index, (_, coords) in enumerate(items)]
+    assert [name for _, name, _ in batched[:150]] == [name for name, _ in items[:150]]
+
+
+def test_batched_snapshot_call_counts():
+    backend = FakeListViewBackend(_items(100))
+    snapshot = snapshot_listview(backend, batch_size=32)
+
+    assert snapshot == _expected_snapshot(_items(100))
+    # Одна область памяти, по одному WriteProcessMemory и ReadProcessMemory на пакет
+    assert backend.calls["alloc"] == 1
+    assert backend.calls["free"] == 1
+    assert backend.calls["write"] == 4
+    assert backend.calls["read"] == 4
+    # LVM_GETITEMCOUNT + LVM_GETITEMTEXTW и LVM_GETITEMPOSITION на элемент
+    assert backend.calls["send_message"] == 1 + 2 * 100
+
+
+def test_snapshot_truncates_long_names():
+    backend = FakeListViewBackend([("x" * 50, (1, 2))])
+    [(index, name, coords)] = list(iter_snapshot_batches(backend, 1, text_max_chars=10))[0]
+    assert (index, name, coords) == (0, "x" * 9, (1, 2))
+
+
+def test_snapshot_write_failure_keeps_positions():
+    backend = FakeListViewBackend(_items(3))
+    backend.write = lambda address, data: False
+    assert snapshot_listview(backend) == [(index, None, (10 + index, 20 + index)) for index in range(3)]
+
+
+def test_snapshot_of_empty_listview():
+    backend = FakeListViewBackend([])
+    assert snapshot_listview(backend) == []
+    assert backend.calls["alloc"] == 0
+
+
+# --- DesktopListViewSession и RemoteBufferPool ---
+
+def test_session_reconnects_after_explorer_restart():
+    backends = [FakeListViewBackend(_items(3)), FakeListViewBackend(_items(5))]
+    created = []
+    hwnds = iter([101, 202])
+
+    def factory(hwnd):
+        created.append(hwnd)
+        return backends[len(created) - 1]
+
+    with DesktopListViewSession(find_hwnd=lambda: next(hwnds), backend_factory=factory) as session:
+        assert len(session.snapshot()) == 3
+        assert session.reconnects == 0
+        backends[0].alive = False
+        snapshot = session.snapshot()
+        assert snapshot == _expected_snapshot(_items(5))
+        assert session.reconnects == 1
+        assert session.hwnd == 202
+        assert session.backend is backends[1]
+
+    assert created == [101, 202]
+    # Память завершенного процесса не освобождается, память нового - освобождается при закрытии
+    assert backends[0].calls["free"] == 0
+    assert backends[1].calls["free"] == backends[1].calls["alloc"] == 1
+
+
+def test_session_without_hwnd_raises():
+    session = DesktopListViewSession(find_hwnd=lambda: 0, backend_factory=pytest.fail)
+    with pytest.raises(OSError):
+        session.snapshot()
+
+
+def test_session_reuses_pool_buffers():
+    backend = FakeListViewBackend(_items(40))
+    with DesktopListViewSession(hwnd=1, backend_factory=lambda hwnd: backend, batch_size=16) as session:
+        for _ in range(3):
+            assert session.snapshot() == _expected_snapshot(_items(40))
+        assert session.get_position(5) == (15, 25)
+        assert session.set_position(5, 7, 8)
+        assert session.get_position(5) == (7, 8)
+        # Буфер пакета чтения переиспользуется и для POINT (он не меньше запрошенного)
+        assert session.pool.allocations == 1
+    assert backend.calls["alloc"] == 1
+    assert backend.calls["free"] == 1
+
+
+def test_iter_snapshot_releases_buffer_when_closed_early():
+    backend = FakeListViewBackend(_items(50))
+    with DesktopListViewSession(hwnd=1, backend_factory=lambda hwnd: backend, batch_size=10) as session:
+        batches = session.iter_snapshot()
+        assert len(next(batches)) == 10
+        assert len(session.pool._in_use) == 1
+        batches.close()
+        assert not session.pool._in_use
+        assert backend.calls["read"] == 1
+        # Освобожденный буфер достается следующей операции
+        assert len(session.snapshot()) == 50
+        assert session.pool.allocations == 1
+    assert backend.calls["free"] == 1
+
+
+def test_remote_buffer_pool_best_fit_and_clear():
+    backend = FakeListViewBackend([])
+    pool = RemoteBufferPool(backend)
+    small = pool.acquire(16)
+    large = pool.acquire(4096)
+    pool.release(small)
+    pool.release(large)
+    assert pool.acquire(8) == small
+    assert pool.acquire(100) == large
+    assert pool.acquire(100) not in (small, large)
+    assert pool.allocations == 3
+    pool.clear()
+    assert backend.calls["free"] == 3
+    pool.acquire(8)
+    assert pool.allocations == 4
+
+
+def test_remote_buffer_pool_allocation_failure():
+    backend = FakeListViewBackend([])
+    backend.alive = False
+    with pytest.raises(OSError):
+        RemoteBufferPool(backend).acquire(8)
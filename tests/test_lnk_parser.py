@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from desktop_sort.lnk_parser import LnkParseError, parse_lnk, read_lnk_target
+
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lnk_corpus")
+with open(os.path.join(CORPUS_DIR, "expected.json"), encoding="utf-8") as _f:
+    EXPECTED = json.load(_f)
+
+VALID = sorted(name for name, values in EXPECTED.items() if not values.get("error"))
+CORRUPT = sorted(name for name, values in EXPECTED.items() if values.get("error"))
+SHELL_LINK_FIELDS = ("local_base_path", "network_path", "common_path_suffix", "name", "relative_path",
+                     "working_dir", "arguments", "environment_target")
+
+
+def _expected_target(filename: str, values: dict) -> str:
+    if "relative_target" in values:
+        return os.path.normpath(os.path.join(CORPUS_DIR, *values["relative_target"]))
+    return values["target"]
+
+
+@pytest.fixture
+def lnk_environment(monkeypatch):
+    def apply(values: dict):
+        for name, value in values.get("environment", {}).items():
+            monkeypatch.setenv(name, value)
+    return apply
+
+
+def test_corpus_is_complete():
+    for filename in EXPECTED:
+        assert os.path.isfile(os.path.join(CORPUS_DIR, filename)), filename
+    assert VALID and CORRUPT
+
+
+@pytest.mark.parametrize("filename", VALID)
+def test_read_lnk_target(filename, lnk_environment):
+    values = EXPECTED[filename]
+    lnk_environment(values)
+    path = os.path.join(CORPUS_DIR, filename)
+    assert read_lnk_target(path) == _expected_target(filename, values)
+
+
+@pytest.mark.parametrize("filename", VALID)
+def test_parse_lnk_fields(filename, lnk_environment):
+    values = EXPECTED[filename]
+    lnk_environment(values)
+    path = os.path.join(CORPUS_DIR, filename)
+    link = parse_lnk(path)
+    for field in SHELL_LINK_FIELDS:
+        if field in values:
+            assert getattr(link, field) == values[field], field
+    assert link.target_path(path) == _expected_target(filename, values)
+
+
+def test_unknown_environment_variable_is_kept(monkeypatch):
+    monkeypatch.delenv("LNK_TEST_ROOT", raising=False)
+    assert read_lnk_target(os.path.join(CORPUS_DIR, "environment_block.lnk")) == "%LNK_TEST_ROOT%\\Tools\\tool.exe"
+
+
+@pytest.mark.parametrize("filename", CORRUPT)
+def test_corrupt_files_raise(filename):
+    path = os.path.join(CORPUS_DIR, filename)
+    with pytest.raises(LnkParseError):
+        parse_lnk(path)
+    with pytest.raises(LnkParseError):
+        read_lnk_target(path)
+
+
+def test_missing_file_raises_os_error(tmp_path):
+    with pytest.raises(OSError):
+        read_lnk_target(str(tmp_path / "missing.lnk"))
@@ -0,0 +1,17 @@
+import main
+from desktop_sort.listview import DesktopListViewSession, FakeListViewBackend
+from desktop_sort.records import IconRecord
+
+
+def test_get_desktop_icon_info_returns_icons_read_before_error(monkeypatch):
+    def failing_scan(session, game_titles_list, **kwargs):
+        yield IconRecord(0, "Первая", (10, 20))
+        raise RuntimeError("сбой посреди прохода")
+
+    monkeypatch.setattr(main, "iter_desktop_icons", failing_scan)
+    backend = FakeListViewBackend([("Первая", (10, 20)), ("Вторая", (30, 40))])
+    session = DesktopListViewSession(hwnd=1, backend_factory=lambda hwnd: backend)
+
+    results = main.get_desktop_icon_info(1, [], session=session)
+
+    assert [record.name for record in results] == ["Первая"]
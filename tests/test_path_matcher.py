@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from desktop_sort.classifier import GAME_ROOTS_ENVIRON, IconClassifier
+from desktop_sort.codes import Category, ItemType
+from desktop_sort.path_matcher import PathPrefixMatcher, split_path_components
+
+
+def _matcher():
+    matcher = PathPrefixMatcher()
+    matcher.add_root("C:\\Program Files", "program_files")
+    matcher.add_root("C:\\Program Files\\Steam", "steam")
+    matcher.add_marker("my games", "game_library")
+    matcher.add_marker("steam\\steamapps\\common", "game_library")
+    return matcher
+
+
+def _exe(path: str, name: str = "Qwzx") -> dict:
+    return {'name': name, 'original_icon_name': name, 'type': ItemType.EXECUTABLE,
+            'original_desktop_type': ItemType.SHORTCUT, 'full_path': path}
+
+
+def test_split_path_components_accepts_both_separators():
+    assert split_path_components("c:\\games//steam\\x.exe") == ["c:", "games", "steam", "x.exe"]
+    assert split_path_components("") == []
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("d:\\my games\\qwzx\\qwzx.exe", "game_library"),
+    ("d:\\my gamesx\\qwzx\\qwzx.exe", None),
+    ("d:\\notmy games\\qwzx.exe", None),
+    ("d:/library/my games/qwzx.exe", "game_library"),
+    ("c:\\program files\\qwzx\\qwzx.exe", "program_files"),
+    ("c:\\program files (x86)\\qwzx\\qwzx.exe", None),
+    ("c:\\program filesx\\qwzx.exe", None),
+    # Приоритет у самого длинного корня
+    ("c:\\program files\\steam\\qwzx.exe", "steam"),
+    ("e:\\lib\\steam\\steamapps\\common\\qwzx\\qwzx.exe", "game_library"),
+    ("e:\\lib\\steam\\steamapps\\qwzx.exe", None),
+    # Имя файла не считается папкой
+    ("d:\\qwzx\\my games", None),
+])
+def test_matches_whole_components(path, expected):
+    assert _matcher().match(path) == expected
+
+
+def test_rules_are_case_folded():
+    matcher = PathPrefixMatcher()
+    matcher.add_root("D:\\Games Library", "game_root")
+    matcher.add_marker("Epic Games", "game_library")
+    assert matcher.match("d:\\games library\\qwzx.exe") == "game_root"
+    assert matcher.match("f:\\epic games\\qwzx\\qwzx.exe") == "game_library"
+    assert matcher.rules() == (("root", ("d:", "games library"), "game_root"),
+                               ("marker", ("epic games",), "game_library"))
+
+
+def test_empty_rules_are_rejected():
+    with pytest.raises(ValueError):
+        PathPrefixMatcher().add_root("\\\\", "x")
+    with pytest.raises(ValueError):
+        PathPrefixMatcher().add_marker("", "x")
+
+
+def test_classifier_folds_case_of_paths():
+    classifier = IconClassifier([], memo_size=0)
+    assert classifier.classify(_exe("D:\\My Games\\Qwzx\\Qwzx.exe")) is Category.GAMES
+    assert classifier.classify(_exe("D:\\MY GAMES\\QWZX.EXE")) is Category.GAMES
+    assert classifier.classify(_exe("D:\\MyGames\\Qwzx\\Qwzx.exe")) is Category.PROGRAMS
+    assert classifier.classify(_exe("D:\\My Gamesx\\Qwzx\\Qwzx.exe")) is Category.PROGRAMS
+
+
+def test_classifier_program_files_does_not_match_x86_prefix():
+    environ = {"ProgramFiles": "C:\\Apps", "ProgramFiles(x86)": "", "WinDir": "C:\\Windows"}
+    classifier = IconClassifier([], environ=environ, memo_size=0)
+    record = _exe("C:\\Apps\\Qwzx\\qwzx.exe", name="Witcher 3")
+    assert classifier.classify(record) is Category.PROGRAMS
+    assert classifier.classify(_exe("C:\\Apps (x86)\\Games\\qwzx.exe")) is Category.GAMES
+
+
+def test_game_roots_from_environment():
+    roots = os.pathsep.join(["\\\\nas\\Library", " /srv/Collection "])
+    classifier = IconClassifier([], environ={GAME_ROOTS_ENVIRON: roots}, memo_size=0)
+    assert classifier.classify(_exe("\\\\NAS\\library\\Qwzx\\qwzx.exe")) is Category.GAMES
+    assert classifier.classify(_exe("/srv/collection/qwzx/qwzx.exe")) is Category.GAMES
+    assert classifier.classify(_exe("/srv/collection2/qwzx/qwzx.exe")) is Category.PROGRAMS
+    assert classifier.classify(_exe("\\\\nas\\other\\qwzx.exe")) is Category.PROGRAMS
+
+    plain = IconClassifier([], environ={}, memo_size=0)
+    assert plain.classify(_exe("\\\\nas\\library\\Qwzx\\qwzx.exe")) is Category.PROGRAMS
+    assert plain.ruleset_version != classifier.ruleset_version
+
+
+def test_game_roots_argument_extends_environment():
+    classifier = IconClassifier([], environ={GAME_ROOTS_ENVIRON: "/srv/collection"}, memo_size=0,
+                                game_roots=["E:\\Library"])
+    assert classifier.classify(_exe("e:\\library\\qwzx.exe")) is Category.GAMES
+    assert classifier.classify(_exe("/srv/collection/qwzx.exe")) is Category.GAMES
+
+
+def test_library_markers_match_inside_path():
+    classifier = IconClassifier([], environ={}, memo_size=0)
+    assert classifier.classify(_exe("F:\\Epic Games\\Qwzx\\Binaries\\qwzx.exe")) is Category.GAMES
+    assert classifier.classify(_exe("F:\\Epic Gamesx\\Qwzx\\qwzx.exe")) is Category.PROGRAMS
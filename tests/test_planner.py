@@ -0,0 +1,161 @@
+import itertools
+import random
+
+import pytest
+
+from desktop_sort import planner
+from desktop_sort.codes import Category
+from desktop_sort.layout import LayoutConfig, ScreenGeometry, compute_layout
+from desktop_sort.planner import _hungarian, _iter_parking_cells, _order_moves, plan_moves
+
+
+CATEGORIES = [Category.PROGRAMS, Category.GAMES, Category.DOCUMENTS]
+
+
+def _records(count: int, seed: int = 0):
+    generator = random.Random(seed)
+    return [{'index': index, 'name': f"Иконка {index}", 'category': CATEGORIES[index % len(CATEGORIES)],
+             'coords': (generator.randrange(0, 1800), generator.randrange(0, 1000))}
+            for index in range(count)]
+
+
+def _simulate(records, plan, layout):
+    """
+    Выполняет план по ячейкам сетки: проверяет, что ни один ход не ставит иконку в ячейку,
+    занятую другой иконкой, и возвращает итоговые позиции.
+    """
+    positions = {record['index']: tuple(record['coords']) for record in records}
+    for index, x, y in plan.moves:
+        target_cell = layout.cell_of(x, y)
+        occupants = [other for other, coords in positions.items()
+                     if other != index and layout.cell_of(*coords) == target_cell]
+        assert not occupants, f"ход {index} -> {target_cell} в занятую ячейку ({occupants})"
+        positions[index] = (x, y)
+    return positions
+
+
+def _layout(records, config=None):
+    return compute_layout(records, ScreenGeometry(), config or LayoutConfig())
+
+
+@pytest.mark.parametrize("keep_order", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_plan_never_moves_into_occupied_cell(seed, keep_order):
+    records = _records(60, seed)
+    layout = _layout(records)
+    # Часть иконок уже стоит в чужих целевых ячейках - создает зависимости и циклы
+    targets = list(layout.positions.values())
+    for record in records[::3]:
+        record['coords'] = targets[(record['index'] * 7) % len(targets)]
+
+    plan = plan_moves(records, layout, keep_order=keep_order)
+
+    final = _simulate(records, plan, layout)
+    for index, target in plan.targets.items():
+        assert layout.cell_of(*final[index]) == layout.cell_of(*target)
+
+
+def test_swap_is_resolved_through_parking_cell():
+    records = [{'index': index, 'name': f"Иконка {index}", 'category': Category.PROGRAMS, 'coords': None}
+               for index in range(3)]
+    layout = _layout(records)
+    # Цикл из трех иконок: каждая стоит в ячейке следующей
+    for index, record in enumerate(records):
+        record['coords'] = layout.positions[(index + 1) % 3]
+
+    plan = plan_moves(records, layout, keep_order=True)
+
+    assert len(plan.parked) == 1
+    assert plan.move_count == 4
+    parked_index = plan.parked[0]
+    parking_move = next(move for move in plan.moves if move[0] == parked_index)
+    parking_cell = layout.cell_of(*parking_move[1:])
+    assert parking_cell not in {layout.cell_of(*target) for target in layout.positions.values()}
+    final = _simulate(records, plan, layout)
+    assert final == {index: layout.positions[index] for index in range(3)}
+
+
+def test_icons_in_place_are_skipped():
+    records = _records(12)
+    layout = _layout(records)
+    for record in records:
+        x, y = layout.positions[record['index']]
+        # Отклонение меньше допуска IN_PLACE_TOLERANCE ячейки
+        record['coords'] = (x + 3, y - 4)
+    records[5]['coords'] = (1500, 900)
+
+    plan = plan_moves(records, layout, keep_order=True)
+
+    assert [move[0] for move in plan.moves] == [5]
+    assert sorted(plan.in_place) == [index for index in range(12) if index != 5]
+    assert plan.parked == []
+
+
+def test_assignment_keeps_icons_standing_in_their_zone():
+    records = _records(9)
+    layout = _layout(records)
+    # Иконки стоят в ячейках своей зоны, но не в порядке сортировки по имени
+    for zone in layout.zones:
+        for index, position in zip(zone.indices, reversed(zone.positions)):
+            records[index]['coords'] = position
+
+    plan = plan_moves(records, layout)
+
+    assert plan.moves == []
+    assert plan.total_distance == 0
+    assert len(plan.in_place) == 9
+
+
+def test_order_moves_waits_for_occupant_to_leave():
+    records = [{'index': index, 'name': f"Иконка {index}", 'category': Category.PROGRAMS, 'coords': None}
+               for index in range(2)]
+    layout = _layout(records)
+    current = {0: layout.positions[1], 1: (1500, 900)}
+    pending = {0: layout.positions[0], 1: layout.positions[1]}
+    # Иконка 0 стоит в целевой ячейке иконки 1: сначала уходит 0, затем ставится 1
+    moves, parked = _order_moves(pending, current, layout, pending)
+
+    assert [move[0] for move in moves] == [0, 1]
+    assert parked == []
+
+
+def test_parking_cells_skip_busy_and_target_cells():
+    records = [{'index': index, 'name': f"Иконка {index}", 'category': Category.PROGRAMS, 'coords': None}
+               for index in range(4)]
+    layout = _layout(records)
+    current = {0: layout.positions[0], 1: (layout.origin_x, layout.origin_y + 5 * layout.cell_height)}
+    targets = dict(layout.positions)
+
+    cells = list(itertools.islice(_iter_parking_cells(current, layout, targets), 20))
+
+    busy = {layout.cell_of(*coords) for coords in current.values()} | {layout.cell_of(*target) for target in targets.values()}
+    parking = [layout.cell_of(*cell) for cell in cells]
+    assert len(set(parking)) == len(parking)
+    assert not busy & set(parking)
+
+
+def test_large_zone_falls_back_to_grid_order(monkeypatch):
+    monkeypatch.setattr(planner, "HUNGARIAN_MAX_ZONE_SIZE", 4)
+    records = _records(30, seed=3)
+    for record in records:
+        record['category'] = Category.PROGRAMS
+    layout = _layout(records)
+
+    plan = plan_moves(records, layout)
+
+    assert sorted(plan.targets) == list(range(30))
+    assert len(set(plan.targets.values())) == 30
+    _simulate(records, plan, layout)
+
+
+@pytest.mark.parametrize("size", [1, 2, 4, 6])
+def test_hungarian_matches_brute_force(size):
+    generator = random.Random(size)
+    cost = [[generator.randrange(100) for _ in range(size)] for _ in range(size)]
+
+    assignment = _hungarian(cost)
+
+    best = min(sum(cost[row][column] for row, column in enumerate(permutation))
+               for permutation in itertools.permutations(range(size)))
+    assert sorted(assignment) == list(range(size))
+    assert sum(cost[row][column] for row, column in enumerate(assignment)) == best
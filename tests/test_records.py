@@ -0,0 +1,91 @@
+import pytest
+
+from desktop_sort import codes
+from desktop_sort.codes import Category, ItemType
+from desktop_sort.records import NO_CATEGORY, IconRecord, IconRecordArray
+
+
+# Ключи словаря get_desktop_icon_info() до перехода на IconRecord
+LEGACY_KEYS = ['index', 'name', 'coords', 'type', 'full_path', 'category', 'classified_name', 'original_desktop_type']
+
+
+def _records():
+    return [
+        IconRecord(0, "Ведьмак 3", (10, 20), ItemType.EXECUTABLE, "D:\\Games\\w3.exe", Category.GAMES, "witcher3",
+                   ItemType.SHORTCUT),
+        IconRecord(1, "Отчет.docx", (86, 20), ItemType.FILE, "C:\\Users\\u\\Desktop\\Отчет.docx", Category.DOCUMENTS,
+                   "Отчет.docx", ItemType.FILE),
+        # Запись с ошибкой чтения: без координат, типа и категории
+        IconRecord(2, "???", None, error="Не удалось прочитать позицию"),
+    ]
+
+
+def test_to_dict_defaults_to_legacy_shape():
+    record = _records()[0].to_dict()
+    assert list(record) == LEGACY_KEYS
+    assert record == {'index': 0, 'name': "Ведьмак 3", 'coords': (10, 20), 'type': "исполняемый файл",
+                      'full_path': "D:\\Games\\w3.exe", 'category': "Игры", 'classified_name': "witcher3",
+                      'original_desktop_type': "ярлык"}
+
+
+def test_to_dict_codes_language_and_error():
+    record = _records()[0]
+    codes_only = record.to_dict(display_names=False)
+    assert codes_only['type'] is ItemType.EXECUTABLE and codes_only['category'] is Category.GAMES
+    assert 'error' not in codes_only
+    assert record.to_dict(language="en")['category'] == codes.category_name(Category.GAMES, "en")
+
+    failed = _records()[2].to_dict(include_error=True)
+    assert list(failed) == LEGACY_KEYS + ['error']
+    assert failed['error'] == "Не удалось прочитать позицию"
+    assert failed['category'] is None and failed['type'] is None
+
+
+def test_from_dict_accepts_names_and_codes():
+    record = _records()[0]
+    assert IconRecord.from_dict(record.to_dict()) == record
+    assert IconRecord.from_dict(record.to_dict(display_names=False, include_error=True)) == record
+    assert IconRecord.from_dict(_records()[2].to_dict(include_error=True)) == _records()[2]
+
+
+def test_dict_style_access():
+    record = _records()[1]
+    assert record['category'] is Category.DOCUMENTS
+    assert record.get('missing', 5) == 5
+    assert 'coords' in record and 'missing' not in record
+    record['coords'] = (1, 2)
+    assert record.coords == (1, 2)
+    with pytest.raises(KeyError):
+        record['missing']
+    with pytest.raises(KeyError):
+        record['missing'] = 1
+
+
+def test_record_array_round_trip():
+    records = _records()
+    array = IconRecordArray(records)
+
+    assert len(array) == 3
+    assert list(array) == [
+        records[0], records[1],
+        # Отсутствующие координаты хранятся как (0, 0)
+        IconRecord(2, "???", (0, 0), error="Не удалось прочитать позицию"),
+    ]
+    assert list(array.indices) == [0, 1, 2]
+    assert list(array.category_codes) == [Category.GAMES, Category.DOCUMENTS, NO_CATEGORY]
+    assert list(array.type_codes) == [ItemType.EXECUTABLE, ItemType.FILE, -1]
+    assert array.to_dicts()[1] == records[1].to_dict()
+
+
+def test_record_array_accepts_dicts_and_append():
+    legacy = [record.to_dict() for record in _records()[:2]]
+    array = IconRecordArray(legacy)
+    array.append(_records()[2])
+    array.append({'index': 7, 'name': "Папка", 'type': "папка", 'category': "Папки"})
+
+    assert [record.index for record in array] == [0, 1, 2, 7]
+    assert array[0] == _records()[0]
+    assert array[3].type is ItemType.FOLDER and array[3].category is Category.FOLDERS
+    assert (array.xs[3], array.ys[3]) == (0, 0)
+    with pytest.raises(KeyError):
+        IconRecordArray([{'name': "без индекса"}])
@@ -0,0 +1,69 @@
+import pytest
+
+from desktop_sort import stats
+from desktop_sort.cache import ClassificationCache, ShortcutResolutionCache
+from desktop_sort.codes import Category, ItemType
+from desktop_sort.listview import DesktopListViewSession, FakeListViewBackend
+from desktop_sort.scanner import iter_desktop_icons
+
+
+@pytest.fixture
+def clean_stats():
+    was_enabled = stats.enabled
+    stats.reset()
+    yield
+    stats.reset()
+    if was_enabled:
+        stats.enable()
+    else:
+        stats.disable()
+
+
+def _workload(tmp_path):
+    """Проход по рабочему столу, кэшам и таймерам: затрагивает все виды счетчиков."""
+    desktop = tmp_path / "desktop"
+    desktop.mkdir(exist_ok=True)
+    (desktop / "Отчет.pdf").write_text("", encoding="utf-8")
+    session = DesktopListViewSession(hwnd=1, backend_factory=lambda hwnd: FakeListViewBackend(
+        [("Отчет", (10, 20)), ("Portal 2", (86, 20))]), batch_size=1)
+    try:
+        records = list(iter_desktop_icons(session, ["portal 2"], desktop_paths=[str(desktop)]))
+    finally:
+        session.close()
+
+    with ClassificationCache(str(tmp_path / "classifications.sqlite3")) as cache:
+        cache.put("key", Category.GAMES)
+        cache.get("key")
+        cache.get("missing")
+    with ShortcutResolutionCache(str(tmp_path / "shortcuts.sqlite3")) as cache:
+        cache.put("a.lnk", 1, 1, ("a", ItemType.FILE, "C:\\a.txt", ItemType.SHORTCUT))
+        cache.get("a.lnk", 1, 1)
+        cache.get("b.lnk", 1, 1)
+    with stats.timer("test.timer"):
+        pass
+    stats.add_time("test.add_time", 1000)
+    return records
+
+
+def test_disabled_stats_record_nothing(tmp_path, clean_stats):
+    stats.disable()
+
+    records = _workload(tmp_path)
+
+    assert [record.category for record in records] == [Category.DOCUMENTS, Category.GAMES]
+    snapshot = stats.snapshot()
+    assert snapshot['counters'] == {}
+    assert snapshot['timers'] == {}
+    assert snapshot['cache_hit_rates'] == {}
+
+
+def test_enabled_stats_record_counters_caches_and_timers(tmp_path, clean_stats):
+    stats.enable()
+
+    _workload(tmp_path)
+
+    snapshot = stats.snapshot()
+    assert snapshot['counters']['syscall.scandir'] == 1
+    assert snapshot['cache_hit_rates']['classification_cache'] == 0.5
+    assert snapshot['cache_hit_rates']['shortcut_cache'] == 0.5
+    assert {"desktop.scan", "test.timer", "test.add_time"} <= set(snapshot['timers'])
@@ -0,0 +1,240 @@
+import os
+import random
+import struct
+import threading
+import time
+
+import pytest
+
+from desktop_sort.title_catalog import (
+    INDEX_MAGIC, LazyTitleCatalog, MappedTitleCatalog, build_title_index, default_index_path, load_game_titles, open_title_catalog,
+    source_version,
+)
+from desktop_sort.title_matcher import GameTitleMatcher
+
+
+TITLES = ["The Witcher 3", "  witcher ", "Portal 2", "portal", "Ведьмак 3: Дикая Охота", "Doom", "doom eternal",
+          "Zoo", "ab", "Half-Life", "half-life 2", "Diablo IV", "Stalker", "S.T.A.L.K.E.R.", "Ведьмак", "", "Ёлка"]
+
+
+def _write_titles(path, titles):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(titles) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def source(tmp_path):
+    return _write_titles(tmp_path / "game_titles.txt", TITLES)
+
+
+def test_build_title_index_normalizes_and_sorts(source):
+    index = build_title_index(source)
+    assert index == default_index_path(source)
+
+    catalog = MappedTitleCatalog(index)
+    try:
+        expected = sorted({title.strip().lower() for title in TITLES if title.strip()}, key=lambda t: t.encode("utf-8"))
+        assert len(catalog) == len(expected)
+        assert [catalog._title_bytes(i).decode("utf-8") for i in range(len(catalog))] == expected
+        source_stat = os.stat(source)
+        assert catalog.version == source_version(source_stat.st_size, source_stat.st_mtime_ns)
+        assert list(catalog.iter_prefix("half")) == ["half-life", "half-life 2"]
+        assert catalog.has_prefix("ведь") and not catalog.has_prefix("ведро")
+    finally:
+        catalog.close()
+
+
+def test_mapped_catalog_matches_in_memory_catalog(source):
+    mapped = open_title_catalog(source)
+    assert isinstance(mapped, MappedTitleCatalog)
+    titles = [title for title in load_game_titles(source) if title]
+    in_memory = GameTitleMatcher(titles)
+    generator = random.Random(7)
+    names = list(titles) + ["witcher", "the witcher 3 goty", "portal 2 launcher", "my portal", "doo", "doom",
+                            "zoo tycoon", "ab", "half-life 3", "diabl", "ведьмак 3", "супер ведьмак", "ёлки",
+                            "stalker 2", "s.t.a.l.k.e.r. shadow", "", "abc"]
+    for _ in range(500):
+        first, second = generator.choice(titles), generator.choice(titles)
+        names.append(first[generator.randrange(0, 3):] + " " + second[:generator.randrange(0, 6)])
+        names.append("".join(generator.choice("abdeilmoprtwzв ь") for _ in range(generator.randrange(0, 20))))
+    try:
+        for name in names:
+            assert (name in mapped) == (name in in_memory), name
+            assert mapped.matches_part(name) == in_memory.matches_part(name), name
+    finally:
+        mapped.close()
+
+
+def test_open_reuses_index_and_rebuilds_on_source_change(source):
+    first = open_title_catalog(source)
+    first_version = first.version
+    first.close()
+    index_mtime = os.stat(default_index_path(source)).st_mtime_ns
+
+    same = open_title_catalog(source)
+    assert same.version == first_version
+    same.close()
+    assert os.stat(default_index_path(source)).st_mtime_ns == index_mtime
+
+    # Тот же размер, другой mtime
+    source_stat = os.stat(source)
+    os.utime(source, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 5_000_000_000))
+    touched = open_title_catalog(source)
+    assert touched.version != first_version
+    touched.close()
+
+    # Другой размер и содержимое
+    _write_titles(source, TITLES + ["Factorio"])
+    changed = open_title_catalog(source)
+    try:
+        assert "factorio" in changed
+        assert changed.version == source_version(os.stat(source).st_size, os.stat(source).st_mtime_ns)
+    finally:
+        changed.close()
+
+
+@pytest.mark.parametrize("content", [b"", b"GTIX", INDEX_MAGIC + struct.pack("<HHIQQ", 1, 0, 0, 0, 0), b"not an index" * 10])
+def test_invalid_or_outdated_index_is_rebuilt(source, content):
+    with open(default_index_path(source), "wb") as f:
+        f.write(content)
+
+    catalog = open_title_catalog(source)
+    try:
+        assert isinstance(catalog, MappedTitleCatalog)
+        assert "portal 2" in catalog
+    finally:
+        catalog.close()
+
+
+def test_truncated_index_is_rejected(source):
+    index = build_title_index(source)
+    with open(index, "rb") as f:
+        data = f.read()
+    with open(index, "wb") as f:
+        f.write(data[:-10])
+    with pytest.raises(ValueError):
+        MappedTitleCatalog(index)
+
+
+def test_falls_back_to_memory_when_index_cannot_be_built(source, tmp_path):
+    index = str(tmp_path / "missing-dir" / "titles.idx")
+
+    catalog = open_title_catalog(source, index)
+
+    assert isinstance(catalog, GameTitleMatcher)
+    assert "portal 2" in catalog
+    assert catalog.matches_part("the witcher 3 launcher")
+    # Пустая строка файла не делает пустое имя игрой
+    assert "" not in catalog
+
+
+def test_missing_source_gives_empty_catalog(tmp_path):
+    catalog = open_title_catalog(str(tmp_path / "absent.txt"))
+    assert isinstance(catalog, GameTitleMatcher)
+    assert len(catalog) == 0
+    assert not catalog.matches_part("portal 2")
+
+
+class _FakeCatalog:
+    """Каталог для LazyTitleCatalog: matches_part может ждать события, close() запоминается."""
+
+    def __init__(self, titles, gate=None):
+        self.titles = set(titles)
+        self.gate = gate
+        self.entered = threading.Event()
+        self.closed = False
+
+    def __contains__(self, name_lower):
+        assert not self.closed
+        return name_lower in self.titles
+
+    def __len__(self):
+        return len(self.titles)
+
+    def matches_part(self, name_lower):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        assert not self.closed
+        return any(title in name_lower for title in self.titles)
+
+    def close(self):
+        self.closed = True
+
+
+def test_lazy_catalog_opens_on_first_use_and_reopens_after_close(source):
+    opened = []
+
+    def opener(source_filename, index_filename):
+        catalog = open_title_catalog(source_filename, index_filename)
+        opened.append(catalog)
+        return catalog
+
+    lazy = LazyTitleCatalog(source, opener=opener)
+    assert not lazy.loaded
+    assert lazy.version == source_version(os.stat(source).st_size, os.stat(source).st_mtime_ns)
+    assert not opened
+
+    assert "portal 2" in lazy
+    assert lazy.matches_part("portal 2 launcher")
+    assert lazy.loaded and len(opened) == 1
+
+    lazy.close()
+    assert not lazy.loaded
+    with pytest.raises(ValueError):
+        opened[0]._title_bytes(0)
+    lazy.close()
+
+    assert "doom" in lazy
+    assert len(opened) == 2
+    lazy.close()
+
+
+def test_lazy_catalog_opens_once_under_concurrent_first_use():
+    opened = []
+
+    def opener(source_filename, index_filename):
+        time.sleep(0.05)
+        opened.append(_FakeCatalog(["portal"]))
+        return opened[-1]
+
+    lazy = LazyTitleCatalog("unused.txt", opener=opener)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append("portal" in lazy)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    assert len(opened) == 1
+
+
+def test_lazy_catalog_close_waits_for_running_lookups():
+    gate = threading.Event()
+    opened = []
+
+    def opener(source_filename, index_filename):
+        opened.append(_FakeCatalog(["portal"], gate if not opened else None))
+        return opened[-1]
+
+    lazy = LazyTitleCatalog("unused.txt", opener=opener)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(lazy.matches_part("portal 2")))
+    reader.start()
+    assert opened and opened[0].entered.wait(5)
+
+    lazy.close()
+    # Поиск еще идет: каталог не закрыт, но новые обращения открывают новый
+    assert not opened[0].closed
+    assert "portal" in lazy
+    assert len(opened) == 2
+
+    gate.set()
+    reader.join(5)
+    assert results == [True]
+    assert opened[0].closed
+    assert not opened[1].closed
+    lazy.close()
+    assert opened[1].closed
@@ -0,0 +1,109 @@
+import os
+import random
+
+import pytest
+
+from desktop_sort.classifier import IconClassifier, get_icon_category
+from desktop_sort.title_matcher import PARTIAL_MATCH_MIN_LENGTH, GameTitleMatcher, KeywordMatcher
+from legacy_classifier import get_icon_category as legacy_get_icon_category
+
+
+TITLES = ["the witcher 3", "portal 2", "doom", "zoo", "half-life", "stalker", "ведьмак 3: дикая охота", "factorio", "ori"]
+
+NAMES = ["The Witcher 3", "Portal 2 Launcher", "doom eternal", "Zoo Tycoon", "Half-Life", "My Stalker", "Factorio",
+         "Отчет", "Корзина", "Этот компьютер", "Google Chrome", "Steam", "Discord", "Minecraft", "Ведьмак",
+         "Calc", "Notepad++", "Проекты", "Kittens", "Orion", "Visual Studio Code", "engine", "Task Manager", "ori"]
+EXTENSIONS = ["", ".exe", ".pdf", ".txt", ".png", ".mp4", ".mp3", ".zip", ".py", ".lnk", ".dat", ".docx"]
+FOLDERS = [os.path.join(*parts) for parts in [
+    ("C:\\Program Files",), ("C:\\Program Files (x86)",), ("C:\\Windows", "system32"), ("D:", "Games"), ("D:", "Игры"),
+    ("E:", "Epic Games"), ("F:", "GOG Games"), ("C:", "Users", "u", "Documents", "My Games"), ("D:", "Soft"),
+    ("C:", "Users", "u", "Desktop"), ("C:", "Riot Games"), ("D:", "Blizzard"), ("E:", "SteamLibrary", "steamapps", "common"),
+]]
+# (type, original_desktop_type) - названия типов, как в словарях до перехода на коды
+TYPES = [("папка", "папка"), ("исполняемый файл", "ярлык"), ("файл", "файл"), ("неизвестный тип", "неизвестный тип"),
+         ("ярлык", "ярлык"), ("исполняемый файл", "исполняемый файл"), ("пдф", "пдф"), ("изображение", "ярлык"),
+         ("интернет-ярлык", "интернет-ярлык")]
+URLS = ["https://docs.google.com/document/d/1", "https://www.youtube.com/watch?v=1", "https://github.com/u/r",
+        "steam://rungameid/1", "epicgames://apps/x", "https://example.com/", "https://store.steampowered.com/app/1",
+        "https://www.gog.com/game/x", "https://drive.google.com/x"]
+
+
+def _sample(count: int, seed: int = 1) -> list:
+    """Фиксированная выборка записей иконок: имена, типы и пути из наборов выше."""
+    generator = random.Random(seed)
+    records = []
+    for _ in range(count):
+        name = generator.choice(NAMES)
+        item_type, original_type = generator.choice(TYPES)
+        if original_type == "интернет-ярлык":
+            path = generator.choice(URLS)
+        elif generator.random() < 0.15:
+            path = ""
+        else:
+            subfolder = generator.choice([(), (generator.choice(NAMES),)])
+            path = os.path.join(generator.choice(FOLDERS), *subfolder, name + generator.choice(EXTENSIONS))
+        records.append({'name': name, 'original_icon_name': generator.choice([name, generator.choice(NAMES)]),
+                        'type': item_type, 'original_desktop_type': original_type, 'full_path': path})
+    return records
+
+
+def test_same_categories_as_legacy_get_icon_category():
+    classifier = IconClassifier(TITLES, environ={}, memo_size=0)
+    mismatches = []
+    for record in _sample(3000):
+        expected = legacy_get_icon_category(record, TITLES)
+        actual = get_icon_category(record, classifier)
+        if actual != expected:
+            mismatches.append((record, expected, actual))
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("name", ["portal 2", "doom", "zoo", "ori", "ведьмак 3: дикая охота"])
+def test_exact_match(name):
+    matcher = GameTitleMatcher(TITLES)
+    assert name in matcher
+    assert name.upper() not in matcher
+    assert name + " " not in matcher
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("portal 2 launcher", True),
+    ("the witcher 3 goty", True),
+    ("my doom", True),
+    ("ведьмак 3: дикая охота - издание года", True),
+    ("half-lif", False),
+    # Названия короче PARTIAL_MATCH_MIN_LENGTH участвуют только в точном совпадении
+    ("zoo tycoon", False),
+    ("orion", False),
+    ("", False),
+])
+def test_partial_match(name, expected):
+    assert GameTitleMatcher(TITLES).matches_part(name) == expected
+    assert any(title in name for title in TITLES if len(title) >= PARTIAL_MATCH_MIN_LENGTH) == expected
+
+
+@pytest.mark.parametrize("name", ["doomsday", "boomdoom", "xstalkerx", "portal 2x", "halfhalf-life"])
+def test_partial_match_ignores_word_boundaries(name):
+    # Как и прежний `title in name`, совпадение не требует границ слов
+    assert GameTitleMatcher(TITLES).matches_part(name)
+
+
+def test_keyword_matcher_edge_cases():
+    matcher = KeywordMatcher(["ab", "abcd", "", "xyz"])
+    assert len(matcher) == 3
+    assert matcher.contains_any("ab")
+    assert matcher.contains_any("zzabzz")
+    assert matcher.contains_any("..xyz")
+    assert not matcher.contains_any("a")
+    assert not matcher.contains_any("")
+    assert not KeywordMatcher([]).contains_any("anything")
+
+
+def test_keyword_matcher_equivalent_to_substring_scan():
+    generator = random.Random(3)
+    alphabet = "abcdо "
+    keywords = ["".join(generator.choice(alphabet) for _ in range(generator.randrange(1, 7))) for _ in range(60)]
+    matcher = KeywordMatcher(keywords)
+    for _ in range(2000):
+        text = "".join(generator.choice(alphabet) for _ in range(generator.randrange(0, 15)))
+        assert matcher.contains_any(text) == any(keyword in text for keyword in keywords), text